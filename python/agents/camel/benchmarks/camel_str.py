@@ -0,0 +1,180 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the memory and latency of `CaMeLStr`.
+
+Compares `CaMeLStr`, which stores a native `str` with the capabilities and
+dependencies of its spans of characters, with a string of one value per
+character like the `_Char` tuples the spans replaced. Both are built from
+the raw output of a tool, then read back, indexed, sliced and concatenated
+as the interpreter does.
+
+The peak memory is measured with `tracemalloc` while building the string,
+and the retained memory is what the built string still holds afterwards.
+
+Run from `python/agents/camel`:
+
+    python -m benchmarks.camel_str
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from camel.camel_library.capabilities import capabilities
+from camel.camel_library.interpreter import camel_value
+
+
+class PerCharacterStr:
+  """A string of one value per character, like the `_Char` tuples."""
+
+  def __init__(self, chars: tuple[camel_value.Value, ...]) -> None:
+    self.python_value = chars
+
+  @classmethod
+  def from_raw(
+      cls,
+      string: str,
+      caps: capabilities.Capabilities,
+      dependencies: tuple[camel_value.Value, ...],
+  ) -> "PerCharacterStr":
+    # pylint: disable-next=protected-access
+    return cls(tuple(camel_value._Span(c, caps, dependencies) for c in string))
+
+  @property
+  def raw(self) -> str:
+    s = ""
+    for c in self.python_value:
+      s += c.python_value
+    return s
+
+  def index(self, index: int) -> "PerCharacterStr":
+    return PerCharacterStr((self.python_value[index],))
+
+  def slice(self, start: int, end: int) -> "PerCharacterStr":
+    return PerCharacterStr(self.python_value[start:end])
+
+  def add(self, other: "PerCharacterStr") -> "PerCharacterStr":
+    return PerCharacterStr(self.python_value + other.python_value)
+
+
+def _int(value: int) -> camel_value.CaMeLInt:
+  return camel_value.CaMeLInt(value, capabilities.Capabilities.camel(), ())
+
+
+_NONE = camel_value.CaMeLNone(capabilities.Capabilities.camel(), ())
+
+
+def make_operations(
+    string_type: str,
+) -> dict[str, Callable[[Any], Any]]:
+  """Returns the operations on a built string of the given type."""
+  if string_type == "per-character":
+    return {
+        "raw x10": lambda s: [s.raw for _ in range(10)],
+        "index": lambda s: s.index(len(s.python_value) // 2),
+        "slice": lambda s: s.slice(
+            len(s.python_value) // 4, len(s.python_value) * 3 // 4
+        ),
+        "add": lambda s: s.add(s),
+    }
+  return {
+      "raw x10": lambda s: [s.raw for _ in range(10)],
+      "index": lambda s: s.index(_int(len(s.python_value) // 2)),
+      "slice": lambda s: s.slice(
+          _int(len(s.python_value) // 4),
+          _int(len(s.python_value) * 3 // 4),
+          _NONE,
+      ),
+      "add": lambda s: s.add(s),
+  }
+
+
+STRING_TYPES = {
+    "per-character": PerCharacterStr,
+    "spans": camel_value.CaMeLStr,
+}
+
+
+def build(string_type: str, text: str) -> Any:
+  tool = camel_value.CaMeLNone(capabilities.Capabilities.camel(), ())
+  return STRING_TYPES[string_type].from_raw(
+      text, capabilities.Capabilities.default(), (tool,)
+  )
+
+
+def measure_memory(string_type: str, text: str) -> tuple[int, int]:
+  """Returns the peak and retained memory of building a string, in bytes."""
+  tracemalloc.start()
+  try:
+    start, _ = tracemalloc.get_traced_memory()
+    string = build(string_type, text)
+    retained, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  del string
+  return peak - start, retained - start
+
+
+def time_operation(operation: Callable[[], Any], repeats: int) -> float:
+  """Returns the median time of an operation, in seconds."""
+  times = []
+  for _ in range(repeats):
+    start = time.perf_counter()
+    operation()
+    times.append(time.perf_counter() - start)
+  return statistics.median(times)
+
+
+def _format_time(seconds: float) -> str:
+  if seconds >= 1e-3:
+    return f"{seconds * 1e3:.1f}ms"
+  return f"{seconds * 1e6:.1f}us"
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument(
+      "--sizes", type=int, nargs="+", default=[1_000, 10_000, 200_000]
+  )
+  parser.add_argument("--repeats", type=int, default=5)
+  args = parser.parse_args()
+  operation_names = list(make_operations("spans"))
+  print(
+      f"{'string':<14} {'chars':>8} {'peak':>9} {'retained':>9}"
+      f" {'from_raw':>9}"
+      + "".join(f" {name:>9}" for name in operation_names)
+  )
+  for size in args.sizes:
+    text = ("The meeting with team 3 is on day 14. " * (size // 38 + 1))[:size]
+    for string_type in STRING_TYPES:
+      peak, retained = measure_memory(string_type, text)
+      from_raw = time_operation(lambda: build(string_type, text), args.repeats)
+      string = build(string_type, text)
+      times = [
+          time_operation(lambda op=op: op(string), args.repeats)
+          for op in make_operations(string_type).values()
+      ]
+      print(
+          f"{string_type:<14} {size:>8} {peak / 2**10:>7.1f}KB"
+          f" {retained / 2**10:>7.1f}KB {_format_time(from_raw):>9}"
+          + "".join(f" {_format_time(t):>9}" for t in times)
+      )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,176 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the tool calls chain and dependencies in long loops.
+
+Compares `Chain`, which the interpreter appends to in O(1), with copying the
+sequence on every step like the lists the chain replaced. The copying
+sequence removes items by equality, like `list.remove`, where `Chain.remove`
+removes them by identity.
+
+Two loops are timed for 1k to 100k iterations: the chain operations of a
+`for` loop calling a tool under an `if` on each iteration, alone, and the
+plan of that loop run by the interpreter. Copying grows quadratically, so it
+is only timed up to `--max-copying-iterations`.
+
+Run from `python/agents/camel`:
+
+    python -m benchmarks.chain_loops
+"""
+
+import argparse
+import contextlib
+import statistics
+import time
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+from unittest import mock
+
+from camel.camel_library import chain
+from camel.camel_library import security_policy
+from camel.camel_library.capabilities import capabilities
+from camel.camel_library.interpreter import camel_value
+from camel.camel_library.interpreter import interpreter
+from camel.camel_library.interpreter import library
+
+PLAN = """
+for i in range(NUM_ITERATIONS):
+    if i % 3 != 1:
+        record(i)
+"""
+
+
+class CopyingChain(tuple):
+  """A sequence copied on every change, with the interface of `Chain`."""
+
+  @classmethod
+  def of(cls, items: Iterable[Any]) -> "CopyingChain":
+    if isinstance(items, cls):
+      return items
+    return cls(items)
+
+  def append(self, item: Any) -> "CopyingChain":
+    return type(self)((*self, item))
+
+  def extend(self, items: Iterable[Any]) -> "CopyingChain":
+    return type(self)((*self, *items))
+
+  def remove(self, item: Any) -> "CopyingChain":
+    items = list(self)
+    items.remove(item)
+    return type(self)(items)
+
+  def to_tuple(self) -> tuple[Any, ...]:
+    return tuple(self)
+
+  def to_list(self) -> list[Any]:
+    return list(self)
+
+
+SEQUENCES = {"copying": CopyingChain, "chain": chain.Chain}
+
+
+def record(i: int) -> int:
+  """Records an iteration."""
+  return i
+
+
+def make_namespace() -> camel_value.Namespace:
+  return library.make_builtins_namespace(
+      variables={
+          "record": camel_value.CaMeLFunction(
+              name="record",
+              py_callable=record,
+              capabilities=capabilities.Capabilities.camel(),
+              dependencies=(),
+          )
+      }
+  )
+
+
+@contextlib.contextmanager
+def sequence(name: str) -> Iterator[None]:
+  with mock.patch.object(chain, "Chain", SEQUENCES[name]):
+    yield
+
+
+def run_chain_operations(num_iterations: int) -> None:
+  """Runs the chain operations of the interpreter on the loop of the plan."""
+  sequence_type = chain.Chain
+  tool_calls_chain = sequence_type.of(())
+  dependencies = sequence_type.of(()).append(object())
+  for i in range(num_iterations):
+    test = object()
+    dependencies = sequence_type.of(dependencies).append(test)
+    if i % 3 != 1:
+      tool_calls_chain = sequence_type.of(tool_calls_chain).append(i)
+    dependencies = sequence_type.of(dependencies).remove(test)
+
+
+def run_plan(num_iterations: int) -> None:
+  eval_args = interpreter.EvalArgs(
+      security_policy.NoSecurityPolicyEngine(),
+      interpreter.DependenciesPropagationMode.NORMAL,
+  )
+  code = PLAN.replace("NUM_ITERATIONS", str(num_iterations))
+  res = interpreter.parse_and_interpret_code(
+      f"```python\n{code}\n```", make_namespace(), [], (), eval_args
+  )
+  if isinstance(res.result, interpreter.result.Error):
+    raise RuntimeError(f"The plan failed: {res.result.error}")
+
+
+def time_loop(
+    run: Callable[[int], None], num_iterations: int, name: str, repeats: int
+) -> float:
+  """Returns the median time of a loop, in seconds."""
+  times = []
+  with sequence(name):
+    for _ in range(repeats):
+      start = time.perf_counter()
+      run(num_iterations)
+      times.append(time.perf_counter() - start)
+  return statistics.median(times)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument(
+      "--iterations", type=int, nargs="+", default=[1000, 10000, 100000]
+  )
+  parser.add_argument("--max-copying-iterations", type=int, default=10000)
+  parser.add_argument("--repeats", type=int, default=3)
+  args = parser.parse_args()
+  print(
+      f"{'loop':<10} {'iterations':>10} {'copying':>10} {'chain':>10}"
+      f" {'speedup':>8}"
+  )
+  for loop, run in [("operations", run_chain_operations), ("plan", run_plan)]:
+    for num_iterations in args.iterations:
+      chain_time = time_loop(run, num_iterations, "chain", args.repeats)
+      if num_iterations > args.max_copying_iterations:
+        print(
+            f"{loop:<10} {num_iterations:>10} {'-':>10}"
+            f" {chain_time:>9.3f}s {'-':>8}"
+        )
+        continue
+      copying_time = time_loop(run, num_iterations, "copying", args.repeats)
+      print(
+          f"{loop:<10} {num_iterations:>10} {copying_time:>9.3f}s"
+          f" {chain_time:>9.3f}s {copying_time / chain_time:>7.1f}x"
+      )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,207 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the node dispatch of the CaMeL interpreter.
+
+Compares `camel_eval`, which looks up the evaluator of a node in a table, with
+tree-walking dispatch, which tests the node against each node type in turn
+like the `match` statement the table replaced. Both run the same `_eval_*`
+functions. The plans follow the rules of the P-LLM prompt in
+`camel_agent/prompts.py`: tool calls, `query_ai_assistant`, comprehensions
+and `for` loops, without `while`, `def` or side-effect methods.
+
+Run from `python/agents/camel`:
+
+    python -m benchmarks.interpreter_dispatch
+"""
+
+import argparse
+import ast
+import contextlib
+import statistics
+import time
+from typing import Any, Iterator
+from unittest import mock
+
+from camel.camel_library import security_policy
+from camel.camel_library.capabilities import capabilities
+from camel.camel_library.interpreter import camel_value
+from camel.camel_library.interpreter import interpreter
+from camel.camel_library.interpreter import library
+
+_DOCUMENTS = [
+    f"Document {i}: the meeting with team {i % 7} is on day {i % 28 + 1}."
+    for i in range(50)
+]
+
+
+def search_documents(query: str) -> list[str]:
+  """Returns the documents matching the query."""
+  return [d for d in _DOCUMENTS if query in d] or _DOCUMENTS
+
+
+def send_email(to: str, body: str) -> str:
+  """Sends an email."""
+  return f"Email sent to {to}."
+
+
+def query_ai_assistant(query: str, output_schema: str) -> Any:
+  """Stands in for the Q-LLM, without calling a model."""
+  if output_schema == "int":
+    return len(query) % 28 + 1
+  if output_schema == "bool":
+    return len(query) % 2 == 0
+  return query[:20]
+
+
+PLANS = {
+    "tools_and_qllm": """
+documents = search_documents("meeting")
+days = [
+    query_ai_assistant(f"On which day is the meeting in: {d}", "int")
+    for d in documents
+]
+earliest = min(days)
+summary = query_ai_assistant(f"Summarize: {documents[0]}", "str")
+send_email("trusted@fake-email-domain.com", f"{summary} on day {earliest}")
+""",
+    "loop_and_branches": """
+documents = search_documents("team 3")
+count = 0
+report = ""
+for i, d in enumerate(documents):
+    if "team 3" in d and i % 2 == 0:
+        count += 1
+        report = report + d.split(":")[0] + ", "
+    elif len(d) > 40:
+        count = count + 2
+print(count, report)
+""",
+    "comprehensions": """
+documents = search_documents("day")
+words = [w.lower() for d in documents for w in d.split(" ") if len(w) > 3]
+counts = {w: len([x for x in words if x == w]) for w in set(words)}
+top = sorted(counts.items())
+print(top[0], len(top))
+""",
+    "numeric_loop": """
+total = 0
+for i in range(2000):
+    if i > 2:
+        total = total + abs(i - 1000)
+print(total)
+""",
+}
+
+
+def make_namespace() -> camel_value.Namespace:
+  tools = (search_documents, send_email, query_ai_assistant)
+  return library.make_builtins_namespace(
+      variables={
+          f.__name__: camel_value.CaMeLFunction(
+              name=f.__name__,
+              py_callable=f,
+              capabilities=capabilities.Capabilities.camel(),
+              dependencies=(),
+          )
+          for f in tools
+      }
+  )
+
+
+def tree_walking_eval(
+    node: ast.AST,
+    namespace: camel_value.Namespace,
+    tool_calls_chain: Any,
+    dependencies: Any,
+    eval_args: interpreter.EvalArgs,
+) -> interpreter.EvalResult:
+  """Dispatches like the `match` statement: one type test per case."""
+  # pylint: disable-next=protected-access
+  for node_type, evaluator in interpreter._NODE_EVALUATORS.items():
+    if isinstance(node, node_type):
+      return evaluator(node, namespace, tool_calls_chain, dependencies, eval_args)
+  return _table_eval(node, namespace, tool_calls_chain, dependencies, eval_args)
+
+
+_table_eval = interpreter.camel_eval
+
+
+@contextlib.contextmanager
+def dispatch(mode: str) -> Iterator[None]:
+  if mode == "table":
+    yield
+    return
+  with mock.patch.object(interpreter, "camel_eval", tree_walking_eval):
+    yield
+
+
+def count_node_visits(code: str) -> int:
+  visits = 0
+
+  def counting_eval(*args: Any) -> interpreter.EvalResult:
+    nonlocal visits
+    visits += 1
+    return _table_eval(*args)
+
+  with mock.patch.object(interpreter, "camel_eval", counting_eval):
+    run_plan(code)
+  return visits
+
+
+def run_plan(code: str) -> interpreter.EvalResult:
+  eval_args = interpreter.EvalArgs(
+      security_policy.NoSecurityPolicyEngine(),
+      interpreter.DependenciesPropagationMode.NORMAL,
+  )
+  res = interpreter.parse_and_interpret_code(
+      f"```python\n{code}\n```", make_namespace(), [], (), eval_args
+  )
+  if isinstance(res.result, interpreter.result.Error):
+    raise RuntimeError(f"The plan failed: {res.result.error}")
+  return res
+
+
+def time_plan(code: str, mode: str, repeats: int) -> float:
+  """Returns the median time of a plan, in seconds."""
+  times = []
+  with dispatch(mode):
+    run_plan(code)
+    for _ in range(repeats):
+      start = time.perf_counter()
+      run_plan(code)
+      times.append(time.perf_counter() - start)
+  return statistics.median(times)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--repeats", type=int, default=5)
+  args = parser.parse_args()
+  print(
+      f"{'plan':<18} {'visits':>7} {'tree-walking':>13} {'table':>9}"
+      f" {'per visit':>10}"
+  )
+  for name, code in PLANS.items():
+    visits = count_node_visits(code)
+    walking = time_plan(code, "walking", args.repeats)
+    table = time_plan(code, "table", args.repeats)
+    print(
+        f"{name:<18} {visits:>7} {walking * 1e3:>11.1f}ms {table * 1e3:>7.1f}ms"
+        f" {(walking - table) / visits * 1e6:>8.2f}us"
+    )
+
+
+if __name__ == "__main__":
+  main()
@@ -15,11 +15,15 @@
 """CaMeL agent implementation."""
 
 import asyncio
-from collections.abc import Iterator
-import queue
+from collections.abc import Coroutine, Iterator, Sequence
+import concurrent.futures
+import contextvars
+import functools
+import inspect
 import re
 import threading
-from typing import Any, AsyncGenerator, Callable, Optional
+from typing import Any, AsyncGenerator, Callable, Optional, TypeVar
+import weakref
 
 from google.adk import runners
 from google.adk.agents import base_agent
@@ -76,13 +80,50 @@ int_validator = validators.int_validator
 float_validator = validators.float_validator
 bool_validator = validators.bool_validator
 
+_T = TypeVar("_T")
+
+# The event loop awaiting the interpreter, if any. Async tools are run on it.
+_HOST_LOOP: contextvars.ContextVar[asyncio.AbstractEventLoop | None] = (
+    contextvars.ContextVar("camel_host_loop", default=None)
+)
+
+# Runs the concurrent tool calls of all the CaMeL agents, so that agents do not
+# each keep their own threads. Threads are started on the first submitted call.
+_TOOL_CALL_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=8, thread_name_prefix="camel_tool_call"
+)
+
+
+def _as_sync_tool(f: Callable[..., Any]) -> Callable[..., Any]:
+  """Makes async tools callable from the interpreter, which is synchronous."""
+  if not inspect.iscoroutinefunction(f):
+    return f
+
+  @functools.wraps(f)
+  def wrapper(*args: Any, **kwargs: Any) -> Any:
+    host_loop = _HOST_LOOP.get()
+    if host_loop is None:
+      return asyncio.run(f(*args, **kwargs))
+    return asyncio.run_coroutine_threadsafe(
+        f(*args, **kwargs), host_loop
+    ).result()
+
+  return wrapper
+
 
 class QuarantinedLlmService(BaseModel):
-  """Manages synchronous interactions with the Quarantined LLM (Q-LLM)."""
+  """Manages synchronous interactions with the Quarantined LLM (Q-LLM).
+
+  Queries are run on a long-lived event loop owned by the service, so that
+  synchronous callers (i.e., the CaMeL interpreter) do not pay for a new
+  thread and event loop on every query, and so that independent queries can
+  run concurrently.
+  """
 
   model: str | BaseLlm
   name: str
   user_id: str
+  max_concurrency: int
 
   agent: LlmAgent
   runner: runners.InMemoryRunner
@@ -90,11 +131,21 @@ class QuarantinedLlmService(BaseModel):
 
   model_config = {"arbitrary_types_allowed": True}
 
+  _loop: asyncio.AbstractEventLoop | None = pydantic.PrivateAttr(default=None)
+  _loop_thread: threading.Thread | None = pydantic.PrivateAttr(default=None)
+  _loop_lock: threading.Lock = pydantic.PrivateAttr(
+      default_factory=threading.Lock
+  )
+  _semaphores: weakref.WeakKeyDictionary[
+      asyncio.AbstractEventLoop, asyncio.Semaphore
+  ] = pydantic.PrivateAttr(default_factory=weakref.WeakKeyDictionary)
+
   def __init__(
       self,
       model: str | BaseLlm,
       name: str = "QLLM_Service",
       user_id: str = "test_user_id",
+      max_concurrency: int = 8,
   ):
     agent = LlmAgent(
         model=model,
@@ -113,6 +164,7 @@ class QuarantinedLlmService(BaseModel):
         model=model,
         name=name,
         user_id=user_id,
+        max_concurrency=max_concurrency,
         agent=agent,
         runner=runner,
         pattern=pattern,
@@ -121,7 +173,19 @@ class QuarantinedLlmService(BaseModel):
   async def _run_async(
       self, query: str, output_schema: str
   ) -> AsyncGenerator[Event, None]:
-    """Runs a query on the Q-LLM session."""
+    """Runs a query on a fresh Q-LLM session.
+
+    A new session is used for every query so that no state is shared between
+    queries. Creating and deleting in-memory sessions is cheap compared to the
+    model call.
+
+    Args:
+      query: The query to run.
+      output_schema: The output schema of the query.
+
+    Yields:
+      The events generated by the QLLM.
+    """
 
     qllm_session = await self.runner.session_service.create_session(
         app_name=self.name, user_id=self.user_id
@@ -130,31 +194,55 @@ class QuarantinedLlmService(BaseModel):
     qllm_query = f"{query} \n\n output_schema: {output_schema}"
     content = types.Content(role="user", parts=[types.Part(text=qllm_query)])
 
-    async for e in self.runner.run_async(
-        user_id=qllm_session.user_id,  # Session object contains user_id
-        session_id=qllm_session.id,
-        new_message=content,
-    ):
-      yield e
+    try:
+      async for e in self.runner.run_async(
+          user_id=qllm_session.user_id,  # Session object contains user_id
+          session_id=qllm_session.id,
+          new_message=content,
+      ):
+        yield e
+    finally:
+      await self.runner.session_service.delete_session(
+          app_name=self.name, user_id=self.user_id, session_id=qllm_session.id
+      )
 
-    await self.runner.session_service.delete_session(
-        app_name=self.name, user_id=self.user_id, session_id=qllm_session.id
-    )
+  def _get_loop(self) -> asyncio.AbstractEventLoop:
+    """Returns the background event loop, starting it if needed."""
+    with self._loop_lock:
+      if self._loop is None:
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(
+            target=loop.run_forever, name=f"{self.name}_loop", daemon=True
+        )
+        thread.start()
+        self._loop = loop
+        self._loop_thread = thread
+      return self._loop
+
+  def _run_on_loop(self, coro: Coroutine[Any, Any, _T]) -> _T:
+    """Runs a coroutine on the background event loop and waits for it."""
+    return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+  def close(self) -> None:
+    """Stops the background event loop, if it was started."""
+    with self._loop_lock:
+      if self._loop is None:
+        return
+      self._loop.call_soon_threadsafe(self._loop.stop)
+      self._loop_thread.join()
+      self._loop.close()
+      self._loop = None
+      self._loop_thread = None
 
   def run(self, query: str, output_schema: str) -> Iterator[Event]:
-    """Runs the QLLM agent synchronously in a new thread.
+    """Runs the QLLM agent synchronously on the background event loop.
 
     NOTE: This sync interface is solely because the CaMeL interpreter is
-    synchronous and does not suuport the `await` keyword. The
-    `query_ai_assistant` function is a wrapper around this synchronous run
-    method.
+    synchronous and does not suuport the `await` keyword.
 
     NOTE: This method is similar to the `run` method in the `runners.Runner`
     class.
 
-    TODO: Later versions of CaMeL should support asynchronous execution and
-    this method will be removed.
-
     Args:
       query: The query to run.
       output_schema: The output schema of the query.
@@ -162,43 +250,94 @@ class QuarantinedLlmService(BaseModel):
     Yields:
       The events generated by the QLLM.
     """
-    event_queue = queue.Queue()
-
-    async def _invoke_run_async():
-      try:
-        async for e in self._run_async(query, output_schema):
-          event_queue.put(e)
-      finally:
-        event_queue.put(None)
-
-    def _asyncio_thread_main():
-      try:
-        asyncio.run(_invoke_run_async())
-      finally:
-        event_queue.put(None)
-
-    thread = threading.Thread(target=_asyncio_thread_main)
-    thread.start()
-
-    # consumes and re-yield the events from background thread.
-    while True:
-      e = event_queue.get()
-      if e is None:
-        break
-      else:
-        yield e
 
-    thread.join()
+    async def _collect_events() -> list[Event]:
+      return [e async for e in self._run_async(query, output_schema)]
+
+    yield from self._run_on_loop(_collect_events())
+
+  async def query_async(
+      self, query: str, output_schema: str
+  ) -> str | int | float | bool:
+    """Queries the Q-LLM and parses its output according to `output_schema`.
+
+    At most `max_concurrency` queries are sent to the model at the same time.
+
+    Args:
+      query: The query to run.
+      output_schema: The output schema of the query. One of 'int', 'str',
+        'float', 'bool'.
+
+    Returns:
+      The parsed output of the model.
+    """
+    if output_schema not in ["int", "str", "float", "bool"]:
+      raise ValueError(f"Unsupported output schema: `{output_schema}`")
+
+    # Semaphores can only be used from the event loop they were first used on.
+    loop = asyncio.get_running_loop()
+    semaphore = self._semaphores.get(loop)
+    if semaphore is None:
+      semaphore = self._semaphores[loop] = asyncio.Semaphore(
+          self.max_concurrency
+      )
+
+    response_parts = []
+    async with semaphore:
+      async for e in self._run_async(query, output_schema):
+        if e.content and self.pattern.fullmatch(e.author):
+          response_parts.extend(e.content.parts)
+
+    response_text = "".join(map(utils.sanitized_part, response_parts))
+
+    print(
+        f"query_ai_assistant(query='{query}',"
+        f" output_schema='{output_schema}') -> {response_text}",
+        end="\n\n",
+    )
+
+    if output_schema == "int":
+      return int_validator(response_text)
+    elif output_schema == "str":
+      return str(response_text)
+    elif output_schema == "float":
+      return float_validator(response_text)
+    elif output_schema == "bool":
+      return bool_validator(response_text)
+    else:
+      raise ValueError(f"Unsupported output schema: `{output_schema}`")
+
+  async def query_many_async(
+      self, queries: Sequence[tuple[str, str]]
+  ) -> list[str | int | float | bool]:
+    """Runs independent Q-LLM queries concurrently.
+
+    Args:
+      queries: `(query, output_schema)` pairs.
+
+    Returns:
+      The parsed outputs, in the same order as `queries`.
+    """
+    return list(
+        await asyncio.gather(*(self.query_async(q, s) for q, s in queries))
+    )
+
+  def query_many(
+      self, queries: Sequence[tuple[str, str]]
+  ) -> list[str | int | float | bool]:
+    """Synchronous version of `query_many_async`."""
+    return self._run_on_loop(self.query_many_async(queries))
 
   def get_query_ai_assistant_function(
       self,
   ) -> Callable[[str, str], str | int | float | bool]:
     """Returns a function that queries a Large Language Model with `query` and returns the language model's output.
 
-    The `query_ai_assistant` function is a wrapper around the `run` method of
-    the `QuarantinedLlmService` class. `query_ai_assistant` needs the `self`
-    object but it can't be passed as a parameter because it needs to be added to
-    the namespace of the CaMeL interpreter as a standalone built-in function.
+    The `query_ai_assistant` function is a wrapper around the `query_async`
+    method of the `QuarantinedLlmService` class. `query_ai_assistant` needs the
+    `self` object but it can't be passed as a parameter because it needs to be
+    added to the namespace of the CaMeL interpreter as a standalone built-in
+    function.
     """
 
     def query_ai_assistant(
@@ -248,36 +387,7 @@ class QuarantinedLlmService(BaseModel):
         The parsed output of the model.
       """
 
-      if output_schema not in ["int", "str", "float", "bool"]:
-        raise ValueError(f"Unsupported output schema: `{output_schema}`")
-
-      response_parts = []
-
-      for e in self.run(
-          query=query,
-          output_schema=output_schema,
-      ):
-        if e.content and self.pattern.fullmatch(e.author):
-          response_parts.extend(e.content.parts)
-
-      response_text = "".join(map(utils.sanitized_part, response_parts))
-
-      print(
-          f"query_ai_assistant(query='{query}',"
-          f" output_schema='{output_schema}') -> {response_text}",
-          end="\n\n",
-      )
-
-      if output_schema == "int":
-        return int_validator(response_text)
-      elif output_schema == "str":
-        return str(response_text)
-      elif output_schema == "float":
-        return float_validator(response_text)
-      elif output_schema == "bool":
-        return bool_validator(response_text)
-      else:
-        raise ValueError(f"Unsupported output schema: `{output_schema}`")
+      return self._run_on_loop(self.query_async(query, output_schema))
 
     return query_ai_assistant
 
@@ -294,6 +404,11 @@ class CaMelInterpreterService(BaseModel):
 
   model_config = {"arbitrary_types_allowed": True}
 
+  # Runs share `namespace`, so they must not overlap.
+  _execute_lock: threading.Lock = pydantic.PrivateAttr(
+      default_factory=threading.Lock
+  )
+
   def __init__(
       self,
       model: str | BaseLlm,
@@ -321,7 +436,7 @@ class CaMelInterpreterService(BaseModel):
         variables={
             (func_name := f.__name__): CaMeLFunction(
                 name=func_name,
-                py_callable=f,
+                py_callable=_as_sync_tool(f),
                 capabilities=caps,
                 dependencies=deps,
             )
@@ -362,20 +477,23 @@ class CaMelInterpreterService(BaseModel):
     if verbose:
       print(code)
 
-    # The namespace passed here is self.namespace, which is managed internally
-    interpreter_res, updated_namespace, new_tool_calls, new_dependencies = (
-        interpreter.parse_and_interpret_code(
-            code,
-            self.namespace,
-            tool_calls_chain,
-            current_dependencies,
-            self.eval_args,
-        )
-    )
-    self.namespace = updated_namespace  # Update internal namespace state
+    with self._execute_lock:
+      # The namespace passed here is self.namespace, which is managed internally
+      interpreter_res, updated_namespace, new_tool_calls, new_dependencies = (
+          interpreter.parse_and_interpret_code(
+              code,
+              self.namespace,
+              tool_calls_chain,
+              current_dependencies,
+              self.eval_args,
+          )
+      )
+      self.namespace = updated_namespace  # Update internal namespace state
 
-    printed_output = utils.extract_print_output(new_tool_calls)
-    ad_tool_calls = new_tool_calls
+    # The interpreter threads persistent chains, materialize them only once.
+    ad_tool_calls = list(new_tool_calls)
+    new_dependencies = tuple(new_dependencies)
+    printed_output = utils.extract_print_output(ad_tool_calls)
 
     final_eval_output_str = ""
     error_obj = None
@@ -394,6 +512,36 @@ class CaMelInterpreterService(BaseModel):
         new_dependencies,
     )
 
+  async def execute_code_async(
+      self,
+      code: str,
+      tool_calls_chain: list[function_types.FunctionCall],
+      current_dependencies: tuple[Any, ...],
+      verbose: bool = False,
+  ) -> tuple[
+      str,
+      list[function_types.FunctionCall],
+      CaMeLException | None,
+      camel_value.Namespace,
+      tuple[Any, ...],
+  ]:
+    """Like `execute_code`, but runs the interpreter on a worker thread.
+
+    The event loop stays free while the code runs, and async tools are awaited
+    on it.
+    """
+    token = _HOST_LOOP.set(asyncio.get_running_loop())
+    try:
+      return await asyncio.to_thread(
+          self.execute_code,
+          code,
+          tool_calls_chain,
+          current_dependencies,
+          verbose,
+      )
+    finally:
+      _HOST_LOOP.reset(token)
+
 
 class CaMeLInterpreter(BaseAgent):
   """Manages the CaMeL interpreter agent."""
@@ -442,7 +590,7 @@ class CaMeLInterpreter(BaseAgent):
     dependencies = ctx.session.state.get("dependencies") or ()
 
     printed_output, ad_tool_calls, error, _, dependencies = (
-        self.camel_interpreter_service.execute_code(
+        await self.camel_interpreter_service.execute_code_async(
             p_llm_code, function_calls, dependencies
         )
     )  # printed_output, ad_tool_calls, error, namespace, dependencies
@@ -487,6 +635,9 @@ class CaMeLAgent(BaseAgent):
     model: The LLM model to use.
     instruction: The instruction to use.
     tools: The tools to use (py_callable, capabilities, dependencies)
+    concurrent_tool_calls: Whether to run calls to tools without side effects
+      in list comprehensions concurrently, e.g.,
+      `[query_ai_assistant(q, str) for q in queries]`.
   """
 
   model: str | BaseLlm
@@ -508,6 +659,7 @@ class CaMeLAgent(BaseAgent):
       tools: Optional[list[Tool]] = None,
       security_policy_engine: SecurityPolicyEngine = security_policy.NoSecurityPolicyEngine(),
       eval_mode: DependenciesPropagationMode = DependenciesPropagationMode.NORMAL,
+      concurrent_tool_calls: bool = False,
   ):
 
     camel_interpreter_service = CaMelInterpreterService(
@@ -516,6 +668,9 @@ class CaMeLAgent(BaseAgent):
         eval_args=interpreter.EvalArgs(
             eval_mode=eval_mode,
             security_policy_engine=security_policy_engine,
+            call_executor=(
+                _TOOL_CALL_EXECUTOR if concurrent_tool_calls else None
+            ),
         ),
     )
     camel_interpreter_agent = CaMeLInterpreter(
@@ -15,6 +15,7 @@
 """Module containing definitions for the capabilities in CaMeL."""
 
 import dataclasses
+import functools
 from typing import Any, Self
 
 from . import readers
@@ -36,10 +37,14 @@ class Capabilities:
         ^ hash(tuple(self.other_metadata.items()))
     )
 
+  # The capabilities are immutable, so the interpreter shares one instance of
+  # the default and CaMeL capabilities instead of building them for each value.
   @classmethod
+  @functools.cache
   def default(cls) -> Self:
     return cls(frozenset({sources.SourceEnum.USER}), readers.Public())
 
   @classmethod
+  @functools.cache
   def camel(cls) -> Self:
     return cls(frozenset({sources.SourceEnum.CAMEL}), readers.Public())
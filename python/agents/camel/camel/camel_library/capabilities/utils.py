@@ -14,7 +14,10 @@
 
 """Utility functions for capabilities."""
 
-from typing import Any, Protocol
+from collections.abc import Callable
+import operator
+from typing import Any, Protocol, TypeVar
+
 from . import capabilities
 from . import readers
 from . import sources
@@ -33,6 +36,100 @@ class HasDependenciesAndCapabilities(Protocol):
     ...
 
 
+_READERS_MEMO_ATTR = "_camel_all_readers_memo"
+_SOURCES_MEMO_ATTR = "_camel_all_sources_memo"
+
+_L = TypeVar("_L")
+
+
+def _get_memo(value: Any, memo_attr: str, epoch: int) -> Any | None:
+  memo = getattr(value, memo_attr, None)
+  # The memo is only valid for the object that computed it (and not for
+  # shallow copies of it) and if no value has been mutated in the meantime.
+  if memo is None or memo[0] != epoch or memo[1] != id(value):
+    return None
+  return memo[2]
+
+
+def _fold_capabilities(
+    value: HasDependenciesAndCapabilities,
+    visited_objects: frozenset[int],
+    memo_attr: str,
+    project: Callable[[capabilities.Capabilities | None], _L],
+    combine: Callable[[_L, _L], _L],
+) -> tuple[_L, frozenset[int]]:
+  """Combines the capabilities of a value and of all of its dependencies.
+
+  The dependency graph is walked iteratively with a single visited set. The
+  result is memoized on `value` until a value is mutated in place, and walks
+  stop at dependencies that already have a valid memoized result.
+
+  Args:
+    value: The value to start the walk from.
+    visited_objects: Objects that should not be visited.
+    memo_attr: The name of the attribute used to memoize the result.
+    project: Extracts the lattice element from the capabilities of a value.
+      Values without capabilities are passed as `None` and are not walked.
+    combine: Combines two lattice elements.
+
+  Returns:
+    A tuple containing the combined lattice element and the set of visited
+    objects.
+  """
+  epoch = camel_value.mutation_epoch()
+  should_memoize = not visited_objects and isinstance(value, camel_value.Value)
+  if should_memoize:
+    memo = _get_memo(value, memo_attr, epoch)
+    if memo is not None:
+      return memo, frozenset({id(value)})
+  value_capabilities = value.capabilities
+  if value_capabilities is None:
+    return project(None), frozenset()
+  result = project(value_capabilities)
+  if id(value) in visited_objects:
+    # Catch circular dependencies.
+    return result, visited_objects
+  # Keep a reference to visited objects so that their ids can't be reused by
+  # temporary objects created by `get_dependencies`.
+  visited = {id(value): value}
+  to_visit = [value]
+  while to_visit:
+    for dependency in to_visit.pop().get_dependencies()[0]:
+      if isinstance(dependency, readers.Public):
+        continue
+      dependency_id = id(dependency)
+      if dependency_id in visited or dependency_id in visited_objects:
+        continue
+      visited[dependency_id] = dependency
+      memo = _get_memo(dependency, memo_attr, epoch)
+      if memo is not None:
+        result = combine(result, memo)
+        continue
+      dependency_capabilities = dependency.capabilities
+      result = combine(result, project(dependency_capabilities))
+      if dependency_capabilities is not None:
+        to_visit.append(dependency)
+  if should_memoize:
+    setattr(value, memo_attr, (epoch, id(value), result))
+  return result, visited_objects.union(visited)
+
+
+def _project_readers(
+    value_capabilities: capabilities.Capabilities | None,
+) -> readers.Readers[Any]:
+  if value_capabilities is None:
+    return frozenset()
+  return value_capabilities.readers_set
+
+
+def _project_sources(
+    value_capabilities: capabilities.Capabilities | None,
+) -> frozenset[sources.Source]:
+  if value_capabilities is None:
+    return frozenset()
+  return value_capabilities.sources_set
+
+
 def get_all_readers(
     value: HasDependenciesAndCapabilities,
     visited_objects: frozenset[int] = frozenset(),
@@ -46,22 +143,13 @@ def get_all_readers(
   Returns:
     A tuple containing the set of readers and the set of visited objects.
   """
-  value_capabilities = value.capabilities
-  if value_capabilities is None:
-    return frozenset(), frozenset()
-  value_readers = value_capabilities.readers_set
-  if id(value) in visited_objects:
-    # Catch circular dependencies.
-    return value_readers, visited_objects
-  for dependency in value.get_dependencies()[0]:
-    if dependency == readers.Public():
-      continue
-    new_value_readers, visited_objects = get_all_readers(
-        dependency, visited_objects | {id(value)}
-    )
-    if new_value_readers is not None:
-      value_readers &= new_value_readers
-  return value_readers, visited_objects | {id(value)}
+  return _fold_capabilities(
+      value,
+      visited_objects,
+      _READERS_MEMO_ATTR,
+      _project_readers,
+      operator.and_,
+  )
 
 
 def is_public(value: HasDependenciesAndCapabilities):
@@ -94,19 +182,13 @@ def get_all_sources(
   Returns:
     A tuple containing the set of sources and the set of visited objects.
   """
-  value_capabilities = value.capabilities
-  if value_capabilities is None:
-    return frozenset(), frozenset()
-  value_sources = value_capabilities.sources_set
-  # Catch circular dependencies.
-  if id(value) in visited_objects:
-    return value_sources, visited_objects
-  for dependency in value.get_dependencies()[0]:
-    new_value_sources, visited_objects = get_all_sources(
-        dependency, visited_objects | {id(value)}
-    )
-    value_sources |= new_value_sources
-  return value_sources, visited_objects
+  return _fold_capabilities(
+      value,
+      visited_objects,
+      _SOURCES_MEMO_ATTR,
+      _project_sources,
+      operator.or_,
+  )
 
 
 _TRUSTED_SET = frozenset({
@@ -0,0 +1,122 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module containing definitions for an append-only persistent sequence.
+
+The interpreter threads the tool calls chain and the dependencies through every
+evaluation step. Appending to a `Chain` is O(1) and shares the existing
+elements with the original chain, which is left untouched.
+"""
+
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, Generic, Self, TypeVar, overload
+
+_T = TypeVar("_T")
+
+# A node is a `(parent, value)` pair. The root of every chain is `None`.
+_Node = tuple[Any, Any] | None
+
+
+class Chain(Generic[_T], Sequence[_T]):
+  """An immutable sequence with O(1) append and structural sharing."""
+
+  __slots__ = ("_node", "_len", "_materialized")
+
+  def __init__(self, node: _Node = None, length: int = 0) -> None:
+    self._node = node
+    self._len = length
+    self._materialized: tuple[_T, ...] | None = None
+
+  @classmethod
+  def of(cls, items: Iterable[_T]) -> Self:
+    """Returns `items` if it is already a chain, otherwise a new chain."""
+    if isinstance(items, cls):
+      return items
+    return cls().extend(items)
+
+  def append(self, item: _T) -> Self:
+    return type(self)((self._node, item), self._len + 1)
+
+  def extend(self, items: Iterable[_T]) -> Self:
+    node, length = self._node, self._len
+    for item in items:
+      node, length = (node, item), length + 1
+    return type(self)(node, length)
+
+  def remove(self, item: _T) -> Self:
+    """Returns a chain without the most recently appended `item`.
+
+    Items are compared by identity. Only the items appended after `item` are
+    copied.
+
+    Args:
+      item: The item to remove.
+
+    Returns:
+      The new chain.
+
+    Raises:
+      ValueError: If `item` is not in the chain.
+    """
+    node = self._node
+    appended_after = []
+    while node is not None:
+      parent, value = node
+      if value is item:
+        return type(self)(parent, self._len - 1).extend(
+            reversed(appended_after)
+        )
+      appended_after.append(value)
+      node = parent
+    raise ValueError("Chain.remove(x): x not in chain")
+
+  def to_tuple(self) -> tuple[_T, ...]:
+    """Materializes the chain. The result is cached."""
+    if self._materialized is None:
+      items = [None] * self._len
+      node, i = self._node, self._len
+      while node is not None:
+        i -= 1
+        node, items[i] = node
+      self._materialized = tuple(items)
+    return self._materialized
+
+  def to_list(self) -> list[_T]:
+    return list(self.to_tuple())
+
+  def __len__(self) -> int:
+    return self._len
+
+  def __iter__(self) -> Iterator[_T]:
+    return iter(self.to_tuple())
+
+  def __reversed__(self) -> Iterator[_T]:
+    node = self._node
+    while node is not None:
+      node, value = node
+      yield value
+
+  @overload
+  def __getitem__(self, index: int) -> _T:
+    ...
+
+  @overload
+  def __getitem__(self, index: slice) -> tuple[_T, ...]:
+    ...
+
+  def __getitem__(self, index: int | slice) -> _T | tuple[_T, ...]:
+    return self.to_tuple()[index]
+
+  def __repr__(self) -> str:
+    return f"Chain({list(self.to_tuple())!r})"
@@ -15,10 +15,12 @@
 """CaMeL values."""
 
 import ast
+import bisect
 from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping, MutableSequence, Sequence
 import copy
 import dataclasses
 import enum
+import itertools
 import types
 from typing import Any, Generic, Protocol, Self, TypeVar, runtime_checkable
 
@@ -46,6 +48,23 @@ class Namespace:
     return self.variables.get(name)
 
 
+_mutation_epoch = 0
+
+
+def mutation_epoch() -> int:
+  """Returns a counter that is incremented every time a value is mutated."""
+  return _mutation_epoch
+
+
+def mark_mutated() -> None:
+  """Records that a value was mutated in place.
+
+  This invalidates the readers and sources memoized by `capabilities.utils`.
+  """
+  global _mutation_epoch
+  _mutation_epoch += 1
+
+
 _T = TypeVar("_T", bound=Any)
 
 
@@ -519,15 +538,13 @@ class CaMeLIterable(Generic[_IT, _V], Value[_IT]):
   def get_dependencies(
       self, visited_objects: frozenset[int] = frozenset()
   ) -> tuple[tuple["Value", ...], frozenset[int]]:
-    dependencies = self.outer_dependencies
     if id(self) in visited_objects:
-      return dependencies, visited_objects
+      return self.outer_dependencies, visited_objects
+    visited_objects |= {id(self)}
+    dependencies = list(self.outer_dependencies)
     for el in self.python_value:
-      (new_dependencies, visited_objects) = el.get_dependencies(
-          visited_objects | {id(self)}
-      )
-      dependencies += new_dependencies
-    return dependencies, visited_objects | {id(self)}
+      dependencies.extend(el.get_dependencies(visited_objects)[0])
+    return tuple(dependencies), visited_objects
 
   def iterate(self) -> "CaMeLIterator[_V]":
     return CaMeLIterator(
@@ -604,6 +621,7 @@ class CaMeLMutableSequence(Generic[_MCT, _V], CaMeLSequence[_MCT, _V]):
 
   def set_index(self, index: "CaMeLInt", value: _V) -> "CaMeLNone":
     self.python_value[index.raw] = value
+    mark_mutated()
     return CaMeLNone(camel_capabilities.Capabilities.camel(), (self, index))
 
 
@@ -640,16 +658,14 @@ class CaMeLMapping(Generic[_MT, _KV, _VV], Value[_MT]):
   def get_dependencies(
       self, visited_objects: frozenset[int] = frozenset()
   ) -> tuple[tuple["Value", ...], frozenset[int]]:
-    dependencies = self.outer_dependencies
     if id(self) in visited_objects:
-      return dependencies, visited_objects
+      return self.outer_dependencies, visited_objects
     visited_objects |= {id(self)}
+    dependencies = list(self.outer_dependencies)
     for k, v in self.python_value.items():
-      k_dependencies, k_visited_objects = k.get_dependencies(visited_objects)
-      v_dependencies, v_visited_objects = v.get_dependencies(k_visited_objects)
-      dependencies += k_dependencies + v_dependencies
-      visited_objects = v_visited_objects
-    return dependencies, visited_objects
+      dependencies.extend(k.get_dependencies(visited_objects)[0])
+      dependencies.extend(v.get_dependencies(visited_objects)[0])
+    return tuple(dependencies), visited_objects
 
   def get(self, key: _KV) -> _VV:
     dict_key = next((el for el in self.iterate_python() if el.eq(key)), None)
@@ -750,6 +766,7 @@ class CaMeLMutableMapping(
     else:
       new_dict_key = dict_key
     self.python_value[new_dict_key] = value
+    mark_mutated()
     return CaMeLNone(camel_capabilities.Capabilities.camel(), (self,))
 
 
@@ -1134,8 +1151,11 @@ class CaMeLInt(
     )
 
 
-class _Char(TotallyOrdered[str]):
-  """Represents a single character in CaMeL."""
+class _Span(Value[str]):
+  """Represents a run of characters of a `CaMeLStr` in CaMeL.
+
+  All the characters in a span share the same capabilities and dependencies.
+  """
 
   def __init__(
       self,
@@ -1147,44 +1167,81 @@ class _Char(TotallyOrdered[str]):
     self._capabilities = capabilities
     self.outer_dependencies = dependencies
 
-  def __gt__(self, other) -> bool:
-    if not isinstance(other, _Char):
-      return NotImplemented
-    return self.python_value > other.python_value
-
-  def __lt__(self, other) -> bool:
-    if not isinstance(other, _Char):
-      return NotImplemented
-    return self.python_value < other.python_value
-
   def freeze(self) -> CaMeLNone:
     return CaMeLNone(
         camel_capabilities.Capabilities.camel(), (self,)
     )  # already immutable
 
 
+def _span_metadata_key(span: _Span) -> tuple[Any, ...]:
+  return (span.capabilities, tuple(id(d) for d in span.outer_dependencies))
+
+
+def _merge_spans(spans: Iterable[_Span]) -> tuple[_Span, ...]:
+  """Merges adjacent spans that have the same capabilities and dependencies."""
+  merged = []
+  for _, group in itertools.groupby(
+      (span for span in spans if span.python_value), key=_span_metadata_key
+  ):
+    group = list(group)
+    if len(group) == 1:
+      merged.append(group[0])
+    else:
+      merged.append(
+          _Span(
+              "".join(span.python_value for span in group),
+              group[0].capabilities,
+              group[0].outer_dependencies,
+          )
+      )
+  return tuple(merged)
+
+
 class CaMeLStr(
-    TotallyOrdered[tuple[_Char, ...]],
+    TotallyOrdered[str],
     HasAttrs,
-    CaMeLSequence[tuple[_Char, ...], _Char],
+    CaMeLSequence[str, "CaMeLStr"],
     SupportsAdd["CaMeLStr"],
     SupportsMult["CaMeLStr"],
     SupportsRMult["CaMeLStr"],
 ):
-  """Represents a string in CaMeL."""
+  """Represents a string in CaMeL.
+
+  The string is stored as a Python `str`. The capabilities and dependencies of
+  the characters are stored per span of consecutive characters that share them.
+  """
 
   def __init__(
       self,
-      string: Sequence[_Char],
+      string: str,
       capabilities: camel_capabilities.Capabilities,
       dependencies: tuple[Value, ...],
+      spans: Iterable[_Span] | None = None,
   ) -> None:
-    self.python_value = tuple(string)
+    self.python_value = string
     self._capabilities = capabilities
     self.outer_dependencies = dependencies
+    if spans is None:
+      spans = (_Span(string, capabilities, dependencies),) if string else ()
+    self._spans = tuple(spans)
+    self._span_starts = tuple(
+        itertools.accumulate(
+            (len(span.python_value) for span in self._spans[:-1]), initial=0
+        )
+    )
+
+  def get_dependencies(
+      self, visited_objects: frozenset[int] = frozenset()
+  ) -> tuple[tuple["Value", ...], frozenset[int]]:
+    dependencies = self.outer_dependencies
+    if id(self) in visited_objects:
+      return dependencies, visited_objects
+    for span in self._spans:
+      dependencies += span.outer_dependencies
+    return dependencies, visited_objects | {id(self)}
 
   def contains(self, other: Value) -> "CaMeLBool":
-    if not isinstance(other, CaMeLStr | _Char):
+    if not isinstance(other, CaMeLStr):
       raise TypeError(
           f"in <string>' requires string as left operand, not {other.raw_type}"
       )
@@ -1200,6 +1257,11 @@ class CaMeLStr(
         (*self.get_dependencies()[0], other),
     )
 
+  def eq(self, value: "Value") -> "CaMeLBool":
+    if isinstance(value, CaMeLStr) and self.python_value == value.python_value:
+      return CaMeLTrue(camel_capabilities.Capabilities.camel(), (self, value))
+    return CaMeLFalse(camel_capabilities.Capabilities.camel(), (self, value))
+
   @classmethod
   def from_raw(
       cls,
@@ -1207,10 +1269,88 @@ class CaMeLStr(
       capabilities: camel_capabilities.Capabilities,
       dependencies: tuple[Value, ...],
   ) -> Self:
+    return cls(string, capabilities, dependencies)
+
+  @classmethod
+  def from_parts(
+      cls,
+      parts: Iterable["CaMeLStr"],
+      capabilities: camel_capabilities.Capabilities,
+      dependencies: tuple[Value, ...],
+  ) -> Self:
+    """Concatenates strings, preserving the capabilities of their characters.
+
+    Args:
+        parts: The strings to concatenate.
+        capabilities: The capabilities of the resulting string.
+        dependencies: The dependencies of the resulting string.
+
+    Returns:
+        The concatenated string.
+    """
+    parts = tuple(parts)
     return cls(
-        tuple(_Char(c, capabilities, dependencies) for c in string),
+        "".join(part.python_value for part in parts),
         capabilities,
         dependencies,
+        _merge_spans(span for part in parts for span in part._spans),
+    )
+
+  def _span_at(self, index: int) -> _Span:
+    return self._spans[bisect.bisect_right(self._span_starts, index) - 1]
+
+  def _slice_spans(self, s: slice) -> tuple[_Span, ...]:
+    start, stop, step = s.indices(len(self.python_value))
+    if step != 1:
+      return _merge_spans(
+          _Span(self.python_value[i], span.capabilities, span.outer_dependencies)
+          for i in range(start, stop, step)
+          for span in (self._span_at(i),)
+      )
+    spans = []
+    for span_start, span in zip(self._span_starts, self._spans):
+      span_stop = span_start + len(span.python_value)
+      lo, hi = max(start, span_start), min(stop, span_stop)
+      if lo >= hi:
+        continue
+      if lo == span_start and hi == span_stop:
+        spans.append(span)
+      else:
+        spans.append(
+            _Span(
+                span.python_value[lo - span_start : hi - span_start],
+                span.capabilities,
+                span.outer_dependencies,
+            )
+        )
+    return tuple(spans)
+
+  def index(self, index: "CaMeLInt") -> "CaMeLStr":
+    char = self.python_value[index.raw]
+    span = self._span_at(index.raw % len(self.python_value))
+    return CaMeLStr(
+        char, span.capabilities, (*span.outer_dependencies, self, index)
+    )
+
+  def slice(
+      self,
+      start: "CaMeLInt | CaMeLNone",
+      end: "CaMeLInt | CaMeLNone",
+      step: "CaMeLInt | CaMeLNone",
+  ) -> Self:
+    s = slice(start.raw, end.raw, step.raw)
+    return type(self)(
+        self.python_value[s],
+        self._capabilities,
+        (*self.outer_dependencies, self, start, end, step),
+        self._slice_spans(s),
+    )
+
+  def len(self) -> "CaMeLInt":
+    return CaMeLInt(
+        len(self.python_value),
+        camel_capabilities.Capabilities.camel(),
+        (self, *self._spans),
     )
 
   def attr(self, name) -> Value | None:
@@ -1232,18 +1372,21 @@ class CaMeLStr(
 
   @property
   def raw(self) -> str:
-    s = ""
-    for c in self.python_value:
-      s += c.python_value
-    return s
+    return self.python_value
+
+  def iterate_python(self) -> Iterator["CaMeLStr"]:
+    for span in self._spans:
+      for c in span.python_value:
+        yield CaMeLStr(
+            c,
+            camel_capabilities.Capabilities.camel(),
+            (self,),
+            (_Span(c, span.capabilities, span.outer_dependencies),),
+        )
 
   def iterate(self) -> CaMeLIterator["CaMeLStr"]:
-    strings_iterator = iter(
-        CaMeLStr([c], camel_capabilities.Capabilities.camel(), (self,))
-        for c in self.python_value
-    )
     return CaMeLIterator(
-        strings_iterator, camel_capabilities.Capabilities.camel(), (self,)
+        self.iterate_python(), camel_capabilities.Capabilities.camel(), (self,)
     )
 
   @property
@@ -1253,10 +1396,8 @@ class CaMeLStr(
   def add(self, other: Value) -> "CaMeLStr | types.NotImplementedType":
     if not isinstance(other, CaMeLStr):
       return NotImplemented
-    return CaMeLStr(
-        self.python_value + other.python_value,
-        camel_capabilities.Capabilities.camel(),
-        (self, other),
+    return CaMeLStr.from_parts(
+        (self, other), camel_capabilities.Capabilities.camel(), (self, other)
     )
 
   def mult(self, other: Value) -> "CaMeLStr | types.NotImplementedType":
@@ -1266,6 +1407,7 @@ class CaMeLStr(
         self.python_value * other.python_value,
         camel_capabilities.Capabilities.camel(),
         (self, other),
+        _merge_spans(self._spans * max(other.python_value, 0)),
     )
 
   r_mult = mult
@@ -1713,6 +1855,7 @@ class CaMeLClassInstance(Generic[_T], HasSetField[_T]):
     if self._frozen:
       raise ValueError("instance is frozen")
     setattr(self.python_value, name, value)
+    mark_mutated()
     return CaMeLNone(camel_capabilities.Capabilities.default(), ())
 
   def attr(self, name: str) -> Value | None:
@@ -1781,6 +1924,7 @@ class ValueAsWrapper(Generic[_T], CaMeLClassInstance[_T]):
     if self._frozen:
       raise ValueError("instance is frozen")
     setattr(self.python_value, name, value.raw)
+    mark_mutated()
     return CaMeLNone(camel_capabilities.Capabilities.default(), ())
 
   def freeze(self) -> CaMeLNone:
@@ -21,15 +21,19 @@ calls would create circular imports.
 """
 
 import ast
+import concurrent.futures
 from collections.abc import Callable, Iterable, Mapping, Sequence
+import contextvars
 import dataclasses
 import enum
+import functools
 import re
 from typing import Any, Generic, NamedTuple, TypeAlias, TypeVar
 
 import pydantic
 import pydantic.fields
 
+from .. import chain
 from .. import function_types
 from .. import result
 from .. import security_policy
@@ -137,6 +141,17 @@ class EvalArgs:
   """The list of security policies to apply."""
   eval_mode: DependenciesPropagationMode
   """The evaluation mode, either `STRICT` or `NORMAL`."""
+  call_executor: concurrent.futures.Executor | None = None
+  """If set, independent calls to tools without side effects in list
+  comprehensions are run concurrently on this executor."""
+  deferred_calls: (
+      list[tuple[camel_value.CaMeLNone, "_PreparedCall"]] | None
+  ) = dataclasses.field(default=None, repr=False, compare=False)
+  """Calls collected by a list comprehension to be run on `call_executor`."""
+  deferred_call_node: ast.Call | None = dataclasses.field(
+      default=None, repr=False, compare=False
+  )
+  """The call node whose evaluation is collected in `deferred_calls`."""
 
 
 def _eval_formatted_value(
@@ -332,7 +347,7 @@ def _eval_iterable(
           # This is only the container capabilities of v as the elements'
           # capabilities are being preserved in the elements themselves
           iter_dependencies = (*iter_dependencies, v)
-          evaled_elts.extend(v.python_value)
+          evaled_elts.extend(v.iterate_python())
         case _:
           raise ValueError("Invalid eval result type")
     else:
@@ -402,14 +417,12 @@ def _eval_joined_str(
     case _:
       raise ValueError("Invalid eval result type")
 
-  string = camel_value.CaMeLStr.from_raw(
-      "", camel_capabilities.Capabilities.camel(), ()
+  string = camel_value.CaMeLStr.from_parts(
+      (d.string() for d in evaled_data.iterate_python()),
+      camel_capabilities.Capabilities.camel(),
+      (),
   )
 
-  for d in evaled_data.iterate_python():
-    string.python_value = (*string.python_value, *d.string().python_value)
-    # string = string.new_with_dependencies((d,))
-
   return EvalResult(
       result.Ok(string), namespace, tool_calls_chain, dependencies
   )
@@ -1060,7 +1073,9 @@ def _assign_tuple_list(
         tool_calls_chain,
         dependencies,
     )
-  data_to_assign: Sequence[camel_value.Value[Any]] = v.python_value
+  data_to_assign: Sequence[camel_value.Value[Any]] = tuple(
+      v.iterate_python()
+  )
   if len(names.elts) != len(data_to_assign):
     return EvalResult(
         result.Error(
@@ -1747,6 +1762,92 @@ def _eval_comprehensions(
   ), (*evaled_iterators, iterable)
 
 
+def _can_defer_calls(node: ast.ListComp, eval_args: EvalArgs) -> bool:
+  """Whether the calls in `node.elt` can be run concurrently.
+
+  This is the case for comprehensions like `[f(x) for x in xs if cond(x)]`
+  where `f` has no side effects and no other call happens while iterating, so
+  that the outputs of `f` can't influence the rest of the evaluation.
+
+  Args:
+      node: The list comprehension.
+      eval_args: The evaluation arguments.
+
+  Returns:
+      Whether the calls can be deferred.
+  """
+  if eval_args.call_executor is None or eval_args.deferred_calls is not None:
+    return False
+  elt = node.elt
+  if not (
+      isinstance(elt, ast.Call)
+      and isinstance(elt.func, ast.Name)
+      and elt.func.id in _no_side_effect_tools(eval_args)
+  ):
+    return False
+  evaluated_per_element = [
+      *elt.args,
+      *(keyword.value for keyword in elt.keywords),
+      *(if_expr for generator in node.generators for if_expr in generator.ifs),
+      *(generator.iter for generator in node.generators[1:]),
+  ]
+  return not any(
+      isinstance(child, ast.Call | ast.Lambda)
+      for expr in evaluated_per_element
+      for child in ast.walk(expr)
+  )
+
+
+def _run_deferred_calls(
+    node: ast.ListComp,
+    deferred_calls: list[tuple[camel_value.CaMeLNone, "_PreparedCall"]],
+    evaled_list: camel_value.CaMeLList[Any],
+    tool_calls_chain: Sequence[function_types.FunctionCall[Any]],
+    eval_args: EvalArgs,
+) -> tuple[
+    result.Result[None, CaMeLException[Exception]],
+    Sequence[function_types.FunctionCall[Any]],
+]:
+  """Runs the calls collected while evaluating a list comprehension.
+
+  The calls are submitted all at once to `eval_args.call_executor`, then their
+  outputs are recorded in order, as if the calls had been made sequentially.
+
+  Args:
+      node: The list comprehension.
+      deferred_calls: The placeholders and the calls that produce their values.
+      evaled_list: The list containing the placeholders, updated in place.
+      tool_calls_chain: The current chain of tool calls.
+      eval_args: The evaluation arguments.
+
+  Returns:
+      The first error raised by a call, if any, and the updated chain of tool
+      calls.
+  """
+  assert eval_args.call_executor is not None
+  futures = [
+      eval_args.call_executor.submit(
+          contextvars.copy_context().run, _invoke_call, prepared
+      )
+      for _, prepared in deferred_calls
+  ]
+  outputs: dict[int, camel_value.Value[Any]] = {}
+  for (placeholder, prepared), future in zip(deferred_calls, futures):
+    call_res, _, tool_calls_chain, _ = _finish_call(
+        node.elt, prepared, future.result(), tool_calls_chain
+    )
+    if isinstance(call_res, result.Error):
+      for remaining in futures:
+        remaining.cancel()
+      return call_res, tool_calls_chain
+    outputs[id(placeholder)] = call_res.value
+  evaled_list.python_value[:] = [
+      outputs.get(id(value), value) for value in evaled_list.python_value
+  ]
+  camel_value.mark_mutated()
+  return result.Ok(None), tool_calls_chain
+
+
 def _eval_list_comp(
     node: ast.ListComp,
     namespace: camel_value.Namespace,
@@ -1766,6 +1867,11 @@ def _eval_list_comp(
   Returns:
       The result of the evaluation.
   """
+  comprehension_eval_args = eval_args
+  if _can_defer_calls(node, eval_args):
+    comprehension_eval_args = dataclasses.replace(
+        eval_args, deferred_calls=[], deferred_call_node=node.elt
+    )
   (
       evaled_comprehension_res,
       namespace,
@@ -1777,7 +1883,7 @@ def _eval_list_comp(
       namespace,
       tool_calls_chain,
       dependencies,
-      eval_args,
+      comprehension_eval_args,
       (),
   )
   match evaled_comprehension_res:
@@ -1793,6 +1899,22 @@ def _eval_list_comp(
     case _:
       raise ValueError("Invalid eval result type")
 
+  if comprehension_eval_args.deferred_calls:
+    call_res, tool_calls_chain = _run_deferred_calls(
+        node,
+        comprehension_eval_args.deferred_calls,
+        evaled_comprehension.python_value[0],
+        tool_calls_chain,
+        eval_args,
+    )
+    if isinstance(call_res, result.Error):
+      return EvalResult(
+          _update_error_with_node(call_res, node),
+          namespace,
+          tool_calls_chain,
+          dependencies,
+      )
+
   return EvalResult(
       result.Ok(
           evaled_comprehension.python_value[0].new_with_dependencies(
@@ -2578,7 +2700,7 @@ def _eval_if(
         node.body,
         namespace,
         tool_calls_chain,
-        [*dependencies, test],
+        chain.Chain.of(dependencies).append(test),
         eval_args,
     )
   elif node.orelse:
@@ -2586,7 +2708,7 @@ def _eval_if(
         node.orelse,
         namespace,
         tool_calls_chain,
-        [*dependencies, test],
+        chain.Chain.of(dependencies).append(test),
         eval_args,
     )
   # If/else statements can't be assigned, so what is returned is meaningless.
@@ -2600,8 +2722,7 @@ def _eval_if(
         dependencies,
     )
 
-  dependencies = list(dependencies)
-  dependencies.remove(test)
+  dependencies = chain.Chain.of(dependencies).remove(test)
 
   if isinstance(body_res, result.Error):
     return EvalResult(body_res, namespace, tool_calls_chain, dependencies)
@@ -2646,7 +2767,7 @@ def _eval_if_exp(
     case _:
       raise ValueError("Invalid eval result type")
 
-  inner_dependencies = [*dependencies, test]
+  inner_dependencies = chain.Chain.of(dependencies).append(test)
   if test.truth().python_value:
     body_res, namespace, tool_calls_chain, dependencies = camel_eval(
         node.body,
@@ -2660,8 +2781,7 @@ def _eval_if_exp(
         node.orelse, namespace, tool_calls_chain, inner_dependencies, eval_args
     )
 
-  dependencies = list(dependencies)
-  dependencies.remove(test)
+  dependencies = chain.Chain.of(dependencies).remove(test)
 
   if isinstance(body_res, result.Error):
     return EvalResult(body_res, namespace, tool_calls_chain, dependencies)
@@ -2739,7 +2859,7 @@ def _eval_for(
         dependencies,
     )
 
-  dependencies = [*dependencies, iterable]
+  dependencies = chain.Chain.of(dependencies).append(iterable)
   for elt in iterable.iterate_python():
     assign_res, namespace, tool_calls_chain, dependencies = _assign(
         elt,
@@ -2768,8 +2888,7 @@ def _eval_for(
           final_val_res, namespace, tool_calls_chain, dependencies
       )
 
-  dependencies = list(dependencies)
-  dependencies.remove(iterable)
+  dependencies = chain.Chain.of(dependencies).remove(iterable)
 
   return EvalResult(
       result.Ok(
@@ -3017,14 +3136,31 @@ def _eval_keywords(
   )
 
 
-def _eval_call(
+class _PreparedCall(NamedTuple):
+  """A call whose callee and arguments are evaluated and allowed to run."""
+
+  evaled_fn: camel_value.CaMeLCallable[Any]
+  evaled_args: camel_value.CaMeLTuple
+  evaled_kwargs: camel_value.CaMeLDict[camel_value.CaMeLStr, Any]
+  namespace: camel_value.Namespace
+  tool_calls_chain: Sequence[function_types.FunctionCall[Any]]
+  dependencies: Iterable[camel_value.Value[Any]]
+
+
+def _no_side_effect_tools(eval_args: EvalArgs) -> frozenset[str]:
+  return security_policy.NO_SIDE_EFFECT_TOOLS.union(
+      eval_args.security_policy_engine.no_side_effect_tools
+  )
+
+
+def _prepare_call(
     node: ast.Call,
     namespace: camel_value.Namespace,
     tool_calls_chain: Sequence[function_types.FunctionCall[Any]],
     dependencies: Iterable[camel_value.Value[Any]],
     eval_args: EvalArgs,
-) -> EvalResult:
-  """Evaluates a function call.
+) -> "EvalResult | _PreparedCall":
+  """Evaluates the callee and the arguments of a call and checks the policies.
 
   Args:
       node: The AST node representing the function call.
@@ -3034,7 +3170,7 @@ def _eval_call(
       eval_args: The evaluation arguments.
 
   Returns:
-      The result of the evaluation.
+      An `EvalResult` if the evaluation failed, the prepared call otherwise.
   """
   # Evaluation order is:
   # - Object being called
@@ -3132,24 +3268,108 @@ def _eval_call(
       evaled_fn.name().raw == "query_ai_assistant"
       and eval_args.eval_mode == DependenciesPropagationMode.STRICT
   ):
-    dependencies = [
-        *dependencies,
-        *evaled_args.python_value,
-        *evaled_kwargs.python_value.values(),
-    ]
+    dependencies = (
+        chain.Chain.of(dependencies)
+        .extend(evaled_args.python_value)
+        .extend(evaled_kwargs.python_value.values())
+    )
 
+  return _PreparedCall(
+      evaled_fn,
+      evaled_args,
+      evaled_kwargs,
+      namespace,
+      tool_calls_chain,
+      dependencies,
+  )
+
+
+def _invoke_call(
+    prepared: _PreparedCall,
+) -> result.Result[tuple[camel_value.Value[Any], dict[str, Any]], Exception]:
+  """Calls a prepared function.
+
+  This does not touch the interpreter state, so it can run on another thread.
+
+  Args:
+      prepared: The prepared call.
+
+  Returns:
+      The output of `CaMeLCallable.call`, or the exception it raised.
+  """
   try:
-    ret_res, args_by_keyword = evaled_fn.call(
-        evaled_args, evaled_kwargs, namespace
+    return result.Ok(
+        prepared.evaled_fn.call(
+            prepared.evaled_args, prepared.evaled_kwargs, prepared.namespace
+        )
     )
   except Exception as e:  # pylint: disable=broad-except  # catch all exceptions to be able to return them to the P-LLM
-    if isinstance(e, library.NotEnoughInformationError):
+    return result.Error(e)
+
+
+def _finish_call(
+    node: ast.Call,
+    prepared: _PreparedCall,
+    call_res: result.Result[
+        tuple[camel_value.Value[Any], dict[str, Any]], Exception
+    ],
+    tool_calls_chain: Sequence[function_types.FunctionCall[Any]],
+) -> EvalResult:
+  """Wraps the outcome of a call and appends it to the tool calls chain.
+
+  Args:
+      node: The AST node representing the function call.
+      prepared: The prepared call.
+      call_res: The outcome of `_invoke_call`.
+      tool_calls_chain: The chain of tool calls to append the call to.
+
+  Returns:
+      The result of the evaluation.
+  """
+  evaled_fn, evaled_args, evaled_kwargs, namespace, _, dependencies = prepared
+  match call_res:
+    case result.Error(e):
+      if isinstance(e, library.NotEnoughInformationError):
+        return EvalResult(
+            result.Error(
+                CaMeLException(
+                    e,
+                    (node,),
+                    (evaled_args, evaled_kwargs),
+                    camel_capabilities.Capabilities(
+                        sources_set=frozenset(
+                            {sources.Tool(evaled_fn.name().raw)}
+                        ),
+                        readers_set=readers.Public(),
+                    ),
+                )
+            ),
+            namespace,
+            tool_calls_chain,
+            dependencies,
+        )
+      if isinstance(e, RecursionError):
+        # This should not silently fail. There could be recursion issues when
+        # the object refers to another object and vice-versa, or an object
+        # refers to itself
+        # Same for errors in the unprivileged LLM
+        raise e
+      raw_args = []
+      for arg in e.args:
+        if isinstance(arg, camel_value.Value):
+          raw_args.append(arg.raw)
+        else:
+          raw_args.append(arg)
+      try:
+        exception = type(e)(*raw_args)
+      except TypeError:
+        exception = e
       return EvalResult(
           result.Error(
               CaMeLException(
-                  e,
+                  exception,
                   (node,),
-                  (evaled_args, evaled_kwargs),
+                  (evaled_fn, evaled_args, evaled_kwargs),
                   camel_capabilities.Capabilities(
                       sources_set=frozenset(
                           {sources.Tool(evaled_fn.name().raw)}
@@ -3162,38 +3382,10 @@ def _eval_call(
           tool_calls_chain,
           dependencies,
       )
-    if isinstance(e, RecursionError):
-      # This should not silently fail. There could be recursion issues when the
-      # object refers to another object and vice-versa, or an object refers to
-      # itself
-      # Same for errors in the unprivileged LLM
-      raise e
-    raw_args = []
-    for arg in e.args:
-      if isinstance(arg, camel_value.Value):
-        raw_args.append(arg.raw)
-      else:
-        raw_args.append(arg)
-    try:
-      exception = type(e)(*raw_args)
-    except TypeError:
-      exception = e
-    return EvalResult(
-        result.Error(
-            CaMeLException(
-                exception,
-                (node,),
-                (evaled_fn, evaled_args, evaled_kwargs),
-                camel_capabilities.Capabilities(
-                    sources_set=frozenset({sources.Tool(evaled_fn.name().raw)}),
-                    readers_set=readers.Public(),
-                ),
-            )
-        ),
-        namespace,
-        tool_calls_chain,
-        dependencies,
-    )
+    case result.Ok((ret_res, args_by_keyword)):
+      pass
+    case _:
+      raise ValueError("Invalid call result type")
 
   receiver = evaled_fn.receiver()
   if receiver is not None:
@@ -3221,11 +3413,59 @@ def _eval_call(
   return EvalResult(
       result.Ok(ret_res),
       namespace,
-      [*tool_calls_chain, tool_call],
+      chain.Chain.of(tool_calls_chain).append(tool_call),
       dependencies,
   )
 
 
+def _eval_call(
+    node: ast.Call,
+    namespace: camel_value.Namespace,
+    tool_calls_chain: Sequence[function_types.FunctionCall[Any]],
+    dependencies: Iterable[camel_value.Value[Any]],
+    eval_args: EvalArgs,
+) -> EvalResult:
+  """Evaluates a function call.
+
+  Args:
+      node: The AST node representing the function call.
+      namespace: The current namespace.
+      tool_calls_chain: The current chain of tool calls.
+      dependencies: The current dependencies.
+      eval_args: The evaluation arguments.
+
+  Returns:
+      The result of the evaluation.
+  """
+  prepared = _prepare_call(
+      node, namespace, tool_calls_chain, dependencies, eval_args
+  )
+  if isinstance(prepared, EvalResult):
+    return prepared
+
+  if (
+      eval_args.deferred_calls is not None
+      and node is eval_args.deferred_call_node
+      and prepared.evaled_fn.name().raw in _no_side_effect_tools(eval_args)
+  ):
+    # The call is dispatched later by `_eval_list_comp`, which replaces the
+    # placeholder with the output of the call.
+    placeholder = camel_value.CaMeLNone(
+        camel_capabilities.Capabilities.camel(), ()
+    )
+    eval_args.deferred_calls.append((placeholder, prepared))
+    return EvalResult(
+        result.Ok(placeholder),
+        prepared.namespace,
+        prepared.tool_calls_chain,
+        prepared.dependencies,
+    )
+
+  return _finish_call(
+      node, prepared, _invoke_call(prepared), prepared.tool_calls_chain
+  )
+
+
 def _eval_expr_list(
     nodes: Iterable[ast.expr],
     namespace: camel_value.Namespace,
@@ -3602,6 +3842,50 @@ def _eval_function_def(
   )
 
 
+# Evaluation functions of the supported nodes, keyed by node type. Looking up
+# the type of a node in a dict is much cheaper than going through the `match`
+# statement in `camel_eval` on every node visit.
+_NODE_EVALUATORS: dict[type[ast.AST], Callable[..., EvalResult]] = {
+    # Literals
+    ast.Constant: _eval_constant,
+    ast.FormattedValue: _eval_formatted_value,
+    ast.JoinedStr: _eval_joined_str,
+    ast.List: _eval_list,
+    ast.Tuple: _eval_tuple,
+    ast.Set: _eval_set,
+    ast.Dict: _eval_dict,
+    # namespace, attribute and subscript loading
+    ast.Name: _eval_name_load,
+    ast.Attribute: _eval_attribute_load,
+    ast.Subscript: _eval_subscript_load,
+    # Statements
+    ast.Assign: _eval_assign,
+    ast.AnnAssign: _eval_ann_assign,
+    ast.AugAssign: _eval_aug_assign,
+    # Comprehensions
+    ast.ListComp: _eval_list_comp,
+    ast.SetComp: _eval_set_comp,
+    ast.DictComp: _eval_dict_comp,
+    # Expressions
+    ast.Expr: _eval_expr,
+    ast.NamedExpr: _eval_named_expr,
+    ast.UnaryOp: _eval_unary_op,
+    ast.BinOp: _eval_bin_op,
+    ast.BoolOp: _eval_bool_op,
+    ast.Compare: _eval_compare,
+    # Control flow
+    ast.If: _eval_if,
+    ast.IfExp: _eval_if_exp,
+    ast.For: _eval_for,
+    ast.Call: _eval_call,
+    # Rest
+    ast.Module: _eval_module,
+    ast.ClassDef: _eval_class_def,
+    ast.FunctionDef: _eval_function_def,
+    ast.Raise: _eval_raise,
+}
+
+
 def camel_eval(
     node: ast.AST,
     namespace: camel_value.Namespace,
@@ -3610,49 +3894,10 @@ def camel_eval(
     eval_args: EvalArgs,
 ) -> EvalResult:
   """Interprets the given AST enforcing security policies."""
+  evaluator = _NODE_EVALUATORS.get(type(node))
+  if evaluator is not None:
+    return evaluator(node, namespace, tool_calls_chain, dependencies, eval_args)
   match node:
-    # Literals
-    case ast.Constant():
-      return _eval_constant(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.FormattedValue():
-      return _eval_formatted_value(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.JoinedStr():
-      return _eval_joined_str(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.List():
-      return _eval_list(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.Tuple():
-      return _eval_tuple(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.Set():
-      return _eval_set(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.Dict():
-      return _eval_dict(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    # namespace, attribute and subscript loading
-    case ast.Name():
-      return _eval_name_load(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.Attribute():
-      return _eval_attribute_load(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.Subscript():
-      return _eval_subscript_load(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
     case ast.Slice():
       return EvalResult(
           _make_not_implemented_error(
@@ -3663,91 +3908,6 @@ def camel_eval(
           tool_calls_chain,
           dependencies,
       )
-    # Statements
-    case ast.Assign():
-      return _eval_assign(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.AnnAssign():
-      return _eval_ann_assign(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.AugAssign():
-      return _eval_aug_assign(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    # Comprehensions
-    case ast.ListComp():
-      return _eval_list_comp(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.SetComp():
-      return _eval_set_comp(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.DictComp():
-      return _eval_dict_comp(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    # Expressions
-    case ast.Expr():
-      return _eval_expr(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.NamedExpr():
-      return _eval_named_expr(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.UnaryOp():
-      return _eval_unary_op(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.BinOp():
-      return _eval_bin_op(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.BoolOp():
-      return _eval_bool_op(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.Compare():
-      return _eval_compare(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    # Control flow
-    case ast.If():
-      return _eval_if(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.IfExp():
-      return _eval_if_exp(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.For():
-      return _eval_for(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.Call():
-      return _eval_call(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    # Rest
-    case ast.Module():
-      return _eval_module(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.ClassDef():
-      return _eval_class_def(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.FunctionDef():
-      return _eval_function_def(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
-    case ast.Raise():
-      return _eval_raise(
-          node, namespace, tool_calls_chain, dependencies, eval_args
-      )
     case ast.Pass():
       return EvalResult(
           result.Ok(
@@ -4003,6 +4163,13 @@ def extract_code_block(markdown_text: str) -> str:
   return code_fences[0]
 
 
+@functools.lru_cache(maxsize=256)
+def _parse_code(code: str) -> ast.Module:
+  # The AST is never mutated by the interpreter, so it can be shared between
+  # runs of the same code (e.g., when the P-LLM re-emits a plan).
+  return ast.parse(code)
+
+
 def parse_and_interpret_code(
     code: str,
     namespace: camel_value.Namespace,
@@ -4038,7 +4205,7 @@ def parse_and_interpret_code(
         dependencies,
     )
   try:
-    parsed_code = ast.parse(code)
+    parsed_code = _parse_code(code)
   except SyntaxError as e:
     error_nodes: tuple[ExceptionASTNodes, ...] = (
         ast.expr(
@@ -17,7 +17,12 @@
 import collections.abc
 import dataclasses
 import fnmatch
+import re
+import time
 import typing
+import weakref
+
+from opentelemetry import trace
 
 from .capabilities import readers
 from .capabilities import utils as capabilities_utils
@@ -31,12 +36,43 @@ class Allowed:
   ...
 
 
-@dataclasses.dataclass(frozen=True)
 class Denied:
-  """Denied access to the tool."""
+  """Denied access to the tool.
+
+  The reason can be given as a function that formats it, which is only called
+  the first time the reason is read. Denials are immutable, and equal if their
+  reasons are equal.
+  """
+
+  __slots__ = ("_reason",)
+  __match_args__ = ("reason",)
+
+  def __init__(self, reason: str | collections.abc.Callable[[], str]) -> None:
+    object.__setattr__(self, "_reason", reason)
 
-  reason: str
-  """Reason for denial."""
+  @property
+  def reason(self) -> str:
+    """Reason for denial."""
+    if callable(self._reason):
+      object.__setattr__(self, "_reason", self._reason())
+    return self._reason
+
+  def __setattr__(self, name: str, value: typing.Any) -> None:
+    raise dataclasses.FrozenInstanceError(f"cannot assign to field {name!r}")
+
+  def __delattr__(self, name: str) -> None:
+    raise dataclasses.FrozenInstanceError(f"cannot delete field {name!r}")
+
+  def __eq__(self, other: object) -> bool:
+    if not isinstance(other, Denied):
+      return NotImplemented
+    return self.reason == other.reason
+
+  def __hash__(self) -> int:
+    return hash(self.reason)
+
+  def __repr__(self) -> str:
+    return f"Denied(reason={self.reason!r})"
 
 
 SecurityPolicyResult = Allowed | Denied
@@ -87,6 +123,94 @@ def base_security_policy(
 class SecurityPolicyDeniedError(Exception):
   ...
 
+
+@dataclasses.dataclass
+class PolicyTiming:
+  """Time spent evaluating a security policy."""
+
+  calls: int = 0
+  """Number of times the policy was evaluated."""
+  total_seconds: float = 0.0
+  """Total time spent in the policy."""
+  max_seconds: float = 0.0
+  """Longest single evaluation of the policy."""
+
+  def record(self, seconds: float) -> None:
+    self.calls += 1
+    self.total_seconds += seconds
+    self.max_seconds = max(self.max_seconds, seconds)
+
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+class _PolicyDispatcher:
+  """Resolves tool names to the index of the first pattern matching them.
+
+  Patterns without wildcards are looked up in a dict, and all the others are
+  compiled into a single regex. Resolutions are cached by tool name. Only the
+  patterns are kept, as the policies are often methods of the engine.
+  """
+
+  def __init__(self, patterns: tuple[str, ...]) -> None:
+    self.patterns = patterns
+    self._exact: dict[str, int] = {}
+    regex_patterns = []
+    for i, pattern in enumerate(patterns):
+      if _GLOB_CHARS.search(pattern) is None:
+        self._exact.setdefault(pattern, i)
+      else:
+        regex_patterns.append(f"(?P<p{i}>{fnmatch.translate(pattern)})")
+    # Alternatives are tried in order, so the first match is the first policy.
+    self._regex = (
+        re.compile("|".join(regex_patterns)) if regex_patterns else None
+    )
+    self._resolved: dict[str, int | None] = {}
+
+  def resolve(self, tool_name: str) -> int | None:
+    try:
+      return self._resolved[tool_name]
+    except KeyError:
+      pass
+    index = self._exact.get(tool_name)
+    if self._regex is not None and (match := self._regex.match(tool_name)):
+      glob_index = int(match.lastgroup[1:])
+      if index is None or glob_index < index:
+        index = glob_index
+    self._resolved[tool_name] = index
+    return index
+
+
+# The dispatchers and policy timings of the engines. They are not attributes of
+# the engines, which implement the `SecurityPolicyEngine` protocol themselves.
+_dispatchers: weakref.WeakKeyDictionary[
+    "SecurityPolicyEngine", _PolicyDispatcher
+] = weakref.WeakKeyDictionary()
+_policy_timings: weakref.WeakKeyDictionary[
+    "SecurityPolicyEngine", dict[str, PolicyTiming]
+] = weakref.WeakKeyDictionary()
+
+
+def _resolve_policy(
+    engine: "SecurityPolicyEngine", tool_name: str
+) -> tuple[str, "SecurityPolicy"] | None:
+  """Returns the first policy of `engine` whose pattern matches `tool_name`."""
+  patterns = tuple(pattern for pattern, _ in engine.policies)
+  dispatcher = _dispatchers.get(engine)
+  # Rebuild the dispatcher if the patterns have been changed since.
+  if dispatcher is None or dispatcher.patterns != patterns:
+    dispatcher = _dispatchers[engine] = _PolicyDispatcher(patterns)
+  index = dispatcher.resolve(tool_name)
+  return None if index is None else engine.policies[index]
+
+
+def get_policy_timings(
+    engine: "SecurityPolicyEngine",
+) -> dict[str, PolicyTiming]:
+  """Returns the time spent in each policy of `engine`, by policy name."""
+  return _policy_timings.setdefault(engine, {})
+
+
 @typing.runtime_checkable
 class SecurityPolicyEngine(typing.Protocol):
   """Protocol for a Security policy engine."""
@@ -102,8 +226,9 @@ class SecurityPolicyEngine(typing.Protocol):
   ) -> SecurityPolicyResult:
     """Checks if the tool is allowed to be executed with the given data.
 
-    Policies in `POLICIES` are evaluated in order. If any evaluates to
-    Allowed(), then the tool is executed.
+    The first policy in `policies` whose name matches `tool_name` (as a glob
+    pattern) decides whether the tool is executed. The time spent in it is
+    recorded in `get_policy_timings` and in the current trace span.
 
     Args:
         tool_name: The name of the tool being called.
@@ -115,18 +240,42 @@ class SecurityPolicyEngine(typing.Protocol):
     """
     if tool_name in self.no_side_effect_tools:
       return Allowed()
-    non_public_variables = [
-        d.raw for d in dependencies if not capabilities_utils.is_public(d)
-    ]
-    if non_public_variables:
+    if not isinstance(dependencies, collections.abc.Collection):
+      dependencies = tuple(dependencies)
+    if not all(capabilities_utils.is_public(d) for d in dependencies):
+      # Only format the (possibly large) private values if the reason is read.
+      def make_reason() -> str:
+        non_public_variables = [
+            d.raw for d in dependencies if not capabilities_utils.is_public(d)
+        ]
+        return (
+            f"{tool_name} is state-changing and depends on private values"
+            f" {non_public_variables}."
+        )
+
+      return Denied(make_reason)
+    resolved = _resolve_policy(self, tool_name)
+    if resolved is None:
       return Denied(
-          f"{tool_name} is state-changing and depends on private values"
-          f" {non_public_variables}."
+          "No security policy matched for tool. Defaulting to denial."
+      )
+    policy_name, policy = resolved
+    start = time.perf_counter()
+    try:
+      return policy(tool_name, kwargs)
+    finally:
+      elapsed = time.perf_counter() - start
+      get_policy_timings(self).setdefault(
+          policy_name, PolicyTiming()
+      ).record(elapsed)
+      trace.get_current_span().add_event(
+          "camel.security_policy",
+          {
+              "camel.tool_name": tool_name,
+              "camel.policy_name": policy_name,
+              "camel.policy_seconds": elapsed,
+          },
       )
-    for policy_name, policy in self.policies:
-      if fnmatch.fnmatch(tool_name, policy_name):
-        return policy(tool_name, kwargs)
-    return Denied("No security policy matched for tool. Defaulting to denial.")
 
 
 class NoSecurityPolicyEngine(SecurityPolicyEngine):
@@ -0,0 +1,209 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the concurrent tool calls of list comprehensions."""
+
+import concurrent.futures
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from camel.camel_library import security_policy
+from camel.camel_library.capabilities import capabilities
+from camel.camel_library.capabilities import sources
+from camel.camel_library.capabilities import utils
+from camel.camel_library.interpreter import camel_value
+from camel.camel_library.interpreter import interpreter
+from camel.camel_library.interpreter import library
+
+_EMAILS = [
+    "alice@fake-email-domain.com",
+    "bob@fake-email-domain.com",
+    "carol@other-domain.com",
+    "dave@fake-email-domain.com",
+    "erin@fake-email-domain.com",
+]
+
+_READERS = frozenset(
+    {"alice@fake-email-domain.com", "bob@fake-email-domain.com"}
+)
+
+PLANS = {
+    "filtered": """
+profiles = [get_profile(e) for e in emails if "fake" in e]
+names = [p.split(":")[0] for p in profiles]
+""",
+    "nested": """
+pairs = [
+    get_profile(f"{e} {i}")
+    for e in emails
+    for i in [0, 1]
+    if i != 1 or "bob" in e
+]
+""",
+    "query_ai_assistant": """
+days = [query_ai_assistant(f"Day of the meeting in {e}", "int") for e in emails]
+latest = max(days)
+""",
+}
+
+
+class _Tools:
+  """Tools recording the order of their calls, and slower for the first ones."""
+
+  def __init__(self) -> None:
+    self._lock = threading.Lock()
+    self.started = []
+    self.running = 0
+    self.max_running = 0
+
+  def _call(self, name: str, arg: str, output: str) -> str:
+    with self._lock:
+      self.started.append((name, arg))
+      self.running += 1
+      self.max_running = max(self.max_running, self.running)
+    # Later calls finish first when they run concurrently.
+    time.sleep(0.05 / len(self.started))
+    with self._lock:
+      self.running -= 1
+    return output
+
+  def get_profile(self, email: str) -> str:
+    """Returns the profile of a person."""
+    return self._call("get_profile", email, f"{email.split('@')[0]}: profile")
+
+  def query_ai_assistant(self, query: str, output_schema: str) -> int:
+    """Stands in for the Q-LLM, without calling a model."""
+    return int(self._call("query_ai_assistant", query, str(len(query) % 28)))
+
+
+def _run_plan(code, eval_mode, call_executor):
+  tools = _Tools()
+  namespace = library.make_builtins_namespace(
+      variables={
+          name: camel_value.CaMeLFunction(
+              name=name,
+              py_callable=getattr(tools, name),
+              capabilities=capabilities.Capabilities.camel(),
+              dependencies=(),
+          )
+          for name in ("get_profile", "query_ai_assistant")
+      }
+  )
+  namespace = namespace.add_variables({
+      "emails": camel_value.value_from_raw(
+          _EMAILS,
+          capabilities.Capabilities(
+              frozenset({sources.Tool("get_emails")}), _READERS
+          ),
+          namespace,
+          (),
+      )
+  })
+  engine = security_policy.NoSecurityPolicyEngine()
+  engine.no_side_effect_tools = {"get_profile"}
+  eval_args = interpreter.EvalArgs(
+      engine, eval_mode, call_executor=call_executor
+  )
+  res = interpreter.parse_and_interpret_code(
+      f"```python\n{code}\n```", namespace, [], (), eval_args
+  )
+  if isinstance(res.result, interpreter.result.Error):
+    raise AssertionError(f"The plan failed: {res.result.error}")
+  return res, tools
+
+
+def _describe_value(value):
+  if isinstance(value, camel_value.CaMeLCallable):
+    return f"<function {value.name().raw}>"
+  return repr(value.raw)
+
+
+def _describe(res):
+  """The values, readers, sources, tool calls and dependencies of a run."""
+  variables = {
+      name: (
+          value.raw,
+          utils.get_all_readers(value)[0],
+          utils.get_all_sources(value)[0],
+          sorted(
+              _describe_value(dependency)
+              for dependency in value.get_dependencies()[0]
+          ),
+      )
+      for name, value in res.namespace.variables.items()
+      if name not in library.BUILT_IN_FUNCTIONS
+      and name not in ("get_profile", "query_ai_assistant")
+  }
+  tool_calls = [
+      (call.function, call.args, call.output) for call in res.tool_calls_chain
+  ]
+  dependencies = [
+      _describe_value(dependency) for dependency in res.dependencies
+  ]
+  return variables, tool_calls, dependencies
+
+
+class DeferredCallsTest(unittest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+    self.addCleanup(self.executor.shutdown)
+
+  def test_concurrent_calls_match_sequential_calls(self):
+    for eval_mode in interpreter.DependenciesPropagationMode:
+      for plan_name, code in PLANS.items():
+        with self.subTest(eval_mode=eval_mode.name, plan=plan_name):
+          sequential, sequential_tools = _run_plan(code, eval_mode, None)
+          concurrent_res, concurrent_tools = _run_plan(
+              code, eval_mode, self.executor
+          )
+          self.assertEqual(sequential_tools.max_running, 1)
+          self.assertGreater(concurrent_tools.max_running, 1)
+          self.assertEqual(_describe(concurrent_res), _describe(sequential))
+          # The calls are started in the order of the sequential calls.
+          self.assertEqual(
+              concurrent_tools.started, sequential_tools.started
+          )
+
+  def test_outputs_keep_readers_and_sources(self):
+    res, _ = _run_plan(
+        PLANS["filtered"],
+        interpreter.DependenciesPropagationMode.NORMAL,
+        self.executor,
+    )
+    profiles = res.namespace.variables["profiles"]
+    self.assertEqual(utils.get_all_readers(profiles)[0], _READERS)
+    for profile in profiles.python_value:
+      self.assertIn(
+          sources.Tool("get_profile"), utils.get_all_sources(profile)[0]
+      )
+
+  def test_filled_list_is_marked_mutated(self):
+    epoch = camel_value.mutation_epoch()
+    _run_plan(
+        "profiles = [get_profile(e) for e in emails]",
+        interpreter.DependenciesPropagationMode.NORMAL,
+        self.executor,
+    )
+    self.assertGreater(camel_value.mutation_epoch(), epoch)
+
+
+if __name__ == "__main__":
+  unittest.main()
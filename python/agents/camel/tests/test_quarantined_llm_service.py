@@ -0,0 +1,112 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the queries to the Quarantined LLM."""
+
+import asyncio
+import os
+import re
+import sys
+import threading
+from typing import AsyncGenerator
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from google.adk.models import base_llm
+from google.adk.models import llm_request
+from google.adk.models import llm_response
+from google.genai import types
+
+from camel.camel_agent import camel_agent
+
+
+class StubLlm(base_llm.BaseLlm):
+  """Answers with the number in the query, later for smaller numbers."""
+
+  model: str = "stub"
+  running: int = 0
+  max_running: int = 0
+  threads: set[str] = set()
+
+  async def generate_content_async(
+      self, llm_request: llm_request.LlmRequest, stream: bool = False
+  ) -> AsyncGenerator[llm_response.LlmResponse, None]:
+    query = llm_request.contents[-1].parts[0].text
+    number = int(re.search(r"\d+", query)[0])
+    self.threads.add(threading.current_thread().name)
+    self.running += 1
+    self.max_running = max(self.max_running, self.running)
+    try:
+      await asyncio.sleep(0.01 * (10 - number % 10))
+    finally:
+      self.running -= 1
+    yield llm_response.LlmResponse(
+        content=types.Content(
+            role="model", parts=[types.Part(text=str(number * 2))]
+        )
+    )
+
+
+class QuarantinedLlmServiceTest(unittest.IsolatedAsyncioTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.llm = StubLlm()
+    self.service = camel_agent.QuarantinedLlmService(
+        model=self.llm, max_concurrency=3
+    )
+    self.addCleanup(self.service.close)
+    self.queries = [(f"Double {i}", "int") for i in range(10)]
+
+  def test_query_many_runs_on_background_loop_in_order(self):
+    outputs = self.service.query_many(self.queries)
+    self.assertEqual(outputs, [i * 2 for i in range(10)])
+    self.assertEqual(self.llm.max_running, 3)
+    self.assertEqual(self.llm.threads, {"QLLM_Service_loop"})
+
+  def test_query_ai_assistant_runs_on_background_loop(self):
+    query_ai_assistant = self.service.get_query_ai_assistant_function()
+    self.assertEqual(query_ai_assistant("Double 21", "int"), 42)
+    self.assertEqual(query_ai_assistant("Double 4", "str"), "8")
+    self.assertEqual(self.llm.threads, {"QLLM_Service_loop"})
+
+  def test_query_ai_assistant_from_concurrent_threads(self):
+    query_ai_assistant = self.service.get_query_ai_assistant_function()
+    outputs = [None] * 6
+
+    def run(i):
+      outputs[i] = query_ai_assistant(f"Double {i}", "int")
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(6)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertEqual(outputs, [i * 2 for i in range(6)])
+    self.assertEqual(self.llm.max_running, 3)
+
+  async def test_query_many_async_on_caller_loop(self):
+    outputs = await self.service.query_many_async(self.queries)
+    self.assertEqual(outputs, [i * 2 for i in range(10)])
+    self.assertEqual(self.llm.max_running, 3)
+    self.assertEqual(self.llm.threads, {threading.current_thread().name})
+
+  async def test_query_async_rejects_unsupported_schema(self):
+    with self.assertRaises(ValueError):
+      await self.service.query_async("Double 1", "list")
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,230 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the dispatch of the security policies and their denials."""
+
+import fnmatch
+import gc
+import os
+import sys
+import unittest
+from unittest import mock
+import weakref
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from camel.camel_library import security_policy
+from camel.camel_library.capabilities import capabilities
+from camel.camel_library.capabilities import sources
+from camel.camel_library.interpreter import camel_value
+
+_PATTERNS = [
+    "search_document",
+    "send_*",
+    "get_?ail",
+    "[ab]*",
+    "send_email",
+    "*_file",
+    "query_ai_assistant",
+    "[!x]*_event",
+    "*",
+]
+
+_TOOL_NAMES = [
+    "search_document",
+    "send_email",
+    "send_",
+    "get_mail",
+    "get_email",
+    "get_tail",
+    "append_file",
+    "book_event",
+    "delete_file",
+    "create_event",
+    "x_event",
+    "query_ai_assistant",
+    "query_ai_assistant_2",
+    "unknown",
+    "",
+]
+
+
+class _Engine(security_policy.SecurityPolicyEngine):
+  """An engine whose policies allow the tools and record the pattern used."""
+
+  def __init__(self, patterns: list[str]) -> None:
+    self.no_side_effect_tools = set()
+    self.policies = [(pattern, self._policy(pattern)) for pattern in patterns]
+    self.used = []
+
+  def _policy(self, pattern: str) -> security_policy.SecurityPolicy:
+    def policy(tool_name, kwargs):
+      del tool_name, kwargs  # Unused.
+      self.used.append(pattern)
+      return security_policy.Allowed()
+
+    return policy
+
+
+def _linear_scan(patterns: list[str], tool_name: str) -> str | None:
+  """The first matching pattern, as the policies used to be scanned."""
+  for pattern in patterns:
+    if fnmatch.fnmatch(tool_name, pattern):
+      return pattern
+  return None
+
+
+def _dispatched(engine: _Engine, tool_name: str) -> str | None:
+  engine.used.clear()
+  result = engine.check_policy(tool_name, {}, ())
+  if isinstance(result, security_policy.Denied):
+    return None
+  return engine.used[0]
+
+
+class PolicyDispatchTest(unittest.TestCase):
+
+  def test_dispatch_matches_linear_scan(self):
+    for end in range(len(_PATTERNS) + 1):
+      patterns = _PATTERNS[:end]
+      engine = _Engine(patterns)
+      for tool_name in _TOOL_NAMES:
+        with self.subTest(patterns=patterns, tool_name=tool_name):
+          expected = _linear_scan(patterns, tool_name)
+          # Twice, the second time from the cached resolution.
+          self.assertEqual(_dispatched(engine, tool_name), expected)
+          self.assertEqual(_dispatched(engine, tool_name), expected)
+
+  def test_dispatch_matches_linear_scan_in_reverse_order(self):
+    patterns = _PATTERNS[::-1]
+    engine = _Engine(patterns)
+    for tool_name in _TOOL_NAMES:
+      with self.subTest(tool_name=tool_name):
+        self.assertEqual(
+            _dispatched(engine, tool_name), _linear_scan(patterns, tool_name)
+        )
+
+  def test_unmatched_tool_is_denied(self):
+    engine = _Engine(["send_*"])
+    self.assertEqual(
+        engine.check_policy("search_document", {}, ()),
+        security_policy.Denied(
+            "No security policy matched for tool. Defaulting to denial."
+        ),
+    )
+
+  def test_dispatch_follows_changed_policies(self):
+    engine = _Engine(["send_*", "*"])
+    self.assertEqual(_dispatched(engine, "send_email"), "send_*")
+    engine.policies.insert(0, ("send_email", engine._policy("send_email")))
+    self.assertEqual(_dispatched(engine, "send_email"), "send_email")
+    engine.policies = [("*", engine._policy("*"))]
+    self.assertEqual(_dispatched(engine, "send_email"), "*")
+    engine.policies = []
+    self.assertIsNone(_dispatched(engine, "send_email"))
+
+  def test_dispatch_uses_replaced_policy_of_same_pattern(self):
+    engine = _Engine(["send_*"])
+    self.assertEqual(_dispatched(engine, "send_email"), "send_*")
+    engine.policies[0] = (
+        "send_*",
+        lambda tool_name, kwargs: security_policy.Denied("Replaced."),
+    )
+    self.assertEqual(
+        engine.check_policy("send_email", {}, ()),
+        security_policy.Denied("Replaced."),
+    )
+
+  def test_timings_are_kept_outside_the_engine(self):
+    engine = _Engine(["send_*", "*"])
+    attributes = set(vars(engine))
+    for _ in range(3):
+      engine.check_policy("send_email", {}, ())
+    engine.check_policy("search_document", {}, ())
+    timings = security_policy.get_policy_timings(engine)
+    self.assertEqual(timings["send_*"].calls, 3)
+    self.assertEqual(timings["*"].calls, 1)
+    self.assertEqual(set(vars(engine)), attributes)
+    self.assertEqual(security_policy.get_policy_timings(_Engine([])), {})
+
+  def test_engines_are_not_kept_alive(self):
+    engine = _Engine(["send_*"])
+    engine.check_policy("send_email", {}, ())
+    self.assertIn(engine, security_policy._dispatchers)
+    self.assertIn(engine, security_policy._policy_timings)
+    engine_ref = weakref.ref(engine)
+    del engine
+    gc.collect()
+    self.assertIsNone(engine_ref())
+
+
+class DeniedTest(unittest.TestCase):
+
+  def test_reason_is_formatted_once_when_read(self):
+    make_reason = mock.Mock(return_value="Formatted.")
+    denied = security_policy.Denied(make_reason)
+    make_reason.assert_not_called()
+    self.assertEqual(denied.reason, "Formatted.")
+    self.assertEqual(denied.reason, "Formatted.")
+    make_reason.assert_called_once()
+
+  def test_lazy_and_eager_reasons_are_equal(self):
+    lazy = security_policy.Denied(lambda: "Reason.")
+    eager = security_policy.Denied("Reason.")
+    self.assertEqual(lazy, eager)
+    self.assertEqual(hash(lazy), hash(eager))
+    self.assertNotEqual(lazy, security_policy.Denied("Other reason."))
+    self.assertEqual(repr(lazy), "Denied(reason='Reason.')")
+    match lazy:
+      case security_policy.Denied(reason):
+        self.assertEqual(reason, "Reason.")
+      case _:
+        self.fail("Denied did not match.")
+
+  def test_denied_is_immutable(self):
+    with self.assertRaises(AttributeError):
+      security_policy.Denied("Reason.").reason = "Other reason."
+
+  def test_private_dependencies_are_only_formatted_when_read(self):
+    private = camel_value.CaMeLStr.from_raw(
+        "secret",
+        capabilities.Capabilities(
+            frozenset({sources.Tool("read_file")}), frozenset({"alice"})
+        ),
+        (),
+    )
+    public = camel_value.CaMeLStr.from_raw(
+        "public", capabilities.Capabilities.camel(), ()
+    )
+    engine = _Engine(["*"])
+    is_public = security_policy.capabilities_utils.is_public
+    with mock.patch.object(
+        security_policy.capabilities_utils,
+        "is_public",
+        side_effect=is_public,
+    ) as mock_is_public:
+      result = engine.check_policy("send_email", {}, [public, private])
+      self.assertIsInstance(result, security_policy.Denied)
+      self.assertEqual(mock_is_public.call_count, 2)
+      self.assertEqual(engine.used, [])
+      self.assertEqual(
+          result.reason,
+          "send_email is state-changing and depends on private values"
+          " ['secret'].",
+      )
+      self.assertEqual(mock_is_public.call_count, 4)
+
+
+if __name__ == "__main__":
+  unittest.main()
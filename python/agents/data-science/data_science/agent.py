@@ -28,7 +28,7 @@ from google.adk.tools import load_artifacts
 
 from .sub_agents import bqml_agent
 from .sub_agents.bigquery.tools import (
-    get_database_settings as get_bq_database_settings,
+    refresh_database_settings as refresh_bq_database_settings,
 )
 from .prompts import return_instructions_root
 from .tools import call_db_agent, call_ds_agent
@@ -47,8 +47,8 @@ def setup_before_agent_call(callback_context: CallbackContext):
 
     # setting up schema in instruction
     if callback_context.state["all_db_settings"]["use_database"] == "BigQuery":
-        callback_context.state["database_settings"] = get_bq_database_settings()
-        schema = callback_context.state["database_settings"]["bq_schema_and_samples"]
+        database_settings = refresh_bq_database_settings(callback_context.state)
+        schema = database_settings["bq_schema_and_samples"]
 
         callback_context._invocation_context.agent.instruction = (
             return_instructions_root()
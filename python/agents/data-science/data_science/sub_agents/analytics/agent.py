@@ -14,17 +14,21 @@
 
 """Data Science Agent V2: generate nl2py and use code interpreter to run the code."""
 import os
-from google.adk.code_executors import VertexAiCodeExecutor
 from google.adk.agents import Agent
+from data_science.utils import query_results
 from .prompts import return_instructions_ds
 
 
+code_executor = query_results.QueryResultCodeExecutor(
+    optimize_data_file=True,
+    stateful=True,
+)
+
 root_agent = Agent(
     model=os.getenv("ANALYTICS_AGENT_MODEL"),
     name="data_science_agent",
     instruction=return_instructions_ds(),
-    code_executor=VertexAiCodeExecutor(
-        optimize_data_file=True,
-        stateful=True,
-    ),
+    code_executor=code_executor,
+    before_agent_callback=code_executor.load_query_result,
+    after_agent_callback=code_executor.release_query_result,
 )
@@ -77,6 +77,8 @@ def return_instructions_ds() -> str:
 
   **Data in prompt:** Some queries contain the input data directly in the prompt. You have to parse that data into a pandas DataFrame. ALWAYS parse all the data. NEVER edit the data that are given to you.
 
+  **Data in files:** Some queries contain the name of a Parquet file holding the input data, with its schema and summary statistics. Load the file into a pandas DataFrame with `pd.read_parquet`. NEVER retype the data from the summary.
+
   **Answerability:** Some queries may not be answerable with the available data. In those cases, inform the user why you cannot process their query and suggest what type of data would be needed to fulfill their request.
 
   **WHEN YOU DO PREDICTION / MODEL FITTING, ALWAYS PLOT FITTED LINE AS WELL **
@@ -14,6 +14,7 @@
 
 """Database Agent: get data from database (BigQuery) using NL2SQL."""
 
+import asyncio
 import os
 
 from typing import Any, Dict, Optional
@@ -25,34 +26,144 @@ from google.adk.tools.bigquery import BigQueryToolset
 from google.adk.tools.bigquery.config import BigQueryToolConfig, WriteMode
 from google.genai import types
 
+from data_science.utils import query_results
+from . import sql_validation
 from . import tools
 from .chase_sql import chase_db_tools
 from .prompts import return_instructions_bigquery
 
 NL2SQL_METHOD = os.getenv("NL2SQL_METHOD", "BASELINE")
+# Answer repeated questions with the cached SQL of the previous answers.
+USE_NL2SQL_CACHE = os.getenv("NL2SQL_CACHE", "true").lower() == "true"
+# Validate the SQL locally on the sample rows before running it on BigQuery.
+LOCAL_SQL_VALIDATION = os.getenv("BQ_LOCAL_SQL_VALIDATION", "true").lower() == "true"
 
 # BigQuery built-in tools in ADK
 # https://google.github.io/adk-docs/tools/built-in-tools/#bigquery
 ADK_BUILTIN_BQ_EXECUTE_SQL_TOOL = "execute_sql"
+NL2SQL_TOOL = "initial_bq_nl2sql"
+# Maximum number of rows of a query result returned to the model. All the rows
+# are stored in the query result artifact.
+MAX_INLINE_ROWS = 80
 
 
 def setup_before_agent_call(callback_context: CallbackContext) -> None:
     """Setup the agent."""
 
-    if "database_settings" not in callback_context.state:
-        callback_context.state["database_settings"] = \
-            tools.get_database_settings()
+    tools.refresh_database_settings(callback_context.state)
 
 
-def store_results_in_context(
+async def get_cached_sql(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+) -> Optional[Dict]:
+    """Answers the question with the cached SQL, if any, instead of generating it.
+
+    On a cache miss, the question is kept pending until its SQL is generated.
+    The lookup may call the embedding model, so it runs in a thread.
+    """
+    if not USE_NL2SQL_CACHE or tool.name != NL2SQL_TOOL:
+        return None
+    tool_context.state["pending_nl2sql"] = None
+    schema_hash = tool_context.state["database_settings"].get("bq_schema_hash")
+    if schema_hash is None:
+        return None
+    sql = await asyncio.to_thread(tools.sql_cache.get, args["question"], schema_hash)
+    if sql is None:
+        tool_context.state["pending_nl2sql"] = {
+            "question": args["question"],
+            "sql": None,
+        }
+        return None
+    tool_context.state["sql_query"] = sql
+    return {"result": sql}
+
+
+def record_generated_sql(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Any
+) -> Optional[Dict]:
+    """Keeps the SQL generated for the pending question.
+
+    It is cached only if this exact SQL then runs successfully.
+    """
+    if tool.name != NL2SQL_TOOL:
+        return None
+    pending = tool_context.state.get("pending_nl2sql")
+    if not pending or pending["question"] != args["question"]:
+        return None
+    if isinstance(tool_response, dict):
+        tool_response = tool_response.get("result")
+    if isinstance(tool_response, str) and tool_response:
+        tool_context.state["pending_nl2sql"] = {**pending, "sql": tool_response}
+    return None
+
+
+def validate_sql_locally(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+) -> Optional[Dict]:
+    """Rejects the SQL queries with errors before they run on BigQuery.
+
+    A query rejected locally and sent again unchanged runs on BigQuery, in case
+    the local validation was wrong.
+    """
+    if not LOCAL_SQL_VALIDATION or tool.name != ADK_BUILTIN_BQ_EXECUTE_SQL_TOOL:
+        return None
+    sql_query = args.get("query", "")
+    if sql_query == tool_context.state.get("locally_rejected_sql"):
+        return None
+    database_settings = tool_context.state["database_settings"]
+    validation = sql_validation.validate_sql(
+        sql_query,
+        database_settings["bq_schema_and_samples"],
+        db=database_settings["bq_dataset_id"],
+        catalog=database_settings["bq_data_project_id"],
+    )
+    if validation["status"] != "ERROR":
+        return None
+    tool_context.state["locally_rejected_sql"] = sql_query
+    return {
+        "status": "ERROR",
+        "error_details": f"Local validation failed: {validation['error_details']}",
+    }
+
+
+async def store_results_in_context(
     tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Dict
 ) -> Optional[Dict]:
 
   # We are setting a state for the data science agent to be able to use the sql
-  # query results as context 
+  # query results as context. The rows are stored as an artifact, and only a
+  # reference to it is kept in the state.
   if tool.name == ADK_BUILTIN_BQ_EXECUTE_SQL_TOOL:
     if tool_response["status"] == "SUCCESS":
-        tool_context.state["query_result"] = tool_response["rows"]
+        pending = tool_context.state.get("pending_nl2sql")
+        schema_hash = tool_context.state["database_settings"].get("bq_schema_hash")
+        if (
+            USE_NL2SQL_CACHE
+            and pending
+            and pending["sql"]
+            and pending["sql"].strip() == args["query"].strip()
+            and schema_hash
+        ):
+            await asyncio.to_thread(
+                tools.sql_cache.put, pending["question"], pending["sql"], schema_hash
+            )
+            tool_context.state["pending_nl2sql"] = None
+        rows = tool_response["rows"]
+        query_result = await query_results.save_query_result(tool_context, rows)
+        if query_result is None:
+            tool_context.state["query_result"] = rows
+        else:
+            tool_context.state["query_result"] = query_result
+            if len(rows) > MAX_INLINE_ROWS:
+                return {
+                    **tool_response,
+                    "rows": rows[:MAX_INLINE_ROWS],
+                    "note": (
+                        f"Only the first {MAX_INLINE_ROWS} of {len(rows)} rows"
+                        " are shown. All the rows are stored in the artifact"
+                        f" {query_result['artifact']}."
+                    ),
+                }
 
   return None
 
@@ -60,7 +171,7 @@ def store_results_in_context(
 bigquery_tool_filter = [ADK_BUILTIN_BQ_EXECUTE_SQL_TOOL]
 bigquery_tool_config = BigQueryToolConfig(
     write_mode=WriteMode.BLOCKED,
-    max_query_result_rows=80
+    max_query_result_rows=tools.MAX_NUM_ROWS
 )
 bigquery_toolset = BigQueryToolset(
     tool_filter=bigquery_tool_filter,
@@ -80,6 +191,7 @@ database_agent = Agent(
         bigquery_toolset,
     ],
     before_agent_callback=setup_before_agent_call,
-    after_tool_callback=store_results_in_context,
+    before_tool_callback=[get_cached_sql, validate_sql_locally],
+    after_tool_callback=[record_generated_sql, store_results_in_context],
     generate_content_config=types.GenerateContentConfig(temperature=0.01),
 )
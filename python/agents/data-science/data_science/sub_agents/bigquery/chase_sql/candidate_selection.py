@@ -0,0 +1,288 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Execution-based selection among the SQL candidates of CHASE-SQL."""
+
+from concurrent.futures import ThreadPoolExecutor
+import collections
+import dataclasses
+import sqlite3
+import threading
+import time
+from typing import Any
+
+import sqlglot
+
+from .sql_postprocessor import sql_translator
+
+# Maximum number of rows compared between candidate results.
+MAX_RESULT_ROWS = 1000
+# Maximum time in seconds of a candidate run on the sample rows.
+MAX_EXECUTION_TIME = 2.0
+
+
+def normalize_sql(sql_query: str, dialect: str = "bigquery") -> str | None:
+    """Returns the SQL query normalized by SQLGlot, or None if it is not a query."""
+    try:
+        ast = sqlglot.parse_one(
+            sql_query, read=dialect, error_level=sqlglot.ErrorLevel.IMMEDIATE
+        )
+    except sqlglot.errors.SqlglotError:
+        return None
+    if not isinstance(ast, sqlglot.exp.Query):
+        return None
+    return ast.sql(
+        dialect=dialect, normalize=True, normalize_functions="upper", comments=False
+    )
+
+
+def count_distinct(
+    sql_queries: list[str], dialect: str = "bigquery"
+) -> list[tuple[str, int]]:
+    """Returns the distinct SQL queries with their number of occurrences.
+
+    Queries are identical if their normalized SQLGlot ASTs are, or if they
+    cannot be parsed, if their text is. Queries are kept in order of first
+    occurrence.
+    """
+    counts: dict[str, list[Any]] = {}
+    for sql_query in sql_queries:
+        key = normalize_sql(sql_query, dialect) or sql_query.strip()
+        if key in counts:
+            counts[key][1] += 1
+        else:
+            counts[key] = [sql_query, 1]
+    return [(sql_query, count) for sql_query, count in counts.values()]
+
+
+def get_ddl_schema(
+    bq_schema_and_samples: dict[str, Any],
+) -> sql_translator.DDLSchemaType:
+    """Returns the tables and columns of the BigQuery schema and samples."""
+    return [
+        (table_ref, [tuple(column) for column in table["table_schema"]])
+        for table_ref, table in bq_schema_and_samples.items()
+    ]
+
+
+def _parse_sample_value(literal: str) -> Any:
+    """Parses a sample value serialized by the BigQuery tools."""
+    if literal == "NULL":
+        return None
+    if literal in ("True", "False"):
+        return literal == "True"
+    if literal.startswith("b'"):
+        literal = literal[1:]
+    if len(literal) >= 2 and literal[0] == literal[-1] == "'":
+        return literal[1:-1].replace("''", "'").replace("\\\\", "\\")
+    for parse in (int, float):
+        try:
+            return parse(literal)
+        except ValueError:
+            pass
+    # Arrays and structs are kept as text.
+    return literal
+
+
+def _normalize_value(value: Any) -> Any:
+    """Normalizes a result value for the comparison of results."""
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+
+class SampleDatabase:
+    """In-memory SQLite database holding the sample rows of the tables.
+
+    Candidates are translated to SQLite and run on the sample rows. Their
+    results are compared by signature: the sorted result rows.
+    """
+
+    def __init__(self, bq_schema_and_samples: dict[str, Any]):
+        self._connection = sqlite3.connect(":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        self._table_names: set[str] = set()
+        for table_ref, table in bq_schema_and_samples.items():
+            table_name = table_ref.split(".")[-1]
+            columns = [column[0] for column in table["table_schema"]]
+            if table_name in self._table_names or not columns:
+                continue
+            self._table_names.add(table_name)
+            quoted_columns = ", ".join(self._quote(column) for column in columns)
+            self._connection.execute(
+                f"CREATE TABLE {self._quote(table_name)} ({quoted_columns})"
+            )
+            example_values = table.get("example_values", {})
+            num_rows = max((len(v) for v in example_values.values()), default=0)
+            rows = [
+                [
+                    _parse_sample_value(example_values[column][i])
+                    if i < len(example_values.get(column, []))
+                    else None
+                    for column in columns
+                ]
+                for i in range(num_rows)
+            ]
+            placeholders = ", ".join("?" for _ in columns)
+            self._connection.executemany(
+                f"INSERT INTO {self._quote(table_name)} VALUES ({placeholders})",
+                rows,
+            )
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        return '"' + identifier.replace('"', '""') + '"'
+
+    @property
+    def table_names(self) -> set[str]:
+        """The names of the tables of the database."""
+        return self._table_names
+
+    def execute(
+        self, sql_query: str, max_rows: int = MAX_RESULT_ROWS
+    ) -> tuple[list[str], list[tuple]]:
+        """Runs the BigQuery SQL query on the sample rows.
+
+        Args:
+          sql_query: The BigQuery SQL query.
+          max_rows: The maximum number of rows returned.
+
+        Returns:
+          The names of the columns and the rows of the result.
+
+        Raises:
+          sqlglot.errors.SqlglotError: If the query cannot be translated.
+          sqlite3.Error: If the query fails, or runs for more than
+            `MAX_EXECUTION_TIME` seconds.
+        """
+        ast = sqlglot.parse_one(
+            sql_query, read="bigquery", error_level=sqlglot.ErrorLevel.IMMEDIATE
+        )
+        for table in ast.find_all(sqlglot.exp.Table):
+            if table.name in self._table_names:
+                table.set("catalog", None)
+                table.set("db", None)
+        sqlite_query = ast.sql(dialect="sqlite")
+        deadline = time.monotonic() + MAX_EXECUTION_TIME
+        with self._lock:
+            self._connection.set_progress_handler(
+                lambda: time.monotonic() > deadline, 10000
+            )
+            try:
+                cursor = self._connection.execute(sqlite_query)
+                rows = cursor.fetchmany(max_rows)
+            finally:
+                self._connection.set_progress_handler(None, 0)
+        columns = [column[0] for column in cursor.description or []]
+        return columns, rows
+
+    def get_result_signature(self, sql_query: str) -> tuple | None:
+        """Runs the BigQuery SQL query on the sample rows.
+
+        Returns:
+          The signature of the result, or None if the query cannot be run
+          locally.
+        """
+        try:
+            _, rows = self.execute(sql_query)
+        except (sqlglot.errors.SqlglotError, sqlite3.Error, OverflowError, ValueError):
+            return None
+        return tuple(
+            sorted(
+                (tuple(_normalize_value(v) for v in row) for row in rows), key=repr
+            )
+        )
+
+
+@dataclasses.dataclass
+class Candidate:
+    """A distinct SQL candidate."""
+
+    sql_query: str
+    count: int
+    index: int
+    errors: str | None = None
+    signature: tuple | None = None
+
+
+def select_candidate(
+    sql_queries: list[str],
+    bq_schema_and_samples: dict[str, Any],
+    db: str | None = None,
+    catalog: str | None = None,
+) -> str:
+    """Selects the most consistent SQL candidate.
+
+    Candidates are deduplicated, then validated against the schema and run on
+    the sample rows in parallel. Invalid candidates are rejected. Among the
+    valid ones, the candidates with the same results form a cluster, and a
+    candidate of the largest cluster is selected (self-consistency). Each
+    candidate counts as many times as it was generated. Candidates that cannot
+    be run locally, or return no rows on the few sample rows, tell nothing
+    about their results: they are not clustered and only count alone. Ties are
+    broken by generation order, after the clustered candidates.
+
+    Args:
+      sql_queries: The BigQuery SQL candidates, with repetitions.
+      bq_schema_and_samples: The schema and sample rows of the tables.
+      db: The dataset of the tables.
+      catalog: The project of the tables.
+
+    Returns:
+      The selected SQL query.
+    """
+    candidates = [
+        Candidate(sql_query=sql_query, count=count, index=index)
+        for index, (sql_query, count) in enumerate(count_distinct(sql_queries))
+    ]
+    if len(candidates) <= 1:
+        return candidates[0].sql_query if candidates else ""
+
+    compiled_schema = sql_translator.SqlTranslator.compile_schema(
+        get_ddl_schema(bq_schema_and_samples)
+    )
+    sample_database = SampleDatabase(bq_schema_and_samples)
+
+    def evaluate(candidate: Candidate) -> None:
+        # pylint: disable-next=protected-access
+        candidate.errors, _ = sql_translator.SqlTranslator._check_for_errors(
+            sql_query=candidate.sql_query,
+            sql_dialect="bigquery",
+            db=db,
+            catalog=catalog,
+            schema_dict=compiled_schema,
+        )
+        if candidate.errors is None:
+            candidate.signature = sample_database.get_result_signature(
+                candidate.sql_query
+            )
+
+    with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+        list(executor.map(evaluate, candidates))
+
+    valid_candidates = [c for c in candidates if c.errors is None]
+    if not valid_candidates:
+        return candidates[0].sql_query
+    cluster_sizes = collections.Counter()
+    for candidate in valid_candidates:
+        # Results without rows are uninformative, like the missing ones.
+        if candidate.signature:
+            cluster_sizes[candidate.signature] += candidate.count
+
+    def rank(candidate: Candidate) -> tuple[int, bool, int]:
+        if not candidate.signature:
+            return candidate.count, False, -candidate.index
+        return cluster_sizes[candidate.signature], True, -candidate.index
+
+    return max(valid_candidates, key=rank).sql_query
@@ -14,10 +14,14 @@
 
 """This code contains the implementation of the tools used for the CHASE-SQL agent."""
 
+import asyncio
 import enum
 import os
 
 from google.adk.tools import ToolContext
+import sqlglot
+
+from . import candidate_selection
 
 # pylint: disable=g-importing-member
 from .dc_prompt_template import DC_PROMPT_TEMPLATE
@@ -79,7 +83,7 @@ def parse_response(response: str) -> str:
     return query.strip()
 
 
-def initial_bq_nl2sql(
+async def initial_bq_nl2sql(
     question: str,
     tool_context: ToolContext,
 ) -> str:
@@ -129,12 +133,16 @@ def initial_bq_nl2sql(
 
     model = GeminiModel(model_name=model, temperature=temperature)
     requests = [prompt for _ in range(number_of_candidates)]
-    responses = model.call_parallel(requests, parser_func=parse_response)
-    # Take just the first response.
-    responses = responses[0]
+    responses = await model.call_many(requests, parser_func=parse_response)
+    # Generations that timed out or failed are dropped.
+    candidates = [response for response in responses if response]
+    if not candidates:
+        raise RuntimeError(
+            f"None of the {number_of_candidates} SQL candidates could be generated."
+        )
 
     # If postprocessing of the SQL to transpile it to BigQuery is required,
-    # then do it here.
+    # then do it here, once per distinct candidate.
     if transpile_to_bigquery:
         translator = sql_translator.SqlTranslator(
             model=model,
@@ -142,10 +150,38 @@ def initial_bq_nl2sql(
             process_input_errors=process_input_errors,
             process_tool_output_errors=process_tool_output_errors,
         )
-        # pylint: disable=g-bad-todo
-        # pylint: enable=g-bad-todo
-        responses: str = translator.translate(
-            responses, ddl_schema=bq_schema_and_samples, db=db, catalog=project
+        # The schema is compiled once and shared by the translations.
+        ddl_schema = await asyncio.to_thread(
+            sql_translator.SqlTranslator.compile_schema,
+            candidate_selection.get_ddl_schema(bq_schema_and_samples),
         )
-
-    return responses
+        distinct_candidates = candidate_selection.count_distinct(candidates)
+
+        async def translate(sql_query: str) -> str | Exception:
+            try:
+                return await translator.translate(
+                    sql_query, ddl_schema=ddl_schema, db=db, catalog=project
+                )
+            except sqlglot.errors.SqlglotError as e:
+                return e
+
+        translated = await asyncio.gather(
+            *(translate(sql_query) for sql_query, _ in distinct_candidates)
+        )
+        candidates = [
+            sql_query
+            for sql_query, (_, count) in zip(translated, distinct_candidates)
+            if not isinstance(sql_query, Exception)
+            for _ in range(count)
+        ]
+        if not candidates:
+            # None of the candidates could be translated.
+            raise translated[0]
+
+    return await asyncio.to_thread(
+        candidate_selection.select_candidate,
+        candidates,
+        bq_schema_and_samples,
+        db=db,
+        catalog=project,
+    )
@@ -14,11 +14,13 @@
 
 """This code contains the LLM utils for the CHASE-SQL Agent."""
 
+import asyncio
 import functools
 import os
 import random
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import weakref
 from typing import Callable, List, Optional
 
 import dotenv
@@ -73,6 +75,15 @@ GEMINI_URL = (
     "projects/{GCP_PROJECT}/locations/{region}/publishers/google/models/{model_name}"
 )
 
+# Requests to Gemini are shared by all the callers of the process: their rate
+# is limited by a token bucket, and failed requests are retried with
+# exponential backoff and full jitter.
+MAX_REQUESTS_PER_SECOND = float(os.getenv("CHASE_MAX_REQUESTS_PER_SECOND", "10"))
+MAX_REQUESTS_BURST = int(os.getenv("CHASE_MAX_REQUESTS_BURST", "20"))
+MAX_ATTEMPTS = 6
+BASE_DELAY = 1.0
+MAX_DELAY = 32.0
+
 aiplatform.init(
     project=GCP_PROJECT,
     location=GCP_LOCATION,
@@ -105,15 +116,96 @@ def retry(max_attempts=8, base_delay=1, backoff_factor=2):
                     attempts += 1
                     if attempts >= max_attempts:
                         raise e
-                    delay = base_delay * (backoff_factor**attempts)
-                    delay = delay + random.uniform(0, 0.1 * delay)
-                    time.sleep(delay)
+                    # Exponential backoff with full jitter.
+                    delay = min(MAX_DELAY, base_delay * (backoff_factor**attempts))
+                    time.sleep(random.uniform(0, delay))
 
         return wrapper
 
     return decorator
 
 
+class TokenBucket:
+    """Token bucket limiting the rate of requests of the process.
+
+    Tokens are reserved in order, so waiting callers are served first come,
+    first served. The bucket is not bound to an event loop.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserves a token, and returns the time to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        """Waits until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_rate_limiter = TokenBucket(rate=MAX_REQUESTS_PER_SECOND, capacity=MAX_REQUESTS_BURST)
+
+
+def _create_generative_model(
+    model_name: str, cache_name: str | None = None
+) -> GenerativeModel:
+    if cache_name is not None:
+        cached_content = caching.CachedContent(cached_content_name=cache_name)
+        return GenerativeModel.from_cached_content(cached_content=cached_content)
+    return GenerativeModel(model_name=model_name)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_generative_model(
+    model_name: str, cache_name: str | None = None
+) -> GenerativeModel:
+    """Gets the client of the model, shared by the synchronous calls."""
+    return _create_generative_model(model_name, cache_name)
+
+
+# Asynchronous clients are bound to the event loop they are first used in, so
+# they are shared by the calls of each event loop.
+_async_generative_models: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[str, str | None], GenerativeModel]
+] = weakref.WeakKeyDictionary()
+_async_generative_models_lock = threading.Lock()
+
+
+def _get_async_generative_model(
+    model_name: str, cache_name: str | None = None
+) -> GenerativeModel:
+    """Gets the client of the model, shared by the calls of the event loop."""
+    loop = asyncio.get_running_loop()
+    with _async_generative_models_lock:
+        models = _async_generative_models.setdefault(loop, {})
+        if (model_name, cache_name) not in models:
+            models[(model_name, cache_name)] = _create_generative_model(
+                model_name, cache_name
+            )
+        return models[(model_name, cache_name)]
+
+
+def get_backoff_delay(attempt: int) -> float:
+    """Returns the delay before the next attempt, with full jitter."""
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2**attempt))
+
+
 class GeminiModel:
     """Class for the Gemini model."""
 
@@ -139,15 +231,14 @@ class GeminiModel:
                 region=random_region,
                 model_name=self.model_name,
             )
-        if cache_name is not None:
-            cached_content = caching.CachedContent(cached_content_name=cache_name)
-            self.model = GenerativeModel.from_cached_content(
-                cached_content=cached_content
-            )
-        else:
-            self.model = GenerativeModel(model_name=model_name)
+        self._client_model_name = model_name
+        self.cache_name = cache_name
+        self.model = _get_generative_model(model_name, cache_name)
+
+    def _get_generation_config(self) -> GenerationConfig:
+        return GenerationConfig(temperature=self.temperature, **self.arguments)
 
-    @retry(max_attempts=12, base_delay=2, backoff_factor=2)
+    @retry(max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, backoff_factor=2)
     def call(self, prompt: str, parser_func=None) -> str:
         """Calls the Gemini model with the given prompt.
 
@@ -160,74 +251,100 @@ class GeminiModel:
         Returns:
             str: The processed response from the model.
         """
+        time.sleep(_rate_limiter.reserve())
         response = self.model.generate_content(
             prompt,
-            generation_config=GenerationConfig(
-                temperature=self.temperature,
-                **self.arguments,
-            ),
+            generation_config=self._get_generation_config(),
             safety_settings=SAFETY_FILTER_CONFIG,
         ).text
         if parser_func:
             return parser_func(response)
         return response
 
-    def call_parallel(
+    async def call_async(
+        self,
+        prompt: str,
+        parser_func: Optional[Callable[[str], str]] = None,
+        max_attempts: int = MAX_ATTEMPTS,
+    ) -> str:
+        """Calls the Gemini model asynchronously with the given prompt.
+
+        Each attempt waits for the rate limiter of the process. Failed attempts
+        are retried with exponential backoff and full jitter. Cancellation is
+        not retried.
+
+        Args:
+            prompt (str): The prompt to call the model with.
+            parser_func (callable, optional): A function that processes the LLM
+              output.
+            max_attempts (int): The maximum number of attempts.
+
+        Returns:
+            str: The processed response from the model.
+        """
+        model = _get_async_generative_model(self._client_model_name, self.cache_name)
+        for attempt in range(max_attempts):
+            await _rate_limiter.acquire()
+            try:
+                response = await model.generate_content_async(
+                    prompt,
+                    generation_config=self._get_generation_config(),
+                    safety_settings=SAFETY_FILTER_CONFIG,
+                )
+                if parser_func:
+                    return parser_func(response.text)
+                return response.text
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Attempt {attempt + 1} failed with error: {e}")
+                if attempt + 1 >= max_attempts:
+                    raise
+                await asyncio.sleep(get_backoff_delay(attempt))
+
+    async def call_many(
         self,
         prompts: List[str],
         parser_func: Optional[Callable[[str], str]] = None,
-        timeout: int = 60,
-        max_retries: int = 5,
+        timeout: float = 60,
     ) -> List[Optional[str]]:
-        """Calls the Gemini model for multiple prompts in parallel using threads with retry logic.
+        """Calls the Gemini model for multiple prompts concurrently.
 
         Args:
             prompts (List[str]): A list of prompts to call the model with.
             parser_func (callable, optional): A function to process each response.
-            timeout (int): The maximum time (in seconds) to wait for each thread.
-            max_retries (int): The maximum number of retries for timed-out threads.
+            timeout (float): The maximum time (in seconds) to wait for each prompt,
+              retries included.
 
         Returns:
             List[Optional[str]]:
-            A list of responses, or None for threads that failed.
+            A list of responses, or None for prompts that timed out or failed.
         """
-        results = [None] * len(prompts)
-
-        def worker(index: int, prompt: str):
-            """Thread worker function to call the model and store the result with retries."""
-            retries = 0
-            while retries <= max_retries:
-                try:
-                    return self.call(prompt, parser_func)
-                except Exception as e:  # pylint: disable=broad-exception-caught
-                    print(f"Error for prompt {index}: {str(e)}")
-                    retries += 1
-                    if retries <= max_retries:
-                        print(f"Retrying ({retries}/{max_retries}) for prompt {index}")
-                        time.sleep(1)  # Small delay before retrying
-                    else:
-                        return f"Error after retries: {str(e)}"
-
-        # Create and start one thread for each prompt
-        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
-            future_to_index = {
-                executor.submit(worker, i, prompt): i
-                for i, prompt in enumerate(prompts)
-            }
-
-            for future in as_completed(future_to_index, timeout=timeout):
-                index = future_to_index[future]
-                try:
-                    results[index] = future.result()
-                except Exception as e:  # pylint: disable=broad-exception-caught
-                    print(f"Unhandled error for prompt {index}: {e}")
-                    results[index] = "Unhandled Error"
 
-        # Handle remaining unfinished tasks after the timeout
-        for future in future_to_index:
-            index = future_to_index[future]
-            if not future.done():
+        async def call_one(index: int, prompt: str) -> Optional[str]:
+            try:
+                return await asyncio.wait_for(
+                    self.call_async(prompt, parser_func), timeout=timeout
+                )
+            except asyncio.TimeoutError:
                 print(f"Timeout occurred for prompt {index}")
-                results[index] = "Timeout"
+                return None
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Error for prompt {index}: {str(e)}")
+                return None
 
-        return results
+        return list(
+            await asyncio.gather(
+                *(call_one(i, prompt) for i, prompt in enumerate(prompts))
+            )
+        )
+
+    def call_parallel(
+        self,
+        prompts: List[str],
+        parser_func: Optional[Callable[[str], str]] = None,
+        timeout: int = 60,
+    ) -> List[Optional[str]]:
+        """Calls the Gemini model for multiple prompts concurrently.
+
+        Synchronous version of `call_many`, for callers outside an event loop.
+        """
+        return asyncio.run(self.call_many(prompts, parser_func, timeout=timeout))
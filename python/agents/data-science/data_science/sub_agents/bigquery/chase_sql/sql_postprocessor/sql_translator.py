@@ -14,12 +14,22 @@
 
 """Translator from SQLite to BigQuery."""
 
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import functools
+import hashlib
+import json
 import re
-from typing import Any, Final
+import threading
+import time
+from typing import Any, Callable, Final
 
 import regex
 import sqlglot
 import sqlglot.optimizer
+from sqlglot.schema import MappingSchema
 
 from ..llm_utils import GeminiModel  # pylint: disable=g-importing-member
 from .correction_prompt_template import (
@@ -37,6 +47,65 @@ SQLGlotSchemaType = dict[str, Any]
 
 BirdSampleType = dict[str, Any]
 
+# Maximum number of optimized and transpiled SQL queries kept in memory.
+MAX_CACHED_QUERIES: Final[int] = 4096
+# Maximum number of compiled schemas kept in memory.
+MAX_COMPILED_SCHEMAS: Final[int] = 64
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledSchema:
+    """A schema compiled for SQLGlot.
+
+    Compiled schemas are equal if they are compiled from the same content for the
+    same SQL dialect.
+
+    Attributes:
+      schema_hash: The hash of the content of the schema it was compiled from.
+      sql_dialect: The SQL dialect of the queries using the schema.
+      schema_dict: The schema in the SQLGlot format.
+      mapping_schema: The SQLGlot schema, with normalized identifiers.
+    """
+
+    schema_hash: str
+    sql_dialect: str
+    schema_dict: SQLGlotSchemaType = dataclasses.field(compare=False)
+    mapping_schema: MappingSchema = dataclasses.field(compare=False)
+
+
+# Recently used compiled schemas, by schema hash and SQL dialect.
+_compiled_schemas: collections.OrderedDict[tuple[str, str], CompiledSchema] = (
+    collections.OrderedDict()
+)
+_compiled_schemas_lock = threading.Lock()
+
+# Number of calls and total time in seconds of each translation stage.
+_stage_timings: collections.defaultdict[str, list[float]] = (
+    collections.defaultdict(lambda: [0, 0.0])
+)
+_stage_timings_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _timed(stage: str):
+    """Adds the time of the block to the timing of the stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _stage_timings_lock:
+            timing = _stage_timings[stage]
+            timing[0] += 1
+            timing[1] += elapsed
+
+
+def _get_schema_hash(schema: Any) -> str:
+    """Returns the hash of the content of the schema."""
+    if not isinstance(schema, str):
+        schema = json.dumps(schema, sort_keys=True, default=str)
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()
+
 
 def _isinstance_list_of_str_tuples_lists(obj: Any) -> bool:
     """Checks if the object is a list of tuples or listsof strings."""
@@ -296,6 +365,124 @@ class SqlTranslator:
                 raise TypeError(f"Unsupported schema type: {type(schema)}")
         return schema_dict
 
+    @classmethod
+    def compile_schema(
+        cls,
+        schema: (
+            str | SQLGlotSchemaType | BirdSampleType | DDLSchemaType | CompiledSchema
+        ),
+        sql_dialect: str = OUTPUT_DIALECT,
+    ) -> CompiledSchema | None:
+        """Compiles the schema for SQLGlot, once per schema content.
+
+        Args:
+          schema: The schema, in any of the formats supported by
+            `rewrite_schema_for_sqlglot`.
+          sql_dialect: The SQL dialect of the queries using the schema.
+
+        Returns:
+          The compiled schema, or None if there is no schema.
+        """
+        if isinstance(schema, CompiledSchema) or not schema:
+            return schema or None
+        return cls._compile_schema_dict(
+            schema, sql_dialect, cls.rewrite_schema_for_sqlglot
+        )
+
+    @classmethod
+    def _compile_schema_dict(
+        cls,
+        schema: Any,
+        sql_dialect: str,
+        rewrite_schema: Callable[[Any], SQLGlotSchemaType],
+    ) -> CompiledSchema:
+        """Compiles the schema, rewritten in the SQLGlot format, or gets it."""
+        sql_dialect = sql_dialect.lower()
+        key = (_get_schema_hash(schema), sql_dialect)
+        with _compiled_schemas_lock:
+            compiled_schema = _compiled_schemas.get(key)
+            if compiled_schema is not None:
+                _compiled_schemas.move_to_end(key)
+                return compiled_schema
+        with _timed("compile_schema"):
+            schema_dict = rewrite_schema(schema)
+            compiled_schema = CompiledSchema(
+                schema_hash=key[0],
+                sql_dialect=sql_dialect,
+                schema_dict=schema_dict,
+                mapping_schema=MappingSchema(schema_dict, dialect=sql_dialect),
+            )
+        with _compiled_schemas_lock:
+            compiled_schema = _compiled_schemas.setdefault(key, compiled_schema)
+            if len(_compiled_schemas) > MAX_COMPILED_SCHEMAS:
+                _compiled_schemas.popitem(last=False)
+        return compiled_schema
+
+    @classmethod
+    def get_stage_timings(cls) -> dict[str, dict[str, float]]:
+        """Returns the number of calls and total time of each translation stage.
+
+        Stages served from the caches are not counted.
+        """
+        with _stage_timings_lock:
+            return {
+                stage: {"calls": calls, "total_seconds": total_seconds}
+                for stage, (calls, total_seconds) in _stage_timings.items()
+            }
+
+    @classmethod
+    def reset_stage_timings(cls) -> None:
+        """Resets the timings of the translation stages."""
+        with _stage_timings_lock:
+            _stage_timings.clear()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=MAX_CACHED_QUERIES)
+    def _optimize(
+        sql_query: str,
+        sql_dialect: str,
+        db: str | None,
+        catalog: str | None,
+        compiled_schema: CompiledSchema | None,
+    ) -> tuple[str | None, str | None]:
+        """Parses and optimizes the SQL query, memoized by query and schema.
+
+        Returns:
+          tuple of the errors in the SQL query, or None if there are no errors, and
+          the optimized SQL query, or None if there are errors.
+        """
+        schema = compiled_schema.mapping_schema if compiled_schema else None
+        try:
+            # First, try to parse the SQL query into a SQLGlot AST.
+            with _timed("parse"):
+                sql_query_ast = sqlglot.parse_one(
+                    sql=sql_query,
+                    read=sql_dialect,
+                    error_level=sqlglot.ErrorLevel.IMMEDIATE,
+                )
+            # Then add the database and catalog information for each table to the AST.
+            # References to common table expressions are not tables.
+            cte_names = {cte.alias for cte in sql_query_ast.find_all(sqlglot.exp.CTE)}
+            for table in sql_query_ast.find_all(sqlglot.exp.Table):
+                if not table.db and table.name in cte_names:
+                    continue
+                table.set("catalog", sqlglot.exp.Identifier(this=catalog, quoted=True))
+                table.set("db", sqlglot.exp.Identifier(this=db, quoted=True))
+            # Then, try to optimize the SQL query.
+            with _timed("optimize"):
+                sql_query_ast = sqlglot.optimizer.optimize(
+                    sql_query_ast,
+                    dialect=sql_dialect,
+                    schema=schema,
+                    db=db,
+                    catalog=catalog,
+                    error_level=sqlglot.ErrorLevel.IMMEDIATE,
+                )
+            # The SQL is cached rather than the AST, which callers could modify.
+            return None, sql_query_ast.sql(sql_dialect)
+        except sqlglot.errors.SqlglotError as e:
+            return str(e), None
+
     @classmethod
     def _check_for_errors(
         cls,
@@ -303,7 +490,7 @@ class SqlTranslator:
         sql_dialect: str,
         db: str | None = None,
         catalog: str | None = None,
-        schema_dict: SQLGlotSchemaType | None = None,
+        schema_dict: SQLGlotSchemaType | CompiledSchema | None = None,
     ) -> tuple[str | None, str]:
         """Checks for errors in the SQL query.
 
@@ -314,45 +501,51 @@ class SqlTranslator:
           catalog: The catalog to use for the translation. `catalog` is the SQLGlot
             term for the project ID. This field is optional.
           schema_dict: The DDL schema to use for the translation. The DDL format is
-            in the SQLGlot format. This field is optional.
+            in the SQLGlot format, or already compiled. This field is optional.
 
         Returns:
           tuple of the errors in the SQL query, or None if there are no errors, and
           the SQL query after optimization.
         """
-        try:
-            # First, try to parse the SQL query into a SQLGlot AST.
-            sql_query_ast = sqlglot.parse_one(
-                sql=sql_query,
-                read=sql_dialect.lower(),
-                error_level=sqlglot.ErrorLevel.IMMEDIATE,
+        sql_dialect = sql_dialect.lower()
+        if isinstance(schema_dict, CompiledSchema) or not schema_dict:
+            compiled_schema = schema_dict or None
+        else:
+            # The schema is already in the SQLGlot format.
+            compiled_schema = cls._compile_schema_dict(
+                schema_dict, sql_dialect, lambda schema: schema
             )
-            # Then add the database and catalog information for each table to the AST.
-            for table in sql_query_ast.find_all(sqlglot.exp.Table):
-                table.set("catalog", sqlglot.exp.Identifier(this=catalog, quoted=True))
-                table.set("db", sqlglot.exp.Identifier(this=db, quoted=True))
-            # Then, try to optimize the SQL query.
-            sql_query_ast = sqlglot.optimizer.optimize(
-                sql_query_ast,
-                dialect=sql_dialect.lower(),
-                schema=schema_dict,
-                db=db,
-                catalog=catalog,
+        errors, optimized_sql_query = cls._optimize(
+            sql_query, sql_dialect, db, catalog, compiled_schema
+        )
+        if errors:
+            return errors, sql_query
+        return None, optimized_sql_query
+
+    @staticmethod
+    @functools.lru_cache(maxsize=MAX_CACHED_QUERIES)
+    def _transpile(sql_query: str, read: str, write: str) -> str:
+        """Transpiles the SQL query, memoized by query and dialects."""
+        with _timed("transpile"):
+            return sqlglot.transpile(
+                sql=sql_query,
+                read=read,
+                write=write,
                 error_level=sqlglot.ErrorLevel.IMMEDIATE,
-            )
-            sql_query = sql_query_ast.sql(sql_dialect.lower())
-        except sqlglot.errors.SqlglotError as e:
-            return str(e), sql_query
-        return None, sql_query
+            )[
+                0
+            ]  # Transpile returns a list of strings.
 
-    def _fix_errors(
+    async def _fix_errors(
         self,
         sql_query: str,
         sql_dialect: str,
         apply_heuristics: bool,
         db: str | None = None,
         catalog: str | None = None,
-        ddl_schema: str | SQLGlotSchemaType | BirdSampleType | None = None,
+        ddl_schema: (
+            str | SQLGlotSchemaType | BirdSampleType | CompiledSchema | None
+        ) = None,
         number_of_candidates: int = 1,
     ) -> str:
         """Fixes errors in the SQL query.
@@ -366,7 +559,8 @@ class SqlTranslator:
             term for the project ID. This field is optional.
           ddl_schema: The DDL schema to use for the translation. The DDL format can
             be the SQLGlot format, the DDL schema format, a Bird dataset example, or
-            a string containing multiple DDL statements. This field is optional.
+            a string containing multiple DDL statements, or already compiled. This
+            field is optional.
           number_of_candidates: The number of candidates to generate, default is 1.
 
         Returns:
@@ -374,15 +568,17 @@ class SqlTranslator:
         """
         if apply_heuristics:
             sql_query = self._apply_heuristics(sql_query)
-        # Reformat the schema if provided. This will remove any comments and
-        # `INSERT INTO` statements.
-        schema_dict = self.rewrite_schema_for_sqlglot(ddl_schema)
-        errors_and_sql: tuple[str | None, str] = self._check_for_errors(
+        # Compile the schema if provided. This will remove any comments and
+        # `INSERT INTO` statements. The schema is compiled once per content.
+        compiled_schema = self.compile_schema(ddl_schema)
+        schema_dict = compiled_schema.schema_dict if compiled_schema else None
+        errors_and_sql: tuple[str | None, str] = await asyncio.to_thread(
+            self._check_for_errors,
             sql_query=sql_query,
             sql_dialect=self.OUTPUT_DIALECT,
             db=db,
             catalog=catalog,
-            schema_dict=schema_dict,
+            schema_dict=compiled_schema,
         )
         errors, sql_query = errors_and_sql
         responses = sql_query  # Default to the input SQL query after error check.
@@ -400,27 +596,78 @@ class SqlTranslator:
                 schema_insert=schema_insert,
             )
             requests: list[str] = [prompt for _ in range(number_of_candidates)]
-            responses: list[str] = self._model.call_parallel(
-                requests, parser_func=self._parse_response
-            )
-            if responses:
-                # We only use the first response. Therefore the `number_of_candidates`
-                # parameter is not used.
-                # pylint: disable=g-bad-todo
-                # pylint: enable=g-bad-todo
-                # First, find the first non-None response.
-                responses = [r for r in responses if r is not None]
-                if responses:
-                    # Then, return the first non-None response.
-                    responses = responses[0]
+            with _timed("correction"):
+                responses: list[str | None] = await self._model.call_many(
+                    requests, parser_func=self._parse_response
+                )
+            # First, drop the corrections that timed out or failed.
+            corrections = [r for r in responses if r is not None]
+            # Then, select the most frequent correction without errors, or keep
+            # the input SQL query if there is none.
+            responses = sql_query
+            if corrections:
+                responses = await asyncio.to_thread(
+                    self._select_correction,
+                    corrections,
+                    db=db,
+                    catalog=catalog,
+                    schema_dict=compiled_schema,
+                )
         return responses
 
-    def translate(
+    @classmethod
+    def _select_correction(
+        cls,
+        sql_queries: list[str],
+        db: str | None = None,
+        catalog: str | None = None,
+        schema_dict: SQLGlotSchemaType | CompiledSchema | None = None,
+    ) -> str:
+        """Selects the most frequent corrected SQL query without errors.
+
+        Queries are grouped by their normalized SQLGlot AST. Ties are broken by
+        order, and the first query is returned if all of them have errors.
+        """
+        counts: dict[str, list[Any]] = {}
+        for sql_query in sql_queries:
+            try:
+                key = sqlglot.parse_one(
+                    sql_query,
+                    read=cls.OUTPUT_DIALECT,
+                    error_level=sqlglot.ErrorLevel.IMMEDIATE,
+                ).sql(
+                    dialect=cls.OUTPUT_DIALECT,
+                    normalize=True,
+                    normalize_functions="upper",
+                    comments=False,
+                )
+            except sqlglot.errors.SqlglotError:
+                key = sql_query.strip()
+            if key in counts:
+                counts[key][1] += 1
+            else:
+                counts[key] = [sql_query, 1]
+        by_frequency = sorted(counts.values(), key=lambda v: v[1], reverse=True)
+        for sql_query, _ in by_frequency:
+            errors, _ = cls._check_for_errors(
+                sql_query=sql_query,
+                sql_dialect=cls.OUTPUT_DIALECT,
+                db=db,
+                catalog=catalog,
+                schema_dict=schema_dict,
+            )
+            if not errors:
+                return sql_query
+        return sql_queries[0]
+
+    async def translate(
         self,
         sql_query: str,
         db: str | None = None,
         catalog: str | None = None,
-        ddl_schema: str | SQLGlotSchemaType | BirdSampleType | None = None,
+        ddl_schema: (
+            str | SQLGlotSchemaType | BirdSampleType | CompiledSchema | None
+        ) = None,
     ) -> str:
         """Translates the SQL query to the output SQL dialect.
 
@@ -430,14 +677,15 @@ class SqlTranslator:
           catalog: The catalog to use for the translation. `catalog` is the SQLGlot
             term for the project ID. This field is optional.
           ddl_schema: The DDL schema to use for the translation. The DDL format can
-            be the SQLGlot format or the DDL schema format. This field is optional.
+            be the SQLGlot format or the DDL schema format, or already compiled.
+            This field is optional.
 
         Returns:
           The translated SQL query.
         """
         print("****** sql_query at translator entry:", sql_query)
         if self._process_input_errors:
-            sql_query = self._fix_errors(
+            sql_query = await self._fix_errors(
                 sql_query,
                 db=db,
                 catalog=catalog,
@@ -446,17 +694,12 @@ class SqlTranslator:
                 apply_heuristics=True,
             )
         print("****** sql_query after fix_errors:", sql_query)
-        sql_query = sqlglot.transpile(
-            sql=sql_query,
-            read=self.INPUT_DIALECT,
-            write=self.OUTPUT_DIALECT,
-            error_level=sqlglot.ErrorLevel.IMMEDIATE,
-        )[
-            0
-        ]  # Transpile returns a list of strings.
+        sql_query = self._transpile(
+            sql_query, self.INPUT_DIALECT, self.OUTPUT_DIALECT
+        )
         print("****** sql_query after transpile:", sql_query)
         if self._tool_output_errors:
-            sql_query = self._fix_errors(
+            sql_query = await self._fix_errors(
                 sql_query,
                 db=db,
                 catalog=catalog,
@@ -0,0 +1,277 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Semantic cache of the NL2SQL translations.
+
+The SQL generated for a question is cached once it ran successfully on
+BigQuery. A question is answered from the cache if its normalized text is the
+same as a cached question. If an embedding model is set, it is also answered
+from the cache if it has the same content words as a cached question, and
+their embeddings are similar enough. Entries are only used with the schema
+they were generated for, and until they are too old. Questions relative to
+the current date, like "sales this month", are not cached.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+# An embedder returns the embedding of a text.
+Embedder = Callable[[str], list[float]]
+
+# Words ignored when comparing the content words of two questions. Words that
+# change the answer, like "not", "or", "before" or "per", are not in the list.
+STOP_WORDS = frozenset("""
+    a about all an and any are as at be by can could did do does for from get
+    give had has have how i in is it its list me much my of on our please show
+    some tell that the their there these this those to was we were what when
+    which who whose with would you your
+    """.split())
+
+# Questions relative to the current date or time. Their SQL may hard-code the
+# date of the day it was generated.
+TIME_RELATIVE_PATTERN = re.compile(
+    r"""\b(
+    now | today | tonight | yesterday | tomorrow | current(ly)? | recent(ly)?
+    | latest | so \s far | to \s date | [ymqw]td
+    | (this | last | next | past | previous | coming) (\s \d+)?
+      \s (hour | day | week | month | quarter | year | decade)s?
+    )\b""",
+    re.VERBOSE,
+)
+
+
+def get_schema_hash(bq_schema_and_samples: dict[str, Any]) -> str:
+    """Returns the hash of the tables and columns, without the sample values."""
+    schema = {
+        table_ref: [list(column) for column in table["table_schema"]]
+        for table_ref, table in bq_schema_and_samples.items()
+    }
+    return hashlib.sha256(
+        json.dumps(schema, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def normalize_question(question: str) -> str:
+    """Normalizes the case, punctuation and whitespace of the question."""
+    return " ".join(re.findall(r"\w+", question.lower()))
+
+
+def is_time_relative(normalized_question: str) -> bool:
+    """Returns whether the question is relative to the current date or time."""
+    return TIME_RELATIVE_PATTERN.search(normalized_question) is not None
+
+
+def _get_content_words(normalized_question: str) -> list[str]:
+    """Returns the words of the question outside the stop words, sorted.
+
+    Similar questions must have the same content words: names, values and
+    numbers are not reliably told apart by embeddings.
+    """
+    return sorted(w for w in normalized_question.split() if w not in STOP_WORDS)
+
+
+def get_genai_embedder(client: Any, model: str) -> Embedder:
+    """Returns an embedder calling a Gemini API embedding model."""
+
+    def embed(text: str) -> list[float]:
+        response = client.models.embed_content(model=model, contents=text)
+        return list(response.embeddings[0].values)
+
+    return embed
+
+
+def _cosine_similarity(a: list[float], b: list[float]) -> float:
+    a, b = np.asarray(a), np.asarray(b)
+    norm = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(a @ b / norm) if norm else 0.0
+
+
+class NL2SQLCache:
+    """Cache of the SQL generated for the questions, by schema.
+
+    Attributes:
+      path: The path of the cache file, or None to keep the cache in memory.
+      similarity_threshold: The minimum cosine similarity of the embeddings of
+        two questions with the same answer.
+      max_entries: The maximum number of entries. The least recently used
+        entries are removed first.
+      max_age: The maximum age of the entries in seconds, or None to keep them
+        until the schema changes.
+      embedder: The embedder of the questions, or None to only answer the
+        questions asked again.
+      embedder_name: The name of the embedder. Embeddings of other embedders
+        are not compared.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        similarity_threshold: float = 0.9,
+        max_entries: int = 1000,
+        max_age: Optional[float] = 7 * 24 * 3600,
+        embedder: Optional[Embedder] = None,
+        embedder_name: Optional[str] = None,
+    ):
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.embedder = embedder
+        self.embedder_name = embedder_name
+        self._lock = threading.Lock()
+        self._entries: list[dict[str, Any]] = self._load()
+        self._metrics = {"exact_hits": 0, "similar_hits": 0, "misses": 0}
+
+    def _load(self) -> list[dict[str, Any]]:
+        if not self.path:
+            return []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning("Could not save the NL2SQL cache %s: %s", self.path, e)
+
+    def _embed(self, question: str) -> Optional[list[float]]:
+        if self.embedder is None:
+            return None
+        try:
+            return self.embedder(question)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.warning("Could not embed the question: %s", e)
+            return None
+
+    def invalidate(self, schema_hash: str) -> None:
+        """Removes the entries generated for other schemas, or too long ago."""
+        min_created_at = time.time() - self.max_age if self.max_age else 0
+        with self._lock:
+            entries = [
+                e
+                for e in self._entries
+                if e["schema_hash"] == schema_hash
+                and e.get("created_at", 0) >= min_created_at
+            ]
+            if len(entries) != len(self._entries):
+                self._entries = entries
+                self._save()
+
+    def get(self, question: str, schema_hash: str) -> Optional[str]:
+        """Gets the cached SQL of the question for the schema, if any."""
+        self.invalidate(schema_hash)
+        normalized = normalize_question(question)
+        with self._lock:
+            match = next(
+                (e for e in self._entries if e["normalized_question"] == normalized),
+                None,
+            )
+            if match is not None:
+                self._metrics["exact_hits"] += 1
+        if match is None:
+            match = self._get_similar(normalized)
+        with self._lock:
+            if match is None:
+                self._metrics["misses"] += 1
+            else:
+                match["used_at"] = time.time()
+            metrics = self._get_metrics()
+        logging.info("NL2SQL cache metrics: %s", metrics)
+        return match["sql"] if match else None
+
+    def _get_similar(self, normalized: str) -> Optional[dict[str, Any]]:
+        """Gets the entry of the most similar question with the same content."""
+        embedding = self._embed(normalized)
+        if embedding is None:
+            return None
+        content_words = _get_content_words(normalized)
+        with self._lock:
+            best_entry, best_similarity = None, self.similarity_threshold
+            for entry in self._entries:
+                if (
+                    entry["embedder"] != self.embedder_name
+                    or len(entry["embedding"]) != len(embedding)
+                    or _get_content_words(entry["normalized_question"]) != content_words
+                ):
+                    continue
+                similarity = _cosine_similarity(embedding, entry["embedding"])
+                if similarity >= best_similarity:
+                    best_entry, best_similarity = entry, similarity
+            if best_entry is not None:
+                self._metrics["similar_hits"] += 1
+        return best_entry
+
+    def put(self, question: str, sql: str, schema_hash: str) -> None:
+        """Caches the SQL of the question, once it ran successfully.
+
+        Questions relative to the current date or time are not cached.
+        """
+        normalized = normalize_question(question)
+        if is_time_relative(normalized):
+            logging.info("Not caching the time relative question: %s", question)
+            return
+        now = time.time()
+        entry = {
+            "question": question,
+            "normalized_question": normalized,
+            "embedding": self._embed(normalized) or [],
+            "embedder": self.embedder_name,
+            "sql": sql,
+            "schema_hash": schema_hash,
+            "created_at": now,
+            "used_at": now,
+        }
+        with self._lock:
+            self._entries = [
+                e
+                for e in self._entries
+                if e["normalized_question"] != normalized
+                or e["schema_hash"] != schema_hash
+            ]
+            self._entries.append(entry)
+            if len(self._entries) > self.max_entries:
+                self._entries.sort(key=lambda e: e["used_at"])
+                self._entries = self._entries[-self.max_entries :]
+            self._save()
+
+    def _get_metrics(self) -> dict[str, Any]:
+        lookups = sum(self._metrics.values())
+        hits = self._metrics["exact_hits"] + self._metrics["similar_hits"]
+        return {
+            **self._metrics,
+            "lookups": lookups,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Returns the hits, misses and hit rate of the lookups."""
+        with self._lock:
+            return self._get_metrics()
@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local dry run of the generated SQL before its execution on BigQuery."""
+
+import collections
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Any
+
+import sqlglot
+
+from .chase_sql import candidate_selection
+from .chase_sql.sql_postprocessor import sql_translator
+
+MAX_PREVIEW_ROWS = 5
+
+# Maximum number of replicas kept in memory. Sessions usually share a dataset.
+MAX_REPLICAS = 4
+
+# Recently used replicas of the sampled tables, by hash of the schema and samples.
+_replicas: collections.OrderedDict[str, candidate_selection.SampleDatabase] = (
+    collections.OrderedDict()
+)
+_replicas_lock = threading.Lock()
+
+
+def get_replica(
+    bq_schema_and_samples: dict[str, Any],
+) -> candidate_selection.SampleDatabase:
+    """Gets the in-memory SQLite replica of the sampled tables."""
+    key = hashlib.sha256(
+        json.dumps(bq_schema_and_samples, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    with _replicas_lock:
+        replica = _replicas.get(key)
+        if replica is None:
+            replica = _replicas[key] = candidate_selection.SampleDatabase(
+                bq_schema_and_samples
+            )
+            if len(_replicas) > MAX_REPLICAS:
+                _replicas.popitem(last=False)
+        else:
+            _replicas.move_to_end(key)
+        return replica
+
+
+def _get_unknown_tables(
+    ast: sqlglot.exp.Expression, table_names: set[str], db: str, catalog: str
+) -> list[str]:
+    """Returns the tables of the query that are not in the dataset."""
+    cte_names = {cte.alias for cte in ast.find_all(sqlglot.exp.CTE)}
+    unknown_tables = []
+    for table in ast.find_all(sqlglot.exp.Table):
+        if not table.db and table.name in cte_names:
+            continue
+        if (
+            table.name not in table_names
+            or table.db not in ("", db)
+            or table.catalog not in ("", catalog)
+        ):
+            unknown_tables.append(table.sql(dialect="bigquery"))
+    return unknown_tables
+
+
+def validate_sql(
+    sql_query: str,
+    bq_schema_and_samples: dict[str, Any],
+    db: str,
+    catalog: str,
+) -> dict[str, Any]:
+    """Validates a BigQuery SQL query locally, without running a BigQuery job.
+
+    The query is parsed and its tables and columns are resolved against the
+    schema. It is then translated to SQLite and run on a replica of the
+    sampled tables. Queries using tables outside the dataset, or features that
+    SQLite does not support, cannot be validated locally.
+
+    Args:
+        sql_query (str): The BigQuery SQL query.
+        bq_schema_and_samples (dict): The schema and sample values of the tables.
+        db (str): The dataset of the tables.
+        catalog (str): The project of the tables.
+
+    Returns:
+        dict: The "status" of the validation: "ERROR" with the "error_details"
+        if the query is invalid, "SUCCESS" with the "preview_rows" of its result
+        on the sample rows, or "UNKNOWN" with the "error_details" if the query
+        cannot be validated locally.
+    """
+    try:
+        ast = sqlglot.parse_one(
+            sql_query, read="bigquery", error_level=sqlglot.ErrorLevel.IMMEDIATE
+        )
+    except sqlglot.errors.SqlglotError as e:
+        return {"status": "ERROR", "error_details": str(e)}
+
+    replica = get_replica(bq_schema_and_samples)
+    unknown_tables = _get_unknown_tables(ast, replica.table_names, db, catalog)
+    if unknown_tables:
+        return {
+            "status": "UNKNOWN",
+            "error_details": f"Tables not in the dataset: {', '.join(unknown_tables)}",
+        }
+
+    compiled_schema = sql_translator.SqlTranslator.compile_schema(
+        candidate_selection.get_ddl_schema(bq_schema_and_samples)
+    )
+    # pylint: disable-next=protected-access
+    errors, _ = sql_translator.SqlTranslator._check_for_errors(
+        sql_query=sql_query,
+        sql_dialect="bigquery",
+        db=db,
+        catalog=catalog,
+        schema_dict=compiled_schema,
+    )
+    if errors:
+        return {"status": "ERROR", "error_details": errors}
+
+    try:
+        columns, rows = replica.execute(sql_query, max_rows=MAX_PREVIEW_ROWS)
+    except (
+        sqlglot.errors.SqlglotError,
+        sqlite3.Error,
+        OverflowError,
+        ValueError,
+    ) as e:
+        return {"status": "UNKNOWN", "error_details": str(e)}
+    return {
+        "status": "SUCCESS",
+        "preview_rows": [dict(zip(columns, row)) for row in rows],
+    }
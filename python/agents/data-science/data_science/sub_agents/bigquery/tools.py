@@ -14,9 +14,14 @@
 
 """This file contains the tools used by the database agent."""
 
+from concurrent.futures import ThreadPoolExecutor
 import datetime
+import json
 import logging
 import os
+import tempfile
+import threading
+import time
 
 import numpy as np
 import pandas as pd
@@ -26,6 +31,7 @@ from google.adk.tools.bigquery.client import get_bigquery_client
 from google.cloud import bigquery
 from google.genai import Client
 
+from . import nl2sql_cache
 from .chase_sql import chase_constants
 
 # Assume that `BQ_COMPUTE_PROJECT_ID` and `BQ_DATA_PROJECT_ID` are set in the
@@ -37,7 +43,46 @@ vertex_project = get_env_var("GOOGLE_CLOUD_PROJECT")
 location = get_env_var("GOOGLE_CLOUD_LOCATION")
 llm_client = Client(vertexai=True, project=vertex_project, location=location)
 
-MAX_NUM_ROWS = 80
+MAX_NUM_ROWS = 1000
+
+# Schema and sample rows of the tables are cached on disk. Cached tables are
+# checked again after `SCHEMA_CACHE_TTL` seconds, and sampled again only if
+# they changed.
+SCHEMA_CACHE_PATH = os.getenv(
+    "BQ_SCHEMA_CACHE_PATH",
+    os.path.join(
+        tempfile.gettempdir(), f"bq_schema_cache_{data_project}_{dataset_id}.json"
+    ),
+)
+SCHEMA_CACHE_TTL = int(os.getenv("BQ_SCHEMA_CACHE_TTL", "3600"))
+SCHEMA_MAX_WORKERS = int(os.getenv("BQ_SCHEMA_MAX_WORKERS", "16"))
+NUM_SAMPLE_ROWS = 5
+
+# SQL generated for the questions is cached once it ran successfully. Questions
+# asked again are answered from the cache, and similar questions too if an
+# embedding model is set. Entries expire after NL2SQL_CACHE_MAX_AGE seconds.
+NL2SQL_CACHE_PATH = os.getenv(
+    "NL2SQL_CACHE_PATH",
+    os.path.join(
+        tempfile.gettempdir(), f"nl2sql_cache_{data_project}_{dataset_id}.json"
+    ),
+)
+NL2SQL_CACHE_EMBEDDING_MODEL = os.getenv("NL2SQL_CACHE_EMBEDDING_MODEL")
+sql_cache = nl2sql_cache.NL2SQLCache(
+    path=NL2SQL_CACHE_PATH,
+    similarity_threshold=float(os.getenv("NL2SQL_CACHE_SIMILARITY", "0.9")),
+    max_age=float(os.getenv("NL2SQL_CACHE_MAX_AGE", str(7 * 24 * 3600))),
+    **(
+        {
+            "embedder": nl2sql_cache.get_genai_embedder(
+                llm_client, NL2SQL_CACHE_EMBEDDING_MODEL
+            ),
+            "embedder_name": NL2SQL_CACHE_EMBEDDING_MODEL,
+        }
+        if NL2SQL_CACHE_EMBEDDING_MODEL
+        else {}
+    ),
+)
 
 
 def _serialize_value_for_sql(value):
@@ -63,50 +108,163 @@ def _serialize_value_for_sql(value):
 
 
 database_settings = None
+database_settings_updated_at = 0.0
+_database_settings_lock = threading.Lock()
 
 
 def get_database_settings():
-    """Get database settings."""
+    """Get database settings, updated at most every `SCHEMA_CACHE_TTL` seconds."""
     global database_settings
-    if database_settings is None:
-        database_settings = update_database_settings()
+    with _database_settings_lock:
+        if (
+            database_settings is None
+            or time.time() - database_settings_updated_at >= SCHEMA_CACHE_TTL
+        ):
+            database_settings = update_database_settings()
     return database_settings
 
 
+def refresh_database_settings(state):
+    """Copies the database settings to the session state if they were updated.
+
+    Args:
+        state: The session state.
+
+    Returns:
+        dict: The database settings of the session state.
+    """
+    settings = get_database_settings()
+    session_settings = state.get("database_settings") or {}
+    if any(
+        session_settings.get(key) != settings[key]
+        for key in ("bq_schema_hash", "updated_at")
+    ):
+        state["database_settings"] = settings
+    return state["database_settings"]
+
+
 def update_database_settings():
     """Update database settings."""
-    global database_settings
+    global database_settings, database_settings_updated_at
     schema_and_samples = get_bigquery_schema_and_samples()
+    database_settings_updated_at = time.time()
     database_settings = {
         "bq_data_project_id": get_env_var("BQ_DATA_PROJECT_ID"),
         "bq_dataset_id": get_env_var("BQ_DATASET_ID"),
         "bq_schema_and_samples": schema_and_samples,
+        "bq_schema_hash": nl2sql_cache.get_schema_hash(schema_and_samples),
+        "updated_at": database_settings_updated_at,
         # Include ChaseSQL-specific constants.
         **chase_constants.chase_sql_constants_dict,
     }
     return database_settings
 
 
-def get_bigquery_schema_and_samples():
-    """Retrieves schema and sample values for the BigQuery dataset tables."""
-    client=get_bigquery_client(project=compute_project, credentials=None)
-    dataset_ref = bigquery.DatasetReference(data_project, dataset_id)
-    tables_context = {}
-    for table in client.list_tables(dataset_ref):
-        table_info = client.get_table(
-            bigquery.TableReference(dataset_ref, table.table_id)
-        )
-        table_schema = [
+def _load_schema_cache(cache_path):
+    """Loads the cached tables, by table reference."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_schema_cache(cache_path, cache):
+    """Saves the cached tables, replacing the cache file atomically."""
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logging.warning("Could not save the schema cache %s: %s", cache_path, e)
+
+
+def _get_sample_values(client, table_info):
+    """Gets the first rows of the table, serialized as SQL literals."""
+    if table_info.table_type == "TABLE":
+        # Reading rows directly does not run a query job nor scan the table.
+        sample_df = client.list_rows(
+            table_info, max_results=NUM_SAMPLE_ROWS
+        ).to_dataframe()
+    else:
+        # Views and external tables can only be read by a query.
+        sample_query = f"SELECT * FROM `{table_info.reference}` LIMIT {NUM_SAMPLE_ROWS}"
+        sample_df = client.query(sample_query).to_dataframe()
+    sample_values = sample_df.to_dict(orient="list")
+    for key in sample_values:
+        sample_values[key] = [_serialize_value_for_sql(v) for v in sample_values[key]]
+    return sample_values
+
+
+def _get_table_entry(client, table_ref, cached_entry, ttl, now):
+    """Gets the cache entry of a table, fetching only what has changed."""
+    if cached_entry and now - cached_entry["fetched_at"] < ttl:
+        return cached_entry
+    table_info = client.get_table(table_ref)
+    modified = table_info.modified.isoformat() if table_info.modified else None
+    if (
+        cached_entry
+        and cached_entry["etag"] == table_info.etag
+        and cached_entry["modified"] == modified
+    ):
+        return {**cached_entry, "fetched_at": now}
+    return {
+        "etag": table_info.etag,
+        "modified": modified,
+        "fetched_at": now,
+        "table_schema": [
             (schema_field.name, schema_field.field_type)
             for schema_field in table_info.schema
-        ]
+        ],
+        "example_values": _get_sample_values(client, table_info),
+    }
+
+
+def get_bigquery_schema_and_samples(
+    client=None,
+    cache_path=SCHEMA_CACHE_PATH,
+    ttl=SCHEMA_CACHE_TTL,
+    max_workers=SCHEMA_MAX_WORKERS,
+):
+    """Retrieves schema and sample values for the BigQuery dataset tables.
+
+    Tables are introspected concurrently, and only those that changed since
+    they were cached are sampled again.
+
+    Args:
+        client: The BigQuery client, by default the ADK client of the compute
+          project.
+        cache_path: The path of the schema cache file, or None to disable the
+          cache.
+        ttl: The time in seconds during which cached tables are used as is.
+        max_workers: The maximum number of tables introspected concurrently.
+
+    Returns:
+        dict: The schema and sample values of each table, by table reference.
+    """
+    if client is None:
+        client = get_bigquery_client(project=compute_project, credentials=None)
+    dataset_ref = bigquery.DatasetReference(data_project, dataset_id)
+    cache = _load_schema_cache(cache_path) if cache_path else {}
+    now = time.time()
+
+    def get_entry(table):
         table_ref = dataset_ref.table(table.table_id)
-        sample_query = f"SELECT * FROM `{table_ref}` LIMIT 5"
-        sample_values = client.query(sample_query).to_dataframe().to_dict(orient="list")
-        for key in sample_values:
-            sample_values[key] = [_serialize_value_for_sql(v) for v in sample_values[key]]
-        tables_context[str(table_ref)] = {"table_schema": table_schema, "example_values": sample_values}
+        key = str(table_ref)
+        return key, _get_table_entry(client, table_ref, cache.get(key), ttl, now)
 
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        entries = list(executor.map(get_entry, client.list_tables(dataset_ref)))
+    if cache_path:
+        _save_schema_cache(cache_path, dict(entries))
+
+    tables_context = {}
+    for key, entry in entries:
+        tables_context[key] = {
+            "table_schema": [tuple(column) for column in entry["table_schema"]],
+            "example_values": entry["example_values"],
+        }
     return tables_context
 
 
@@ -31,7 +31,7 @@ from .prompts import return_instructions_bqml
 
 from data_science.sub_agents.bigquery.agent import database_agent as bq_db_agent
 from data_science.sub_agents.bigquery.tools import (
-    get_database_settings as get_bq_database_settings,
+    refresh_database_settings as refresh_bq_database_settings,
 )
 
 
@@ -51,8 +51,8 @@ def setup_before_agent_call(callback_context: CallbackContext):
 
     # setting up schema in instruction
     if callback_context.state["all_db_settings"]["use_database"] == "BigQuery":
-        callback_context.state["database_settings"] = get_bq_database_settings()
-        schema = callback_context.state["database_settings"]["bq_schema_and_samples"]
+        database_settings = refresh_bq_database_settings(callback_context.state)
+        schema = database_settings["bq_schema_and_samples"]
 
         callback_context._invocation_context.agent.instruction = (
             return_instructions_bqml()
@@ -52,13 +52,24 @@ async def call_ds_agent(
     if question == "N/A":
         return tool_context.state["db_agent_output"]
 
-    input_data = tool_context.state["query_result"]
+    query_result = tool_context.state["query_result"]
 
-    question_with_data = f"""
+    if isinstance(query_result, dict) and "artifact" in query_result:
+        # The rows are loaded by the code executor from the artifact.
+        question_with_data = f"""
+  Question to answer: {question}
+
+  Actual data to analyze prevoius quesiton is in the file {query_result["artifact"]}.
+  Load it with `df = pd.read_parquet("{query_result["artifact"]}")`.
+  {query_result["summary"]}
+
+  """
+    else:
+        question_with_data = f"""
   Question to answer: {question}
 
   Actual data to analyze prevoius quesiton is already in the following:
-  {input_data}
+  {query_result}
 
   """
 
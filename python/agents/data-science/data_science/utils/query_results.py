@@ -0,0 +1,147 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Hand-off of the query results from the database agent to the analytics agent.
+
+The rows are stored once, as a Parquet artifact. The session state only holds
+a reference to the artifact with a summary of the data, and the code executor
+of the analytics agent gets the artifact as an input file.
+"""
+
+import base64
+import dataclasses
+import io
+import logging
+from typing import Any, Optional
+
+import pandas as pd
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.code_executors import VertexAiCodeExecutor
+from google.adk.code_executors.code_execution_utils import (
+    CodeExecutionInput,
+    CodeExecutionResult,
+    File,
+)
+from google.adk.tools import ToolContext
+from google.genai import types
+from pydantic import PrivateAttr
+
+QUERY_RESULT_FILENAME = "query_result.parquet"
+PARQUET_MIME_TYPE = "application/vnd.apache.parquet"
+
+
+def describe_dataframe(df: pd.DataFrame) -> str:
+    """Describes the schema and summary statistics of the data."""
+    lines = [f"{len(df)} rows, {len(df.columns)} columns:"]
+    for column in df.columns:
+        lines.append(
+            f"- {column}: {df[column].dtype}, {df[column].isna().sum()} null values"
+        )
+    if len(df.columns) and len(df):
+        lines.append("Summary statistics:")
+        lines.append(df.describe(include="all").transpose().to_string())
+    return "\n".join(lines)
+
+
+async def save_query_result(
+    tool_context: ToolContext, rows: list[dict[str, Any]]
+) -> Optional[dict[str, Any]]:
+    """Saves the rows of a query result as a Parquet artifact.
+
+    Args:
+        tool_context (ToolContext): The context of the tool that ran the query.
+        rows (list): The rows of the query result.
+
+    Returns:
+        dict: The reference to the artifact, with the number of rows and the
+        summary of the data, or None if the rows cannot be saved as an
+        artifact.
+    """
+    df = pd.DataFrame.from_records(rows)
+    try:
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        version = await tool_context.save_artifact(
+            QUERY_RESULT_FILENAME,
+            types.Part.from_bytes(data=buffer.getvalue(), mime_type=PARQUET_MIME_TYPE),
+        )
+    except (ImportError, TypeError, ValueError) as e:
+        logging.warning("Could not save the query result as an artifact: %s", e)
+        return None
+    return {
+        "artifact": QUERY_RESULT_FILENAME,
+        "version": version,
+        "num_rows": len(df),
+        "summary": describe_dataframe(df),
+    }
+
+
+class QueryResultCodeExecutor(VertexAiCodeExecutor):
+    """Vertex AI code executor giving the query result file to the code.
+
+    The query result artifact is loaded before the agent runs, and added to the
+    input files of each execution of the invocation. It is kept by the executor
+    rather than in the session state, whose changes are forwarded to the
+    calling agent and persisted with the session.
+    """
+
+    # Query result files, by invocation ID.
+    _query_result_files: dict[str, File] = PrivateAttr(default_factory=dict)
+
+    async def load_query_result(self, callback_context: CallbackContext) -> None:
+        """Loads the query result artifact for the executions of the invocation."""
+        query_result = callback_context.state.get("query_result")
+        if not isinstance(query_result, dict) or "artifact" not in query_result:
+            return
+        try:
+            artifact = await callback_context.load_artifact(
+                query_result["artifact"], version=query_result["version"]
+            )
+        except ValueError as e:
+            # No artifact service is configured.
+            logging.warning("Could not load the artifact %s: %s", query_result, e)
+            return
+        if artifact is None or artifact.inline_data is None:
+            logging.warning("Could not load the artifact %s", query_result["artifact"])
+            return
+        self._query_result_files[callback_context.invocation_id] = File(
+            name=query_result["artifact"],
+            content=base64.b64encode(artifact.inline_data.data).decode(),
+            mime_type=PARQUET_MIME_TYPE,
+        )
+
+    def release_query_result(self, callback_context: CallbackContext) -> None:
+        """Releases the query result file once the invocation is done."""
+        self._query_result_files.pop(callback_context.invocation_id, None)
+
+    def execute_code(
+        self,
+        invocation_context: InvocationContext,
+        code_execution_input: CodeExecutionInput,
+    ) -> CodeExecutionResult:
+        query_result_file = self._query_result_files.get(
+            invocation_context.invocation_id
+        )
+        if query_result_file is not None:
+            code_execution_input = dataclasses.replace(
+                code_execution_input,
+                input_files=[
+                    f
+                    for f in code_execution_input.input_files
+                    if f.name != query_result_file.name
+                ]
+                + [query_result_file],
+            )
+        return super().execute_code(invocation_context, code_execution_input)
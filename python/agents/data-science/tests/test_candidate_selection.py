@@ -0,0 +1,104 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the execution-based selection of the CHASE-SQL candidates."""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_science.sub_agents.bigquery.chase_sql import candidate_selection
+
+BQ_SCHEMA_AND_SAMPLES = {
+    "my-project.sales.orders": {
+        "table_schema": [("id", "INTEGER"), ("country", "STRING")],
+        "example_values": {
+            "id": ["1", "2", "3"],
+            "country": ["'CA'", "'US'", "'CA'"],
+        },
+    },
+}
+
+
+def select_candidate(sql_queries):
+    return candidate_selection.select_candidate(
+        sql_queries, BQ_SCHEMA_AND_SAMPLES, db="sales", catalog="my-project"
+    )
+
+
+class TestCandidateSelection(unittest.TestCase):
+    """Test cases for `select_candidate`."""
+
+    def test_deduplicates_candidates_by_normalized_ast(self):
+        self.assertEqual(
+            candidate_selection.count_distinct(
+                [
+                    "SELECT id FROM `my-project.sales.orders`",
+                    "select id\nfrom `my-project.sales.orders`",
+                    "SELECT country FROM `my-project.sales.orders`",
+                ]
+            ),
+            [
+                ("SELECT id FROM `my-project.sales.orders`", 2),
+                ("SELECT country FROM `my-project.sales.orders`", 1),
+            ],
+        )
+
+    def test_rejects_invalid_candidates(self):
+        valid = "SELECT id FROM `my-project.sales.orders`"
+        self.assertEqual(
+            select_candidate(
+                [
+                    "SELECT region FROM `my-project.sales.orders`",
+                    "SELECT region FROM `my-project.sales.orders`",
+                    "SELECT id FROM",
+                    valid,
+                ]
+            ),
+            valid,
+        )
+
+    def test_selects_candidate_of_largest_cluster(self):
+        count_all = "SELECT COUNT(*) FROM `my-project.sales.orders`"
+        count_ca = "SELECT COUNT(*) FROM `my-project.sales.orders` WHERE country = 'CA'"
+        count_ca_ids = (
+            "SELECT COUNT(id) FROM `my-project.sales.orders` WHERE country = 'CA'"
+        )
+        # `count_all` is the most frequent candidate, but `count_ca` and
+        # `count_ca_ids` have the same result and form a larger cluster.
+        self.assertEqual(
+            select_candidate(
+                [count_all, count_ca, count_all, count_ca_ids, count_ca_ids]
+            ),
+            count_ca,
+        )
+
+    def test_candidates_without_rows_are_not_clustered(self):
+        ids_ca = "SELECT id FROM `my-project.sales.orders` WHERE country = 'CA'"
+        # Distinct queries that return no rows on the sample rows
+        no_rows = [
+            f"SELECT id FROM `my-project.sales.orders` WHERE country = '{country}'"
+            for country in ("FR", "DE", "JP")
+        ]
+        self.assertEqual(select_candidate([*no_rows, ids_ca, ids_ca]), ids_ca)
+        # Alone, they are still ranked by their own counts.
+        self.assertEqual(
+            select_candidate([no_rows[0], no_rows[1], no_rows[1]]), no_rows[1]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
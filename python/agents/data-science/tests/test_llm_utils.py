@@ -0,0 +1,171 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the rate limiting and concurrent calls of the CHASE-SQL model."""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_science.sub_agents.bigquery.chase_sql import llm_utils
+
+
+class FakeClock:
+    """Monotonic clock advanced by the tests."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for `TokenBucket`."""
+
+    def setUp(self):
+        super().setUp()
+        self.clock = FakeClock()
+        patcher = mock.patch.object(llm_utils.time, "monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bucket = llm_utils.TokenBucket(rate=2, capacity=3)
+
+    def test_burst_then_waits_in_order(self):
+        waits = [self.bucket.reserve() for _ in range(6)]
+        self.assertEqual(waits, [0.0, 0.0, 0.0, 0.5, 1.0, 1.5])
+
+    def test_tokens_refill_with_time(self):
+        for _ in range(4):
+            self.bucket.reserve()
+        self.clock.now += 1.0
+        # The reserved token is refilled first, then one for the next call.
+        self.assertEqual(self.bucket.reserve(), 0.0)
+        self.assertEqual(self.bucket.reserve(), 0.5)
+
+    def test_tokens_do_not_exceed_capacity(self):
+        self.clock.now += 100.0
+        waits = [self.bucket.reserve() for _ in range(4)]
+        self.assertEqual(waits, [0.0, 0.0, 0.0, 0.5])
+
+    def test_acquire_sleeps_for_the_wait(self):
+        for _ in range(3):
+            self.bucket.reserve()
+        with mock.patch.object(
+            llm_utils.asyncio, "sleep", new_callable=mock.AsyncMock
+        ) as sleep:
+            asyncio.run(self.bucket.acquire())
+        sleep.assert_awaited_once_with(0.5)
+
+
+class FakeResponse:
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeAsyncModel:
+    """Model failing the first attempts of the prompts starting with "flaky"."""
+
+    def __init__(self, failures=2):
+        self.failures = failures
+        self.attempts = {}
+
+    async def generate_content_async(self, prompt, **kwargs):
+        del kwargs  # Unused.
+        self.attempts[prompt] = self.attempts.get(prompt, 0) + 1
+        if prompt.startswith("flaky") and self.attempts[prompt] <= self.failures:
+            raise RuntimeError("Resource exhausted.")
+        if prompt.startswith("fail"):
+            raise RuntimeError("Internal error.")
+        if prompt.startswith("slow"):
+            await asyncio.sleep(10)
+        return FakeResponse(f"```sql SELECT '{prompt}' ```")
+
+
+class TestCallMany(unittest.IsolatedAsyncioTestCase):
+    """Test cases for `GeminiModel.call_many`."""
+
+    def setUp(self):
+        super().setUp()
+        self.fake_model = FakeAsyncModel()
+        for name, value in [
+            ("_get_generative_model", mock.Mock()),
+            ("_get_async_generative_model", mock.Mock(return_value=self.fake_model)),
+            ("_rate_limiter", llm_utils.TokenBucket(rate=1000, capacity=1000)),
+            ("get_backoff_delay", mock.Mock(return_value=0)),
+        ]:
+            patcher = mock.patch.object(llm_utils, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.model = llm_utils.GeminiModel()
+
+    async def test_returns_responses_in_order(self):
+        responses = await self.model.call_many(["a", "b", "c"])
+        self.assertEqual(
+            responses, [f"```sql SELECT '{p}' ```" for p in ["a", "b", "c"]]
+        )
+
+    async def test_parses_responses(self):
+        responses = await self.model.call_many(
+            ["a", "b"], parser_func=lambda text: text.strip("`").upper()
+        )
+        self.assertEqual(responses, ["SQL SELECT 'A' ", "SQL SELECT 'B' "])
+
+    async def test_failed_attempts_are_retried(self):
+        responses = await self.model.call_many(["flaky", "a"])
+        self.assertEqual(responses[0], "```sql SELECT 'flaky' ```")
+        self.assertEqual(self.fake_model.attempts, {"flaky": 3, "a": 1})
+
+    async def test_returns_none_on_timeout_or_failure(self):
+        start = time.monotonic()
+        responses = await self.model.call_many(
+            ["slow", "fail", "a", "slow 2"], timeout=0.2
+        )
+        self.assertEqual(responses, [None, None, "```sql SELECT 'a' ```", None])
+        # The prompts time out together, not one after the other.
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(self.fake_model.attempts["fail"], llm_utils.MAX_ATTEMPTS)
+
+    async def test_returns_none_when_parser_fails(self):
+        def parse(text):
+            if "b" in text:
+                raise ValueError("Unparsable response.")
+            return text
+
+        responses = await self.model.call_many(["a", "b"], parser_func=parse)
+        self.assertEqual(responses, ["```sql SELECT 'a' ```", None])
+
+    async def test_cancellation_is_not_retried(self):
+        task = asyncio.create_task(self.model.call_many(["slow"], timeout=60))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(self.fake_model.attempts, {"slow": 1})
+
+    def test_call_parallel_outside_event_loop(self):
+        self.assertEqual(
+            self.model.call_parallel(["a", "fail"]),
+            ["```sql SELECT 'a' ```", None],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
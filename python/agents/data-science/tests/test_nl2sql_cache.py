@@ -0,0 +1,200 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the cache of the NL2SQL translations."""
+
+import os
+import sys
+import threading
+import types
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_science.sub_agents.bigquery import agent
+from data_science.sub_agents.bigquery import nl2sql_cache
+from data_science.sub_agents.bigquery import tools
+
+SCHEMA_HASH = "schema-hash"
+
+# Questions with different answers, but most of their words in common.
+NEAR_MISSES = [
+    (
+        "What were the total sales in Texas?",
+        "What were the total sales in California?",
+    ),
+    (
+        "How many orders came from the south region?",
+        "How many orders came from the north region?",
+    ),
+    (
+        "What is the average price of the orders in autumn?",
+        "What is the average price of the orders in spring?",
+    ),
+]
+
+
+def constant_embedder(text):
+    """Embeds all the texts the same, so that only the content words differ."""
+    return [1.0, 0.0]
+
+
+class TestNL2SQLCache(unittest.TestCase):
+    """Test cases for `NL2SQLCache`."""
+
+    def _assert_near_misses_are_not_hits(self, cache):
+        for question, other_question in NEAR_MISSES:
+            with self.subTest(question=question):
+                cache.put(question, f"SQL of {question}", SCHEMA_HASH)
+                self.assertIsNone(cache.get(other_question, SCHEMA_HASH))
+
+    def test_only_answers_same_question_without_embedder(self):
+        cache = nl2sql_cache.NL2SQLCache()
+        cache.put("What were the total sales in Texas?", "SQL", SCHEMA_HASH)
+        self.assertEqual(
+            cache.get("what were the total sales in texas", SCHEMA_HASH), "SQL"
+        )
+        self.assertIsNone(cache.get("Show the total sales in Texas", SCHEMA_HASH))
+        self._assert_near_misses_are_not_hits(cache)
+
+    def test_answers_similar_question_with_same_content_words(self):
+        cache = nl2sql_cache.NL2SQLCache(
+            embedder=constant_embedder, embedder_name="constant"
+        )
+        cache.put("What were the total sales in Texas?", "SQL", SCHEMA_HASH)
+        self.assertEqual(cache.get("Show the total sales in Texas", SCHEMA_HASH), "SQL")
+        self._assert_near_misses_are_not_hits(cache)
+
+    def test_does_not_cache_time_relative_questions(self):
+        cache = nl2sql_cache.NL2SQLCache()
+        for question in [
+            "What were the total sales this month?",
+            "How many orders came in the last 7 days?",
+            "Show the sales of today",
+            "What is the revenue YTD?",
+        ]:
+            with self.subTest(question=question):
+                cache.put(question, "SQL", SCHEMA_HASH)
+                self.assertIsNone(cache.get(question, SCHEMA_HASH))
+        cache.put("What were the total sales in May 2024?", "SQL", SCHEMA_HASH)
+        self.assertEqual(
+            cache.get("What were the total sales in May 2024?", SCHEMA_HASH), "SQL"
+        )
+
+    def test_does_not_answer_with_expired_entries(self):
+        cache = nl2sql_cache.NL2SQLCache(max_age=60)
+        with mock.patch.object(nl2sql_cache.time, "time", return_value=1000.0):
+            cache.put("What were the total sales in Texas?", "SQL", SCHEMA_HASH)
+        with mock.patch.object(nl2sql_cache.time, "time", return_value=1059.0):
+            self.assertEqual(
+                cache.get("What were the total sales in Texas?", SCHEMA_HASH), "SQL"
+            )
+        # Using an entry does not extend its age.
+        with mock.patch.object(nl2sql_cache.time, "time", return_value=1061.0):
+            self.assertIsNone(
+                cache.get("What were the total sales in Texas?", SCHEMA_HASH)
+            )
+        self.assertEqual(cache.get_metrics()["entries"], 0)
+
+    def test_does_not_answer_with_other_schema(self):
+        cache = nl2sql_cache.NL2SQLCache()
+        cache.put("What were the total sales in Texas?", "SQL", SCHEMA_HASH)
+        self.assertIsNone(
+            cache.get("What were the total sales in Texas?", "other-schema-hash")
+        )
+
+
+class TestAgentCache(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the caching of the SQL run by the database agent."""
+
+    def setUp(self):
+        self.cache = nl2sql_cache.NL2SQLCache()
+        patcher = mock.patch.object(tools, "sql_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        async def save_artifact(filename, artifact):
+            return 0
+
+        self.tool_context = types.SimpleNamespace(
+            state={"database_settings": {"bq_schema_hash": SCHEMA_HASH}},
+            save_artifact=save_artifact,
+        )
+        self.nl2sql_tool = types.SimpleNamespace(name=agent.NL2SQL_TOOL)
+        self.execute_sql_tool = types.SimpleNamespace(
+            name=agent.ADK_BUILTIN_BQ_EXECUTE_SQL_TOOL
+        )
+
+    async def _generate_sql(self, question, sql):
+        args = {"question": question}
+        cached_response = await agent.get_cached_sql(
+            self.nl2sql_tool, args, self.tool_context
+        )
+        agent.record_generated_sql(
+            self.nl2sql_tool,
+            args,
+            self.tool_context,
+            cached_response or {"result": sql},
+        )
+
+    async def _execute_sql(self, sql):
+        await agent.store_results_in_context(
+            self.execute_sql_tool,
+            {"query": sql},
+            self.tool_context,
+            {"status": "SUCCESS", "rows": [{"total": 1}]},
+        )
+
+    async def test_caches_generated_sql_once_it_ran(self):
+        await self._generate_sql("Total sales in Texas?", "SELECT 'TX'")
+        self.assertIsNone(self.cache.get("Total sales in Texas?", SCHEMA_HASH))
+        await self._execute_sql("SELECT 'TX'")
+        self.assertEqual(
+            self.cache.get("Total sales in Texas?", SCHEMA_HASH), "SELECT 'TX'"
+        )
+
+    async def test_does_not_cache_other_sql(self):
+        await self._generate_sql("Total sales in Texas?", "SELECT 'TX'")
+        await self._execute_sql("SELECT 'CA'")
+        self.assertIsNone(self.cache.get("Total sales in Texas?", SCHEMA_HASH))
+
+    async def test_does_not_cache_sql_of_previous_question(self):
+        await self._generate_sql("Total sales in Texas?", "SELECT 'TX'")
+        self.assertIsNone(
+            await agent.get_cached_sql(
+                self.nl2sql_tool,
+                {"question": "Total sales in California?"},
+                self.tool_context,
+            )
+        )
+        await self._execute_sql("SELECT 'TX'")
+        self.assertIsNone(self.cache.get("Total sales in California?", SCHEMA_HASH))
+
+    async def test_embeds_questions_outside_event_loop(self):
+        embedding_threads = []
+
+        def embedder(text):
+            embedding_threads.append(threading.get_ident())
+            return [1.0, 0.0]
+
+        self.cache.embedder, self.cache.embedder_name = embedder, "test"
+        await self._generate_sql("Total sales in Texas?", "SELECT 'TX'")
+        await self._execute_sql("SELECT 'TX'")
+        self.assertEqual(len(embedding_threads), 2)
+        self.assertNotIn(threading.get_ident(), embedding_threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the hand-off of the query results to the analytics agent."""
+
+import base64
+import io
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from google.adk.code_executors import VertexAiCodeExecutor
+from google.adk.code_executors.code_execution_utils import CodeExecutionInput
+from google.genai import types as genai_types
+
+from data_science.utils import query_results
+
+
+class TestQueryResultCodeExecutor(unittest.IsolatedAsyncioTestCase):
+    """Test cases for `QueryResultCodeExecutor`."""
+
+    async def asyncSetUp(self):
+        self.df = pd.DataFrame({"country": ["CA", "US"], "total": [1.5, 2.0]})
+        buffer = io.BytesIO()
+        self.df.to_parquet(buffer, index=False)
+        artifact = genai_types.Part.from_bytes(
+            data=buffer.getvalue(), mime_type=query_results.PARQUET_MIME_TYPE
+        )
+
+        async def load_artifact(filename, version=None):
+            if filename == query_results.QUERY_RESULT_FILENAME and version == 3:
+                return artifact
+            return None
+
+        self.state = {
+            "query_result": {
+                "artifact": query_results.QUERY_RESULT_FILENAME,
+                "version": 3,
+            }
+        }
+        self.callback_context = types.SimpleNamespace(
+            state=self.state, invocation_id="invocation", load_artifact=load_artifact
+        )
+        self.invocation_context = types.SimpleNamespace(invocation_id="invocation")
+        self.executor = query_results.QueryResultCodeExecutor()
+        self.input_files = []
+
+        def execute_code_interpreter(code, input_files, execution_id):
+            self.input_files.append(input_files)
+            return {"execution_result": "", "execution_error": "", "output_files": []}
+
+        patcher = mock.patch.object(
+            VertexAiCodeExecutor,
+            "_execute_code_interpreter",
+            side_effect=execute_code_interpreter,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _execute_code(self, input_files=()):
+        # The code executor is called on the event loop of the agent.
+        return self.executor.execute_code(
+            self.invocation_context,
+            CodeExecutionInput(code="print(df)", input_files=list(input_files)),
+        )
+
+    async def test_gives_query_result_file_to_code(self):
+        await self.executor.load_query_result(self.callback_context)
+        self._execute_code()
+        (input_file,) = self.input_files[-1]
+        self.assertEqual(input_file.name, query_results.QUERY_RESULT_FILENAME)
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(io.BytesIO(base64.b64decode(input_file.content))),
+            self.df,
+        )
+
+    async def test_does_not_duplicate_query_result_file(self):
+        await self.executor.load_query_result(self.callback_context)
+        self._execute_code()
+        self._execute_code(input_files=self.input_files[-1])
+        self.assertEqual(len(self.input_files[-1]), 1)
+
+    async def test_does_not_store_query_result_file_in_state(self):
+        await self.executor.load_query_result(self.callback_context)
+        self._execute_code()
+        self.assertEqual(list(self.state), ["query_result"])
+
+    async def test_releases_query_result_file(self):
+        await self.executor.load_query_result(self.callback_context)
+        self.executor.release_query_result(self.callback_context)
+        self._execute_code()
+        self.assertEqual(self.input_files[-1], [])
+
+    async def test_runs_without_query_result_artifact(self):
+        self.state["query_result"] = [{"country": "CA", "total": 1.5}]
+        await self.executor.load_query_result(self.callback_context)
+        self._execute_code()
+        self.assertEqual(self.input_files[-1], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
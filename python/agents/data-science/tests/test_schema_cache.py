@@ -0,0 +1,156 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the cached BigQuery schema introspection."""
+
+import collections
+import datetime
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_science.sub_agents.bigquery import tools
+
+
+class FakeBigQueryClient:
+    """BigQuery client serving tables from memory and counting its calls."""
+
+    def __init__(self):
+        self.tables = {}
+        self.calls = collections.Counter()
+
+    def add_table(self, table_id, rows, table_type="TABLE", etag="etag-1"):
+        self.tables[table_id] = types.SimpleNamespace(
+            reference=f"{tools.data_project}.{tools.dataset_id}.{table_id}",
+            table_type=table_type,
+            etag=etag,
+            modified=datetime.datetime(2025, 1, 1),
+            schema=[
+                types.SimpleNamespace(name=name, field_type="STRING") for name in rows
+            ],
+            rows=pd.DataFrame(rows),
+        )
+
+    def _rows(self, df):
+        return types.SimpleNamespace(to_dataframe=lambda: df)
+
+    def list_tables(self, dataset_ref):
+        self.calls["list_tables"] += 1
+        return [types.SimpleNamespace(table_id=table_id) for table_id in self.tables]
+
+    def get_table(self, table_ref):
+        self.calls["get_table"] += 1
+        return self.tables[table_ref.table_id]
+
+    def list_rows(self, table, max_results):
+        self.calls["list_rows"] += 1
+        return self._rows(table.rows.head(max_results))
+
+    def query(self, query):
+        self.calls["query"] += 1
+        table_id = query.split("`")[1].split(".")[-1]
+        return self._rows(self.tables[table_id].rows.head(tools.NUM_SAMPLE_ROWS))
+
+
+class TestSchemaCache(unittest.TestCase):
+    """Test cases for `get_bigquery_schema_and_samples`."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_path = os.path.join(tmp_dir.name, "schema_cache.json")
+        self.client = FakeBigQueryClient()
+        self.client.add_table("orders", {"id": ["1", "2"], "country": ["CA", "US"]})
+        self.client.add_table(
+            "recent_orders", {"id": ["2"], "country": ["US"]}, table_type="VIEW"
+        )
+
+    def _get_schema(self, ttl):
+        self.client.calls.clear()
+        return tools.get_bigquery_schema_and_samples(
+            client=self.client, cache_path=self.cache_path, ttl=ttl
+        )
+
+    def _table_key(self, table_id):
+        return f"{tools.data_project}.{tools.dataset_id}.{table_id}"
+
+    def test_samples_tables_with_list_rows_and_views_with_query(self):
+        schema = self._get_schema(ttl=3600)
+        self.assertEqual(
+            self.client.calls,
+            {"list_tables": 1, "get_table": 2, "list_rows": 1, "query": 1},
+        )
+        self.assertEqual(
+            schema[self._table_key("orders")],
+            {
+                "table_schema": [("id", "STRING"), ("country", "STRING")],
+                "example_values": {"id": ["'1'", "'2'"], "country": ["'CA'", "'US'"]},
+            },
+        )
+        self.assertEqual(
+            schema[self._table_key("recent_orders")]["example_values"],
+            {"id": ["'2'"], "country": ["'US'"]},
+        )
+
+    def test_does_not_get_tables_within_ttl(self):
+        schema = self._get_schema(ttl=3600)
+        self.assertEqual(self._get_schema(ttl=3600), schema)
+        self.assertEqual(self.client.calls, {"list_tables": 1})
+
+    def test_does_not_sample_unchanged_tables_after_ttl(self):
+        schema = self._get_schema(ttl=3600)
+        self.assertEqual(self._get_schema(ttl=0), schema)
+        self.assertEqual(self.client.calls, {"list_tables": 1, "get_table": 2})
+
+    def test_samples_changed_tables_after_ttl(self):
+        self._get_schema(ttl=3600)
+        self.client.add_table("orders", {"id": ["3"], "country": ["FR"]}, etag="etag-2")
+        schema = self._get_schema(ttl=0)
+        self.assertEqual(
+            self.client.calls, {"list_tables": 1, "get_table": 2, "list_rows": 1}
+        )
+        self.assertEqual(
+            schema[self._table_key("orders")]["example_values"],
+            {"id": ["'3'"], "country": ["'FR'"]},
+        )
+
+
+class TestRefreshDatabaseSettings(unittest.TestCase):
+    """Test cases for `refresh_database_settings`."""
+
+    def _refresh(self, state, settings):
+        with mock.patch.object(tools, "get_database_settings", return_value=settings):
+            return tools.refresh_database_settings(state)
+
+    def test_replaces_session_settings_only_when_updated(self):
+        settings = {"bq_schema_hash": "hash-1", "updated_at": 1.0}
+        state = {}
+        self.assertIs(self._refresh(state, settings), settings)
+        self.assertIs(self._refresh(state, dict(settings)), settings)
+        refreshed = {"bq_schema_hash": "hash-1", "updated_at": 2.0}
+        self.assertIs(self._refresh(state, refreshed), refreshed)
+        changed = {"bq_schema_hash": "hash-2", "updated_at": 2.0}
+        self.assertIs(self._refresh(state, changed), changed)
+        self.assertIs(state["database_settings"], changed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the compiled schemas and memoized queries of the translator."""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_science.sub_agents.bigquery.chase_sql.sql_postprocessor import (
+    sql_translator,
+)
+
+SqlTranslator = sql_translator.SqlTranslator
+
+DDL_SCHEMA = """CREATE TABLE `my-project.sales.orders` (
+  id INTEGER,
+  country STRING,
+);
+"""
+
+QUERY = "SELECT id FROM orders WHERE country = 'CA'"
+
+
+def check_for_errors(sql_query, schema=DDL_SCHEMA):
+    return SqlTranslator._check_for_errors(
+        sql_query,
+        sql_dialect=SqlTranslator.OUTPUT_DIALECT,
+        db="sales",
+        catalog="my-project",
+        schema_dict=SqlTranslator.compile_schema(schema),
+    )
+
+
+class TestSqlTranslatorCaches(unittest.TestCase):
+    """Test cases for the caches and stage timings of `SqlTranslator`."""
+
+    def setUp(self):
+        super().setUp()
+        SqlTranslator._optimize.cache_clear()
+        SqlTranslator._transpile.cache_clear()
+        sql_translator._compiled_schemas.clear()
+        SqlTranslator.reset_stage_timings()
+
+    def get_calls(self):
+        return {
+            stage: timing["calls"]
+            for stage, timing in SqlTranslator.get_stage_timings().items()
+        }
+
+    def test_schema_is_compiled_once_per_content(self):
+        compiled = SqlTranslator.compile_schema(DDL_SCHEMA)
+        self.assertIs(SqlTranslator.compile_schema(DDL_SCHEMA), compiled)
+        self.assertIs(SqlTranslator.compile_schema(compiled), compiled)
+        self.assertEqual(
+            compiled.schema_dict,
+            {
+                "my-project": {
+                    "sales": {"orders": {"id": "INTEGER", "country": "STRING"}}
+                }
+            },
+        )
+        self.assertEqual(self.get_calls(), {"compile_schema": 1})
+        self.assertIsNone(SqlTranslator.compile_schema(None))
+
+    def test_optimized_queries_are_memoized(self):
+        errors, optimized = check_for_errors(QUERY)
+        self.assertIsNone(errors)
+        self.assertIn("`my-project`.`sales`.`orders`", optimized)
+        self.assertEqual(check_for_errors(QUERY), (None, optimized))
+        cache_info = SqlTranslator._optimize.cache_info()
+        self.assertEqual((cache_info.hits, cache_info.misses), (1, 1))
+        # Cached stages are not timed again.
+        self.assertEqual(
+            self.get_calls(), {"compile_schema": 1, "parse": 1, "optimize": 1}
+        )
+        timings = SqlTranslator.get_stage_timings()
+        self.assertGreater(timings["optimize"]["total_seconds"], 0)
+
+    def test_memoized_queries_are_sql_not_shared_ast(self):
+        errors, optimized = check_for_errors(QUERY)
+        compiled = SqlTranslator.compile_schema(DDL_SCHEMA)
+        cached = SqlTranslator._optimize(
+            QUERY, SqlTranslator.OUTPUT_DIALECT, "sales", "my-project", compiled
+        )
+        self.assertEqual(cached, (errors, optimized))
+        self.assertIsInstance(cached[1], str)
+
+    def test_errors_are_memoized(self):
+        errors, sql_query = check_for_errors("SELECT region FROM orders")
+        self.assertIn("region", errors)
+        self.assertEqual(sql_query, "SELECT region FROM orders")
+        self.assertEqual(check_for_errors("SELECT region FROM orders")[0], errors)
+        self.assertEqual(SqlTranslator._optimize.cache_info().hits, 1)
+
+    def test_compiled_schemas_are_bounded(self):
+        schemas = [DDL_SCHEMA.replace("country", f"country_{i}") for i in range(3)]
+        with mock.patch.object(sql_translator, "MAX_COMPILED_SCHEMAS", 2):
+            compiled = [SqlTranslator.compile_schema(schema) for schema in schemas[:2]]
+            # Using the first schema keeps it, and evicts the second one.
+            SqlTranslator.compile_schema(schemas[0])
+            compiled.append(SqlTranslator.compile_schema(schemas[2]))
+            self.assertEqual(
+                list(sql_translator._compiled_schemas.values()),
+                [compiled[0], compiled[2]],
+            )
+
+    def test_recompiled_schema_keeps_memoized_queries(self):
+        query = QUERY.replace("country", "country_0")
+        schema = DDL_SCHEMA.replace("country", "country_0")
+        first = check_for_errors(query, schema)
+        evicted = SqlTranslator.compile_schema(schema)
+        sql_translator._compiled_schemas.clear()
+        recompiled = SqlTranslator.compile_schema(schema)
+        self.assertIsNot(recompiled, evicted)
+        self.assertEqual(recompiled, evicted)
+        self.assertEqual(check_for_errors(query, schema), first)
+        self.assertEqual(SqlTranslator._optimize.cache_info().hits, 1)
+
+    def test_transpiled_queries_are_memoized(self):
+        queries = [
+            SqlTranslator._transpile(
+                "SELECT SUBSTR(country, 1, 2) FROM orders", "sqlite", "bigquery"
+            )
+            for _ in range(3)
+        ]
+        self.assertEqual(len(set(queries)), 1)
+        cache_info = SqlTranslator._transpile.cache_info()
+        self.assertEqual((cache_info.hits, cache_info.misses), (2, 1))
+        self.assertEqual(self.get_calls(), {"transpile": 1})
+
+
+class TestFixErrors(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the corrections of the SQL queries with errors."""
+
+    def setUp(self):
+        super().setUp()
+        self.model = mock.Mock()
+        self.model.call_many = mock.AsyncMock()
+        self.translator = SqlTranslator(model=self.model)
+
+    async def fix_errors(self, sql_query, number_of_candidates=3):
+        return await self.translator._fix_errors(
+            sql_query,
+            sql_dialect=SqlTranslator.OUTPUT_DIALECT,
+            apply_heuristics=False,
+            db="sales",
+            catalog="my-project",
+            ddl_schema=DDL_SCHEMA,
+            number_of_candidates=number_of_candidates,
+        )
+
+    async def test_query_without_errors_is_not_corrected(self):
+        fixed = await self.fix_errors(QUERY)
+        self.assertIn("`my-project`.`sales`.`orders`", fixed)
+        self.model.call_many.assert_not_called()
+
+    async def test_failed_corrections_are_dropped(self):
+        valid = "SELECT id FROM `my-project.sales.orders`"
+        self.model.call_many.return_value = [None, valid, None]
+        self.assertEqual(await self.fix_errors("SELECT region FROM orders"), valid)
+        prompts = self.model.call_many.call_args.args[0]
+        self.assertEqual(len(prompts), 3)
+
+    async def test_query_is_kept_if_all_corrections_fail(self):
+        self.model.call_many.return_value = [None, None, None]
+        self.assertEqual(
+            await self.fix_errors("SELECT region FROM orders"),
+            "SELECT region FROM orders",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
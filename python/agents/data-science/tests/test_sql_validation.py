@@ -0,0 +1,152 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the local validation of the generated SQL."""
+
+import os
+import sys
+import types
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_science.sub_agents.bigquery import agent
+from data_science.sub_agents.bigquery import sql_validation
+
+BQ_SCHEMA_AND_SAMPLES = {
+    "my-project.sales.orders": {
+        "table_schema": [
+            ("id", "INTEGER"),
+            ("country", "STRING"),
+            ("amount", "FLOAT"),
+            ("order_date", "DATE"),
+        ],
+        "example_values": {
+            "id": ["1", "2", "3"],
+            "country": ["'CA'", "'US'", "'CA'"],
+            "amount": ["10.5", "20.0", "5.0"],
+            "order_date": ["'2025-01-01'", "'2025-02-01'", "'2025-02-15'"],
+        },
+    },
+}
+
+
+def validate_sql(sql_query):
+    return sql_validation.validate_sql(
+        sql_query, BQ_SCHEMA_AND_SAMPLES, db="sales", catalog="my-project"
+    )
+
+
+class TestValidateSql(unittest.TestCase):
+    """Test cases for `validate_sql`."""
+
+    def test_rejects_unknown_column(self):
+        validation = validate_sql("SELECT region FROM `my-project.sales.orders`")
+        self.assertEqual(validation["status"], "ERROR")
+        self.assertIn("region", validation["error_details"])
+
+    def test_rejects_syntax_error(self):
+        validation = validate_sql("SELECT id FROM `my-project.sales.orders` WHERE")
+        self.assertEqual(validation["status"], "ERROR")
+
+    def test_previews_cte_query(self):
+        validation = validate_sql("""
+            WITH totals AS (
+              SELECT country, SUM(amount) AS total
+              FROM `my-project.sales.orders`
+              GROUP BY country
+            )
+            SELECT country, total FROM totals ORDER BY total DESC
+            """)
+        self.assertEqual(
+            validation,
+            {
+                "status": "SUCCESS",
+                "preview_rows": [
+                    {"country": "US", "total": 20.0},
+                    {"country": "CA", "total": 15.5},
+                ],
+            },
+        )
+
+    def test_cannot_validate_bigquery_features_locally(self):
+        for sql_query in [
+            "SELECT DATE_TRUNC(order_date, MONTH) AS month, COUNT(*) AS n"
+            " FROM `my-project.sales.orders` GROUP BY month",
+            "SELECT id, tag FROM `my-project.sales.orders`,"
+            " UNNEST(['a', 'b']) AS tag",
+            "SELECT * FROM ML.PREDICT(MODEL `my-project.sales.model`,"
+            " (SELECT id, amount FROM `my-project.sales.orders`))",
+        ]:
+            with self.subTest(sql_query=sql_query):
+                self.assertEqual(validate_sql(sql_query)["status"], "UNKNOWN")
+
+    def test_replicas_are_shared_and_bounded(self):
+        replica = sql_validation.get_replica(BQ_SCHEMA_AND_SAMPLES)
+        self.assertIs(sql_validation.get_replica(BQ_SCHEMA_AND_SAMPLES), replica)
+        for i in range(sql_validation.MAX_REPLICAS):
+            # Using the first replica keeps it, and evicts the older ones.
+            sql_validation.get_replica(BQ_SCHEMA_AND_SAMPLES)
+            sql_validation.get_replica(
+                {f"my-project.sales.table_{i}": {"table_schema": [("id", "INTEGER")]}}
+            )
+        self.assertEqual(len(sql_validation._replicas), sql_validation.MAX_REPLICAS)
+        self.assertIs(sql_validation.get_replica(BQ_SCHEMA_AND_SAMPLES), replica)
+        self.assertEqual(
+            validate_sql("SELECT id FROM `my-project.sales.orders`")["status"],
+            "SUCCESS",
+        )
+
+
+class TestValidateSqlLocally(unittest.TestCase):
+    """Test cases for the local validation before `execute_sql`."""
+
+    def setUp(self):
+        self.tool = types.SimpleNamespace(name=agent.ADK_BUILTIN_BQ_EXECUTE_SQL_TOOL)
+        self.tool_context = types.SimpleNamespace(
+            state={
+                "database_settings": {
+                    "bq_schema_and_samples": BQ_SCHEMA_AND_SAMPLES,
+                    "bq_dataset_id": "sales",
+                    "bq_data_project_id": "my-project",
+                }
+            }
+        )
+
+    def _validate(self, sql_query):
+        return agent.validate_sql_locally(
+            self.tool, {"query": sql_query}, self.tool_context
+        )
+
+    def test_runs_valid_query_on_bigquery(self):
+        self.assertIsNone(self._validate("SELECT id FROM `my-project.sales.orders`"))
+
+    def test_runs_rejected_query_sent_again_on_bigquery(self):
+        sql_query = "SELECT region FROM `my-project.sales.orders`"
+        self.assertEqual(self._validate(sql_query)["status"], "ERROR")
+        self.assertIsNone(self._validate(sql_query))
+
+    def test_rejects_changed_query_again(self):
+        self.assertEqual(
+            self._validate("SELECT region FROM `my-project.sales.orders`")["status"],
+            "ERROR",
+        )
+        self.assertEqual(
+            self._validate("SELECT zone FROM `my-project.sales.orders`")["status"],
+            "ERROR",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,19 @@
 """Code related utility functions."""
 
-from typing import Any
-import subprocess
+from typing import Any, Callable, Optional
+import asyncio
 import os
+import resource
+import signal
 import time
+import weakref
 
 from google.adk.agents import callback_context as callback_context_module
 
+from machine_learning_engineering.shared_libraries import config
+from machine_learning_engineering.shared_libraries import early_stopping_util
+from machine_learning_engineering.shared_libraries import exec_cache_util
+
 
 class Result:
     def __init__(self, returncode, stdout, stderr):
@@ -15,27 +22,187 @@ class Result:
         self.stderr = stderr
 
 
-def run_python_code(
+# One bounded pool of concurrent runs per event loop.
+_run_semaphores: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, asyncio.Semaphore
+] = weakref.WeakKeyDictionary()
+
+
+def get_run_semaphore() -> asyncio.Semaphore:
+    """Gets the semaphore bounding the concurrent code runs."""
+    loop = asyncio.get_running_loop()
+    semaphore = _run_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, config.CONFIG.max_concurrent_runs))
+        _run_semaphores[loop] = semaphore
+    return semaphore
+
+
+def get_resource_limiter(
+    memory_limit: int,
+    cpu_limit: int,
+) -> Optional[Callable[[], None]]:
+    """Gets the function setting the resource limits in the child process."""
+    if memory_limit <= 0 and cpu_limit <= 0:
+        return None
+
+    def set_resource_limits() -> None:
+        if memory_limit > 0:
+            limit = memory_limit * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        if cpu_limit > 0:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit))
+
+    return set_resource_limits
+
+
+async def read_stream(
+    stream: asyncio.StreamReader,
+    chunks: list[bytes],
+    on_line: Optional[Callable[[str], None]] = None,
+) -> None:
+    """Reads the stream as the output is produced."""
+    pending = b""
+    while chunk := await stream.read(65536):
+        chunks.append(chunk)
+        if on_line is not None:
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                on_line(line.decode("utf-8", errors="replace"))
+    if on_line is not None and pending:
+        on_line(pending.decode("utf-8", errors="replace"))
+
+
+def kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kills the process with the processes it started."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def run_python_code(
     code_text: str,
     run_cwd: str,
     py_filepath: str,
     exec_timeout: int,
+    memory_limit: int = 0,
+    cpu_limit: int = 0,
+    cache: Optional[exec_cache_util.ExecutionCache] = None,
+    cache_key: str = "",
+    trial: Optional[early_stopping_util.Trial] = None,
 ) -> dict[str, Any]:
-    start_time = time.time()
+    """Runs the code in a subprocess without blocking the event loop.
+
+    At most `max_concurrent_runs` scripts run at the same time. The script and
+    the processes it starts are killed after `exec_timeout` seconds, or when
+    the run is cancelled. With a cache, the result of a previous run with the
+    same `cache_key` is returned instead of running the code again, and the
+    runs that exited with status 0 are stored. With a trial, the script is
+    stopped early when its intermediate validation performance falls behind.
+
+    Args:
+        code_text: The code to run.
+        run_cwd: The directory to run the code in.
+        py_filepath: The file name to write the code to.
+        exec_timeout: The maximum run time in seconds.
+        memory_limit: The maximum address space in MB, or 0 for no limit.
+        cpu_limit: The maximum CPU time in seconds, or 0 for no limit.
+        cache: The cache of execution results, or None.
+        cache_key: The cache key of the run.
+        trial: The early stopping trial of the run, or None.
+
+    Returns:
+        The return code, stdout, stderr and execution time of the run.
+    """
     output_filepath = os.path.join(run_cwd, py_filepath)
-    with open(output_filepath, "w", encoding="utf-8") as f:
-        f.write(code_text)
-    try:
-        result = subprocess.run(
-            ["python", py_filepath],
-            cwd=run_cwd,
-            capture_output=True,
-            text=True,
-            timeout=exec_timeout,
-        )
-    except Exception as e:
-        result = Result(returncode=1, stdout="", stderr=str(e))
-    end_time = time.time()
+    if cache is not None:
+        result_dict = cache.get(cache_key)
+        if result_dict is not None:
+            with open(output_filepath, "w", encoding="utf-8") as f:
+                f.write(code_text)
+            if trial is not None:
+                trial.record_output(result_dict["stdout"])
+            return result_dict
+    pruned = False
+    async with get_run_semaphore():
+        start_time = time.time()
+        with open(output_filepath, "w", encoding="utf-8") as f:
+            f.write(code_text)
+        command = ["python", py_filepath]
+        stdout_chunks, stderr_chunks = [], []
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=run_cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                # The output is read line by line as it is printed.
+                env={**os.environ, "PYTHONUNBUFFERED": "1"},
+                start_new_session=True,
+                preexec_fn=get_resource_limiter(memory_limit, cpu_limit),
+            )
+        except Exception as e:
+            result = Result(returncode=1, stdout="", stderr=str(e))
+        else:
+            on_stdout_line = None
+            if trial is not None:
+
+                def on_stdout_line(line: str) -> None:
+                    if trial.report_line(line):
+                        kill_process_group(process)
+
+            readers = asyncio.gather(
+                read_stream(process.stdout, stdout_chunks, on_stdout_line),
+                read_stream(process.stderr, stderr_chunks),
+            )
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(asyncio.gather(readers, process.wait())),
+                    timeout=exec_timeout,
+                )
+            except asyncio.TimeoutError:
+                kill_process_group(process)
+                await process.wait()
+                await readers
+                stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+                result = Result(
+                    returncode=1,
+                    stdout="",
+                    stderr=(
+                        f"{stderr}Command '{command}' timed out after"
+                        f" {exec_timeout} seconds"
+                    ),
+                )
+            except asyncio.CancelledError:
+                kill_process_group(process)
+                await process.wait()
+                raise
+            else:
+                stdout = b"".join(stdout_chunks).decode("utf-8", errors="replace")
+                stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+                pruned = (
+                    trial is not None and trial.pruned and process.returncode != 0
+                )
+                if pruned:
+                    # Not a bug to debug, the missing final performance gives
+                    # the worst score.
+                    result = Result(
+                        returncode=0,
+                        stdout=(
+                            f"{stdout}\nStopped early, as the intermediate"
+                            " validation performance was worse than the other"
+                            " solutions.\n"
+                        ),
+                        stderr=stderr,
+                    )
+                else:
+                    result = Result(
+                        returncode=process.returncode,
+                        stdout=stdout,
+                        stderr=stderr,
+                    )
+        end_time = time.time()
     execution_time = end_time - start_time
     result_dict = {
         "returncode": result.returncode,
@@ -43,6 +210,9 @@ def run_python_code(
         "stderr": result.stderr,
         "execution_time": execution_time,
     }
+    # Failed runs, which may have been killed by a signal, are not cached.
+    if cache is not None and result.returncode == 0 and not pruned:
+        cache.put(cache_key, result_dict)
     return result_dict
 
 
@@ -159,6 +329,85 @@ def get_code_execution_result_state_key(
     return key
 
 
+async def get_execution_cache(
+    callback_context: callback_context_module.CallbackContext,
+    code_text: str,
+    run_cwd: str,
+) -> tuple[Optional[exec_cache_util.ExecutionCache], str]:
+    """Gets the execution cache and the cache key of the run."""
+    agent_name = callback_context.agent_name
+    # The submission code is run for the submission file it writes.
+    if (
+        not callback_context.state.get("use_exec_cache", False)
+        or agent_name.startswith("submission")
+    ):
+        return None, ""
+    cache = exec_cache_util.get_cache(
+        cache_dir=callback_context.state.get("exec_cache_dir", ""),
+        max_size=callback_context.state.get("exec_cache_max_size", 0),
+    )
+    data_digest = await asyncio.to_thread(
+        exec_cache_util.get_data_digest, os.path.join(run_cwd, "input")
+    )
+    cache_key = exec_cache_util.get_cache_key(
+        code_text=code_text,
+        data_digest=data_digest,
+        seed=callback_context.state.get("seed", 42),
+        exec_timeout=callback_context.state.get("exec_timeout", 1800),
+        memory_limit=callback_context.state.get("exec_memory_limit", 0),
+        cpu_limit=callback_context.state.get("exec_cpu_limit", 0),
+    )
+    return cache, cache_key
+
+
+def get_early_stopping_trial(
+    callback_context: callback_context_module.CallbackContext,
+) -> Optional[early_stopping_util.Trial]:
+    """Gets the early stopping trial of the run, or None.
+
+    Model candidates are compared within a task, refinements with the other
+    refinements of the same step and with the solution they refine, and
+    ensembles with the previous ensembles.
+    """
+    if not callback_context.state.get("use_early_stopping", False):
+        return None
+    agent_name = callback_context.agent_name
+    workspace_dir = callback_context.state.get("workspace_dir", "")
+    task_name = callback_context.state.get("task_name", "")
+    if agent_name.startswith("model_eval"):
+        model_id = agent_name.split("_")[-1]
+        task_id = agent_name.split("_")[-2]
+        group = f"model_eval_{task_id}"
+        trial_name = model_id
+    elif agent_name.startswith("plan_implement"):
+        task_id = agent_name.split("_")[-1]
+        step = callback_context.state.get(f"refine_step_{task_id}", 0)
+        inner_iter = callback_context.state.get(f"inner_iter_{task_id}", 0)
+        group = f"plan_implement_{step}_{task_id}"
+        trial_name = str(inner_iter)
+    elif agent_name.startswith("ensemble_plan_implement"):
+        group = "ensemble_plan_implement"
+        trial_name = str(callback_context.state.get("ensemble_iter", 0))
+    else:
+        return None
+    pruner = early_stopping_util.get_pruner(
+        run_id=callback_context.state.get("run_id", ""),
+        group=os.path.join(workspace_dir, task_name, group),
+        lower=callback_context.state.get("lower", True),
+        eta=callback_context.state.get("early_stopping_eta", 3),
+        grace=callback_context.state.get("early_stopping_grace", 1),
+        margin=callback_context.state.get("early_stopping_margin", 0.01),
+    )
+    if agent_name.startswith("plan_implement"):
+        prev_exec_result = callback_context.state.get(
+            f"train_code_exec_result_{step}_{task_id}", {}
+        )
+        early_stopping_util.Trial(pruner, "base").record_output(
+            prev_exec_result.get("stdout", "")
+        )
+    return early_stopping_util.Trial(pruner, trial_name)
+
+
 def get_run_code_condition(
     agent_name: str,
     raw_code: str,
@@ -184,12 +433,14 @@ def get_run_code_condition(
     return False
 
 
-def evaluate_code(
+async def evaluate_code(
     callback_context: callback_context_module.CallbackContext,
 ) -> None:
     """Evaluates the given code."""
     lower = callback_context.state.get("lower", True)
     exec_timeout = callback_context.state.get("exec_timeout", 1800)
+    exec_memory_limit = callback_context.state.get("exec_memory_limit", 0)
+    exec_cpu_limit = callback_context.state.get("exec_cpu_limit", 0)
     agent_name = callback_context.agent_name
     suffix = get_updated_suffix(callback_context=callback_context)
     code_state_key = get_code_state_key(
@@ -232,11 +483,21 @@ def evaluate_code(
         workspace_dir = callback_context.state.get("workspace_dir", "")
         task_name = callback_context.state.get("task_name", "")
         run_cwd = os.path.join(workspace_dir, task_name, task_id)
-        result_dict = run_python_code(
+        cache, cache_key = await get_execution_cache(
+            callback_context=callback_context,
+            code_text=raw_code,
+            run_cwd=run_cwd,
+        )
+        result_dict = await run_python_code(
             code_text=raw_code,
             run_cwd=run_cwd,
             py_filepath=py_filepath,
             exec_timeout=exec_timeout,
+            memory_limit=exec_memory_limit,
+            cpu_limit=exec_cpu_limit,
+            cache=cache,
+            cache_key=cache_key,
+            trial=get_early_stopping_trial(callback_context=callback_context),
         )
         if agent_name.startswith("ablation"):
             if result_dict["returncode"] == 0:
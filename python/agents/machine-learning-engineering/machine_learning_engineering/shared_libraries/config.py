@@ -18,6 +18,16 @@ class DefaultConfig:
     start_time: float = 0.0  # Timestamp indicating the start time of the task. Typically represented in seconds since the epoch.
     seed: int = 42  # The random seed value used to ensure reproducibility of experiments.
     exec_timeout: int = 600  # The maximum time in seconds allowed to complete the task.
+    exec_memory_limit: int = 0  # The maximum memory in MB of a single code run, 0 for no limit.
+    exec_cpu_limit: int = 0  # The maximum CPU time in seconds of a single code run, 0 for no limit.
+    max_concurrent_runs: int = os.cpu_count() or 1  # The maximum number of code runs executing at the same time.
+    use_exec_cache: bool = True  # Enable (`True`) or disable (`False`) reusing the results of identical code runs.
+    exec_cache_dir: str = "./machine_learning_engineering/exec_cache/"  # Directory where the code execution results are cached.
+    exec_cache_max_size: int = 1024  # The maximum size in MB of the cached code execution results.
+    use_early_stopping: bool = False  # Enable (`True`) or disable (`False`) stopping the code runs whose intermediate validation performance falls behind.
+    early_stopping_eta: int = 3  # Only the best 1/eta runs at each intermediate validation performance continue.
+    early_stopping_grace: int = 1  # The number of first intermediate validation performances at which runs are never stopped.
+    early_stopping_margin: float = 0.01  # The relative margin by which a run must fall behind to be stopped.
     num_solutions: int = 2  # The number of different solutions to generate or attempt for the given task.
     num_model_candidates: int = 2  # The number of different model architectures or hyperparameter sets to consider as candidates.
     max_retry: int = 10  # The maximum number of times to retry a failed operation.
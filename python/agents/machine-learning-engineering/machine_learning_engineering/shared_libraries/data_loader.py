@@ -0,0 +1,104 @@
+"""Fast loading of the task data.
+
+This module is linked into the directory of every task as `data_loader.py`,
+so that generated code can use `from data_loader import read_csv` in place of
+`pandas.read_csv`. It only depends on NumPy and pandas.
+
+The CSV files under `./input` are converted once into a columnar format under
+`./.columnar`: one `.npy` file per column, with the values of the text columns
+stored as integer codes. The columns are memory-mapped when loaded, so the
+numeric columns are not read nor copied until they are used.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+INPUT_DIR = "input"
+COLUMNAR_DIR = ".columnar"
+METADATA_FILENAME = "metadata.json"
+
+
+def save_columnar(df: pd.DataFrame, columnar_dir: str) -> None:
+    """Saves the columns of the data frame as `.npy` files."""
+    os.makedirs(columnar_dir, exist_ok=True)
+    columns = []
+    for i, name in enumerate(df.columns):
+        column = df[name]
+        filename = f"{i}.npy"
+        if column.dtype.kind in "biuf":
+            np.save(os.path.join(columnar_dir, filename), column.to_numpy())
+            columns.append({"name": name, "file": filename})
+        else:
+            codes, categories = pd.factorize(column)
+            np.save(os.path.join(columnar_dir, filename), codes.astype(np.int32))
+            columns.append(
+                {"name": name, "file": filename, "categories": categories.tolist()}
+            )
+    with open(os.path.join(columnar_dir, METADATA_FILENAME), "w") as f:
+        json.dump({"num_rows": len(df), "columns": columns}, f)
+
+
+def read_columnar(columnar_dir: str, usecols=None) -> pd.DataFrame:
+    """Loads the columns saved by `save_columnar`.
+
+    Numeric columns are memory-mapped copy-on-write: they can be modified in
+    place without changing the files.
+    """
+    with open(os.path.join(columnar_dir, METADATA_FILENAME)) as f:
+        metadata = json.load(f)
+    data = {}
+    for column in metadata["columns"]:
+        name = column["name"]
+        if usecols is not None and name not in usecols:
+            continue
+        values = np.load(os.path.join(columnar_dir, column["file"]), mmap_mode="c")
+        values = values.view(np.ndarray)
+        if "categories" in column:
+            categories = np.empty(len(column["categories"]) + 1, dtype=object)
+            categories[:-1] = column["categories"]
+            categories[-1] = np.nan
+            # Missing values have the code -1.
+            values = categories[values]
+        data[name] = values
+    return pd.DataFrame(
+        data, index=pd.RangeIndex(metadata["num_rows"]), copy=False
+    )
+
+
+def get_columnar_dir(filepath: str) -> str:
+    """Gets the directory of the columnar copy of a CSV file under `./input`."""
+    relpath = os.path.relpath(os.path.abspath(filepath), os.path.abspath(INPUT_DIR))
+    if relpath.startswith(os.pardir):
+        return ""
+    return os.path.join(COLUMNAR_DIR, relpath)
+
+
+def read_csv(filepath, usecols=None, **kwargs) -> pd.DataFrame:
+    """Reads a CSV file, like `pandas.read_csv`.
+
+    Files under `./input` are loaded from their columnar copy, unless options
+    other than `usecols` are given.
+    """
+    columnar = (
+        not kwargs
+        and isinstance(filepath, (str, os.PathLike))
+        and (
+            usecols is None
+            or (
+                isinstance(usecols, (list, tuple, set))
+                and all(isinstance(name, str) for name in usecols)
+            )
+        )
+    )
+    if columnar:
+        columnar_dir = get_columnar_dir(os.fspath(filepath))
+        if columnar_dir and os.path.exists(
+            os.path.join(columnar_dir, METADATA_FILENAME)
+        ):
+            df = read_columnar(columnar_dir, usecols=usecols)
+            if usecols is None or len(df.columns) == len(set(usecols)):
+                return df
+    return pd.read_csv(filepath, usecols=usecols, **kwargs)
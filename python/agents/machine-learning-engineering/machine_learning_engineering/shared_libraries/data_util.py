@@ -0,0 +1,140 @@
+"""Task data shared by the task directories of the workspace."""
+
+import json
+import os
+import shutil
+import stat
+
+import pandas as pd
+
+from machine_learning_engineering.shared_libraries import data_loader
+
+SHARED_DATA_DIR = "shared_data"
+SOURCE_STAMP_FILENAME = "source_stamp.json"
+
+
+def get_source_stamp(task_data_dir: str) -> list[list]:
+    """Gets the path, size and modification time of the task data files."""
+    stamp = []
+    for root, dirs, files in os.walk(task_data_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            file_stat = os.stat(path)
+            stamp.append(
+                [
+                    os.path.relpath(path, task_data_dir),
+                    file_stat.st_size,
+                    file_stat.st_mtime_ns,
+                ]
+            )
+    return stamp
+
+
+def link_file(source_path: str, destination_path: str) -> None:
+    """Hard links the file, or copies it across file systems."""
+    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+    try:
+        os.link(source_path, destination_path)
+    except OSError:
+        shutil.copy2(source_path, destination_path)
+        # Read-only, as the copy is shared by all the task directories.
+        os.chmod(
+            destination_path,
+            stat.S_IMODE(os.stat(destination_path).st_mode)
+            & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH),
+        )
+
+
+def link_tree(source_dir: str, destination_dir: str) -> None:
+    """Links all files of the directory, keeping its structure."""
+    for root, _, files in os.walk(source_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            link_file(
+                path,
+                os.path.join(destination_dir, os.path.relpath(path, source_dir)),
+            )
+
+
+def prepare_shared_data(
+    data_dir: str,
+    workspace_dir: str,
+    task_name: str,
+) -> str:
+    """Prepares the task data once for all task directories.
+
+    The data files, except the top-level answer files, are copied under
+    `input/`, and the CSV files are also converted under `.columnar/`
+    for `data_loader.read_csv`. The data is only prepared again when the task
+    data has changed. Task directories get hard links to these read-only
+    files, so the data is stored once.
+
+    Returns:
+        The directory of the shared data.
+    """
+    task_data_dir = os.path.join(data_dir, task_name)
+    shared_dir = os.path.join(workspace_dir, task_name, SHARED_DATA_DIR)
+    stamp = get_source_stamp(task_data_dir)
+    stamp_path = os.path.join(shared_dir, SOURCE_STAMP_FILENAME)
+    if os.path.exists(stamp_path):
+        with open(stamp_path, "r") as f:
+            if json.load(f) == stamp:
+                return shared_dir
+
+    tmp_dir = f"{shared_dir}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    for relpath, _, _ in stamp:
+        top_level = os.sep not in relpath
+        if top_level and "answer" in relpath:
+            continue
+        source_path = os.path.join(task_data_dir, relpath)
+        destination_path = os.path.join(tmp_dir, data_loader.INPUT_DIR, relpath)
+        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        shutil.copy2(source_path, destination_path)
+        # Read-only, as the copy is shared by all the task directories.
+        os.chmod(
+            destination_path,
+            stat.S_IMODE(os.stat(destination_path).st_mode)
+            & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH),
+        )
+        if relpath.endswith(".csv"):
+            try:
+                df = pd.read_csv(source_path)
+            except (ValueError, UnicodeDecodeError):
+                # Left to `pandas.read_csv` with the right options.
+                continue
+            data_loader.save_columnar(
+                df, os.path.join(tmp_dir, data_loader.COLUMNAR_DIR, relpath)
+            )
+    os.makedirs(tmp_dir, exist_ok=True)
+    with open(os.path.join(tmp_dir, SOURCE_STAMP_FILENAME), "w") as f:
+        json.dump(stamp, f)
+    if os.path.exists(shared_dir):
+        shutil.rmtree(shared_dir)
+    os.replace(tmp_dir, shared_dir)
+    return shared_dir
+
+
+def link_task_data(
+    data_dir: str,
+    workspace_dir: str,
+    task_name: str,
+    run_cwd: str,
+) -> None:
+    """Links the shared task data and `data_loader.py` into the task directory."""
+    shared_dir = prepare_shared_data(
+        data_dir=data_dir,
+        workspace_dir=workspace_dir,
+        task_name=task_name,
+    )
+    for sub_dir in (data_loader.INPUT_DIR, data_loader.COLUMNAR_DIR):
+        link_tree(
+            os.path.join(shared_dir, sub_dir),
+            os.path.join(run_cwd, sub_dir),
+        )
+    link_file(
+        data_loader.__file__,
+        os.path.join(run_cwd, "data_loader.py"),
+    )
@@ -162,7 +162,7 @@ def get_debug_agent_instruction(
     )
 
 
-def get_code_from_response(
+async def get_code_from_response(
     callback_context: callback_context_module.CallbackContext,
     llm_response: llm_response_module.LlmResponse,
     do_eval: bool = True,
@@ -197,7 +197,7 @@ def get_code_from_response(
         new_code = code
     callback_context.state[code_state_key] = new_code
     if do_eval:
-        code_util.evaluate_code(callback_context=callback_context)
+        await code_util.evaluate_code(callback_context=callback_context)
     return None
 
 
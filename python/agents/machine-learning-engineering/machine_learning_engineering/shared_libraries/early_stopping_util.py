@@ -0,0 +1,135 @@
+"""Early stopping of the code runs with successive halving."""
+
+from typing import Optional
+import collections
+import math
+import re
+
+INTERMEDIATE_PERFORMANCE_PREFIX = "Intermediate Validation Performance"
+
+_INTERMEDIATE_PERFORMANCE_PATTERN = re.compile(
+    re.escape(INTERMEDIATE_PERFORMANCE_PREFIX)
+    + r"\s*\[\s*(\d+)\s*/\s*(\d+)\s*\]\s*:(.*)"
+)
+
+
+def extract_intermediate_performance(
+    line: str,
+) -> Optional[tuple[int, int, float]]:
+    """Extracts the intermediate validation performance from an output line.
+
+    Returns:
+        The iteration, the number of iterations and the performance, or None.
+    """
+    match = _INTERMEDIATE_PERFORMANCE_PATTERN.search(line)
+    if match is None:
+        return None
+    try:
+        return int(match[1]), int(match[2]), float(match[3].strip())
+    except ValueError:
+        return None
+
+
+class SuccessiveHalvingPruner:
+    """Asynchronous successive halving over the runs of a group.
+
+    The intermediate validation performance printed by a run at iteration k
+    of n is its result at rung (n, k), so that only the runs iterating over
+    the same number of epochs, boosting rounds or folds are compared. A run
+    is stopped as soon as its result at a rung is not among the best 1/eta
+    results of the group at that rung, by more than a relative margin. Runs
+    are never stopped at their first `grace` iterations, nor when they are
+    the only result at a rung.
+    """
+
+    def __init__(self, lower: bool, eta: int, grace: int, margin: float):
+        self.lower = lower
+        self.eta = eta
+        self.grace = grace
+        self.margin = margin
+        self.rungs: dict[tuple[int, int], dict[str, float]] = {}
+
+    def record(self, trial: str, rung: tuple[int, int], value: float) -> None:
+        """Records the result of a run at a rung."""
+        self.rungs.setdefault(rung, {})[trial] = value
+
+    def report(self, trial: str, rung: tuple[int, int], value: float) -> bool:
+        """Records a result, and returns True if the run should stop."""
+        self.record(trial, rung, value)
+        results = self.rungs[rung]
+        _, iteration = rung
+        if iteration <= self.grace or len(results) < 2:
+            return False
+        num_kept = max(1, math.floor(len(results) / self.eta))
+        ranked = sorted(results.values(), reverse=not self.lower)
+        cutoff = ranked[num_kept - 1]
+        tolerance = self.margin * abs(cutoff)
+        if self.lower:
+            return value > cutoff + tolerance
+        return value < cutoff - tolerance
+
+
+# The maximum number of pipeline runs whose pruners are kept.
+_MAX_RUNS = 8
+
+# One pruner per group of comparable runs, by pipeline run.
+_pruners: collections.OrderedDict[
+    str, dict[str, SuccessiveHalvingPruner]
+] = collections.OrderedDict()
+
+
+def get_pruner(
+    run_id: str,
+    group: str,
+    lower: bool,
+    eta: int,
+    grace: int,
+    margin: float,
+) -> SuccessiveHalvingPruner:
+    """Gets the pruner of the group in a pipeline run.
+
+    The pruners of the least recently used runs are dropped beyond
+    `_MAX_RUNS` runs.
+    """
+    run_pruners = _pruners.setdefault(run_id, {})
+    _pruners.move_to_end(run_id)
+    while len(_pruners) > _MAX_RUNS:
+        _pruners.popitem(last=False)
+    pruner = run_pruners.get(group)
+    if pruner is None:
+        pruner = SuccessiveHalvingPruner(
+            lower=lower,
+            eta=eta,
+            grace=grace,
+            margin=margin,
+        )
+        run_pruners[group] = pruner
+    return pruner
+
+
+class Trial:
+    """A run reporting its intermediate results to a pruner."""
+
+    def __init__(self, pruner: SuccessiveHalvingPruner, name: str):
+        self.pruner = pruner
+        self.name = name
+        self.pruned = False
+
+    def report_line(self, line: str) -> bool:
+        """Reports the result in an output line, and returns True to stop."""
+        result = extract_intermediate_performance(line)
+        if result is None or self.pruned:
+            return False
+        iteration, num_iterations, value = result
+        self.pruned = self.pruner.report(
+            self.name, (num_iterations, iteration), value
+        )
+        return self.pruned
+
+    def record_output(self, text: str) -> None:
+        """Records the results in the output of a run, without stopping it."""
+        for line in text.splitlines():
+            result = extract_intermediate_performance(line)
+            if result is not None:
+                iteration, num_iterations, value = result
+                self.pruner.record(self.name, (num_iterations, iteration), value)
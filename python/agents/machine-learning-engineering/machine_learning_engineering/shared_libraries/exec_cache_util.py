@@ -0,0 +1,150 @@
+"""Content-addressed cache of code execution results."""
+
+from typing import Any, Optional
+import hashlib
+import json
+import os
+import time
+
+# Digests of the data files, by path, size and modification time.
+_file_digests: dict[tuple[str, int, int], str] = {}
+
+
+def get_file_digest(path: str) -> str:
+    """Gets the SHA-256 digest of the file content."""
+    stat = os.stat(path)
+    memo_key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _file_digests.get(memo_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        _file_digests[memo_key] = digest
+    return digest
+
+
+def get_data_digest(data_dir: str) -> str:
+    """Gets the digest of the names and contents of the files in the directory."""
+    sha = hashlib.sha256()
+    for root, dirs, files in os.walk(data_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            sha.update(os.path.relpath(path, data_dir).encode())
+            sha.update(get_file_digest(path).encode())
+    return sha.hexdigest()
+
+
+def get_cache_key(
+    code_text: str,
+    data_digest: str,
+    seed: int,
+    exec_timeout: int,
+    memory_limit: int,
+    cpu_limit: int,
+) -> str:
+    """Gets the cache key of a run."""
+    run_spec = {
+        "code": code_text,
+        "data": data_digest,
+        "seed": seed,
+        "exec_timeout": exec_timeout,
+        "memory_limit": memory_limit,
+        "cpu_limit": cpu_limit,
+    }
+    return hashlib.sha256(
+        json.dumps(run_spec, sort_keys=True).encode()
+    ).hexdigest()
+
+
+class ExecutionCache:
+    """Execution results stored on disk, one JSON file per cache key.
+
+    The least recently used results are evicted when the total size exceeds
+    `max_size` MB.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int):
+        self.cache_dir = cache_dir
+        self.max_size = max_size * 1024 * 1024
+        # The total size of the results, or None before it is computed.
+        self.size: Optional[int] = None
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Gets the cached result, or None."""
+        path = self.get_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result_dict = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return result_dict
+
+    def put(self, key: str, result_dict: dict[str, Any]) -> None:
+        """Stores the result and evicts the oldest ones if needed."""
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result_dict, f)
+        try:
+            old_size = os.path.getsize(path)
+        except FileNotFoundError:
+            old_size = 0
+        os.replace(tmp_path, path)
+        if self.size is None:
+            self.size = sum(size for _, size, _ in self.get_entries())
+        else:
+            self.size += os.path.getsize(path) - old_size
+        if self.size > self.max_size:
+            self.evict()
+
+    def get_entries(self) -> list[tuple[float, int, str]]:
+        """Gets the modification time, size and path of the stored results."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self) -> None:
+        """Removes the least recently used results above the size limit."""
+        entries = self.get_entries()
+        total_size = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+        self.size = total_size
+
+
+# One cache per directory, keeping the total size of its results.
+_caches: dict[str, ExecutionCache] = {}
+
+
+def get_cache(cache_dir: str, max_size: int) -> ExecutionCache:
+    """Gets the execution cache of the directory."""
+    cache = _caches.get(cache_dir)
+    if cache is None:
+        cache = ExecutionCache(cache_dir=cache_dir, max_size=max_size)
+        _caches[cache_dir] = cache
+    cache.max_size = max_size * 1024 * 1024
+    return cache
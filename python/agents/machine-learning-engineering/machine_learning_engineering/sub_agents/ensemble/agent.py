@@ -15,6 +15,7 @@ from machine_learning_engineering.sub_agents.ensemble import prompt
 from machine_learning_engineering.shared_libraries import debug_util
 from machine_learning_engineering.shared_libraries import common_util
 from machine_learning_engineering.shared_libraries import config
+from machine_learning_engineering.shared_libraries import data_util
 
 
 def update_ensemble_loop_states(
@@ -169,20 +170,13 @@ def create_workspace(
     os.makedirs(os.path.join(workspace_dir, task_name, "ensemble"), exist_ok=True)
     os.makedirs(os.path.join(workspace_dir, task_name, "ensemble", "input"), exist_ok=True)
     os.makedirs(os.path.join(workspace_dir, task_name, "ensemble", "final"), exist_ok=True)
-    # copy files to input directory
-    files = os.listdir(os.path.join(data_dir, task_name))
-    for file in files:
-        if os.path.isdir(os.path.join(data_dir, task_name, file)):
-            shutil.copytree(
-                os.path.join(data_dir, task_name, file),
-                os.path.join(workspace_dir, task_name, "ensemble", "input", file),
-            )
-        else:
-            if "answer" not in file:
-                common_util.copy_file(
-                    os.path.join(data_dir, task_name, file),
-                    os.path.join(workspace_dir, task_name, "ensemble", "input"),
-                )
+    # link the shared task data into the input directory
+    data_util.link_task_data(
+        data_dir=data_dir,
+        workspace_dir=workspace_dir,
+        task_name=task_name,
+        run_cwd=run_cwd,
+    )
     return None
 
 
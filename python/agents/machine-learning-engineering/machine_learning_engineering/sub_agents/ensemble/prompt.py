@@ -32,6 +32,7 @@ ENSEMBLE_PLAN_IMPLEMENT_INSTR = """# Introduction
 - Implement the ensemble plan with the provided solutions.
 - Unless mentioned in the ensemble plan, do not modify the origianl Python Solutions too much.
 - All the provided data is already prepared and available in the `./input` directory. There is no need to unzip any files.
+- To load a CSV file from the `./input` directory, use `from data_loader import read_csv`. It works like `pandas.read_csv` and loads the data faster.
 - The code should implement the proposed solution and print the value of the evaluation metric computed on a hold-out validation set.
 
 # Response format required
@@ -40,6 +41,7 @@ ENSEMBLE_PLAN_IMPLEMENT_INSTR = """# Introduction
 - Do not modify original Python Solutions especially the submission part due to formatting issue of submission.csv.
 - Do not subsample or introduce dummy variables. You have to provide full new Python Solution using the {num_solutions} provided solutions.
 - Print out or return a final performance metric in your answer in a clear format with the exact words: 'Final Validation Performance: {{final_validation_score}}'.
+- If the model is trained iteratively (e.g., epochs, boosting rounds or folds), print the validation performance after each iteration in a clear format with the exact words: 'Intermediate Validation Performance [{{iteration}}/{{num_iterations}}]: {{intermediate_validation_score}}', where {{iteration}} counts the iterations from 1 and {{num_iterations}} is their total number.
 - The code should be a single-file Python program that is self-contained and can be executed as-is.
 - Do not modify the original codes too much and implement the plan since new errors can occur."""
 
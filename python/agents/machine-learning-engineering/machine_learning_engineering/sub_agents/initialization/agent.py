@@ -6,6 +6,7 @@ import os
 import shutil
 import time
 import ast
+import uuid
 
 from google.adk import agents
 from google.adk.agents import callback_context as callback_context_module
@@ -18,6 +19,7 @@ from machine_learning_engineering.sub_agents.initialization import prompt
 from machine_learning_engineering.shared_libraries import debug_util
 from machine_learning_engineering.shared_libraries import common_util
 from machine_learning_engineering.shared_libraries import config
+from machine_learning_engineering.shared_libraries import data_util
 
 
 def get_model_candidates(
@@ -231,6 +233,8 @@ def prepare_task(
     for key in config_dict:
         callback_context.state[key] = config_dict[key]
     callback_context.state["start_time"] = time.time()
+    # identifies the pipeline run, whose code runs are compared with each other
+    callback_context.state["run_id"] = uuid.uuid4().hex
     # fix randomness
     common_util.set_random_seed(callback_context.state["seed"])
     task_name = callback_context.state.get("task_name", "")
@@ -258,20 +262,13 @@ def create_workspace(
     os.makedirs(os.path.join(workspace_dir, task_name, task_id), exist_ok=True)
     os.makedirs(os.path.join(workspace_dir, task_name, task_id, "input"), exist_ok=True)
     os.makedirs(os.path.join(workspace_dir, task_name, task_id, "model_candidates"), exist_ok=True)
-    # copy files to input directory
-    files = os.listdir(os.path.join(data_dir, task_name))
-    for file in files:
-        if os.path.isdir(os.path.join(data_dir, task_name, file)):
-            shutil.copytree(
-                os.path.join(data_dir, task_name, file),
-                os.path.join(workspace_dir, task_name, task_id, "input", file),
-            )
-        else:
-            if "answer" not in file:
-                common_util.copy_file(
-                    os.path.join(data_dir, task_name, file),
-                    os.path.join(workspace_dir, task_name, task_id, "input"),
-                )
+    # link the shared task data into the input directory
+    data_util.link_task_data(
+        data_dir=data_dir,
+        workspace_dir=workspace_dir,
+        task_name=task_name,
+        run_cwd=run_cwd,
+    )
     return None
 
 
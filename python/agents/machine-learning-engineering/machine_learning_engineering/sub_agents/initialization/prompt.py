@@ -43,6 +43,7 @@ MODEL_EVAL_INSTR = """# Introduction
 - This first solution design should be relatively simple, without ensembling or hyper-parameter optimization.
 - Propose an evaluation metric that is reasonable for this task.
 - All the provided data is already prepared and available in the `./input` directory. There is no need to unzip any files.
+- To load a CSV file from the `./input` directory, use `from data_loader import read_csv`. It works like `pandas.read_csv` and loads the data faster.
 - Do not include other models that are not directly related to the model described.
 - Use PyTorch rather than TensorFlow. Use CUDA if you need. All the necessary libraries are installed.
 - The code should implement the proposed solution and print the value of the evaluation metric computed on a hold-out validation set.
@@ -51,6 +52,7 @@ MODEL_EVAL_INSTR = """# Introduction
 # Required
 - There should be no additional headings or text in your response.
 - Print out or return a final performance metric in your answer in a clear format with the exact words: 'Final Validation Performance: {{final_validation_score}}'.
+- If the model is trained iteratively (e.g., epochs, boosting rounds or folds), print the validation performance after each iteration in a clear format with the exact words: 'Intermediate Validation Performance [{{iteration}}/{{num_iterations}}]: {{intermediate_validation_score}}', where {{iteration}} counts the iterations from 1 and {{num_iterations}} is their total number.
 - The code should be a single-file Python program that is self-contained and can be executed as-is.
 - Your response should only contain a single code block.
 - Do not use exit() function in the Python code.
@@ -113,6 +115,7 @@ CODE_INTEGRATION_INSTR = """# Introduction
 # Required
 - There should be no additional headings or text in your response.
 - Print out or return a final performance metric in your answer in a clear format with the exact words: 'Final Validation Performance: {{final_validation_score}}'.
+- If the model is trained iteratively (e.g., epochs, boosting rounds or folds), print the validation performance after each iteration in a clear format with the exact words: 'Intermediate Validation Performance [{{iteration}}/{{num_iterations}}]: {{intermediate_validation_score}}', where {{iteration}} counts the iterations from 1 and {{num_iterations}} is their total number.
 - The code should be a single-file Python program that is self-contained and can be executed as-is.
 - Your response should only contain a single code block.
 - Do not use exit() function in the Python code.
@@ -163,6 +163,7 @@ IMPLEMENT_PLAN_INSTR = """# Introduction
 - Implement the improvement plan on the above code block. But do not remove subsampling if exists.
 - The code block should be improved according to the proposed plan.
 - Note that all the variable including actual data is defined earlier (since you are just seeing a code block), therefore do not introduce dummy variables.
+- If the code block trains the model iteratively (e.g., epochs, boosting rounds or folds), print the validation performance after each iteration in a clear format with the exact words: 'Intermediate Validation Performance [{{iteration}}/{{num_iterations}}]: {{intermediate_validation_score}}', where {{iteration}} counts the iterations from 1 and {{num_iterations}} is their total number. Keep such printing statements if they already exist.
 
 # Response format
 - Your response should be a single markdown code block (wrapped in ```) which is the improved code block.
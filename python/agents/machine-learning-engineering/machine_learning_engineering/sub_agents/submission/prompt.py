@@ -19,6 +19,7 @@ ADD_TEST_FINAL_INSTR = """# Introduction
 - Load the test samples and create a submission file.
 - All the provided data is already prepared and available in the `./input` directory. There is no need to unzip any files.
 - Test data is available in the `./input` directory.
+- To load a CSV file from the `./input` directory, use `from data_loader import read_csv`. It works like `pandas.read_csv` and loads the data faster.
 - Save the test predictions in a `submission.csv` file. Put the `submission.csv` into `./final` directory.
 - You should not drop any test samples. Predict the target value for all test samples.
 - This is a very easy task because the only thing to do is to load test samples and then replace the validation samples with the test samples. Then you can even use the full training set!
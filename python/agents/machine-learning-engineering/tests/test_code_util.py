@@ -0,0 +1,137 @@
+"""Test cases for running the generated code."""
+
+import asyncio
+import os
+import sys
+import textwrap
+import time
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from machine_learning_engineering.shared_libraries import code_util
+from machine_learning_engineering.shared_libraries import config
+
+# Starts a process sleeping in the background, then sleeps.
+SPAWNING_CODE = textwrap.dedent("""\
+    import subprocess
+    import sys
+    import time
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    with open("child.pid", "w") as f:
+        f.write(str(child.pid))
+    time.sleep(60)
+    """)
+
+
+def is_running(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Killed processes may remain zombies until they are reaped.
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+async def wait_for_file(path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path) or not os.path.getsize(path):
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.05)
+
+
+async def wait_until_stopped(pid, timeout=5):
+    deadline = time.monotonic() + timeout
+    while is_running(pid) and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    return not is_running(pid)
+
+
+@pytest.mark.asyncio
+async def test_run_python_code_returns_output(tmp_path):
+    result = await code_util.run_python_code(
+        code_text="import sys; print('out'); print('err', file=sys.stderr)",
+        run_cwd=str(tmp_path),
+        py_filepath="train.py",
+        exec_timeout=60,
+    )
+    assert result["returncode"] == 0
+    assert result["stdout"] == "out\n"
+    assert result["stderr"] == "err\n"
+    assert (tmp_path / "train.py").exists()
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_process_group(tmp_path):
+    start_time = time.monotonic()
+    result = await code_util.run_python_code(
+        code_text=SPAWNING_CODE,
+        run_cwd=str(tmp_path),
+        py_filepath="train.py",
+        exec_timeout=2,
+    )
+    assert time.monotonic() - start_time < 30
+    assert result["returncode"] == 1
+    assert "timed out after 2 seconds" in result["stderr"]
+    child_pid = int((tmp_path / "child.pid").read_text())
+    assert await wait_until_stopped(child_pid)
+
+
+@pytest.mark.asyncio
+async def test_cancellation_kills_process_group(tmp_path):
+    run = asyncio.create_task(
+        code_util.run_python_code(
+            code_text=SPAWNING_CODE,
+            run_cwd=str(tmp_path),
+            py_filepath="train.py",
+            exec_timeout=60,
+        )
+    )
+    await wait_for_file(tmp_path / "child.pid")
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+    child_pid = int((tmp_path / "child.pid").read_text())
+    assert await wait_until_stopped(child_pid)
+
+
+@pytest.mark.asyncio
+async def test_memory_limit_stops_run(tmp_path):
+    result = await code_util.run_python_code(
+        code_text="x = bytearray(512 * 1024 * 1024)",
+        run_cwd=str(tmp_path),
+        py_filepath="train.py",
+        exec_timeout=60,
+        memory_limit=256,
+    )
+    assert result["returncode"] != 0
+    assert "MemoryError" in result["stderr"]
+
+
+@pytest.mark.asyncio
+async def test_semaphore_bounds_concurrent_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(config.CONFIG, "max_concurrent_runs", 2)
+    code_text = textwrap.dedent("""\
+        import time
+        start = time.time()
+        time.sleep(0.5)
+        print(start, time.time())
+        """)
+    results = await asyncio.gather(
+        *(
+            code_util.run_python_code(
+                code_text=code_text,
+                run_cwd=str(tmp_path),
+                py_filepath=f"train_{i}.py",
+                exec_timeout=60,
+            )
+            for i in range(6)
+        )
+    )
+    intervals = [tuple(map(float, r["stdout"].split())) for r in results]
+    max_concurrent = max(
+        sum(start <= time_point < end for start, end in intervals)
+        for time_point, _ in intervals
+    )
+    assert max_concurrent == 2
@@ -0,0 +1,104 @@
+"""Test cases for the fast loading of the task data."""
+
+import os
+import re
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from machine_learning_engineering.shared_libraries import data_loader
+
+CSV_TEXT = """\
+id,age,score,city,passed,comment
+1,31,0.5,Paris,True,
+2,,1.25,,False,"late, but done"
+3,27,,Lyon,True,ok
+4,45,2.0,Paris,False,
+"""
+
+
+@pytest.fixture
+def task_dir(tmp_path, monkeypatch):
+    """A task directory with a CSV file and its columnar copy."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.join(data_loader.INPUT_DIR, "sub"))
+    for relpath in ["train.csv", os.path.join("sub", "test.csv")]:
+        with open(os.path.join(data_loader.INPUT_DIR, relpath), "w") as f:
+            f.write(CSV_TEXT)
+        data_loader.save_columnar(
+            pd.read_csv(os.path.join(data_loader.INPUT_DIR, relpath)),
+            os.path.join(data_loader.COLUMNAR_DIR, relpath),
+        )
+    return tmp_path
+
+
+def assert_frame_equal(df, expected):
+    pd.testing.assert_frame_equal(df, expected)
+    # The text columns keep the missing values as NaN.
+    for name in expected.columns:
+        assert df[name].isna().tolist() == expected[name].isna().tolist()
+
+
+@pytest.mark.parametrize("filepath", ["./input/train.csv", "input/sub/test.csv"])
+def test_read_csv_matches_pandas(task_dir, filepath):
+    df = data_loader.read_csv(filepath)
+    assert_frame_equal(df, pd.read_csv(filepath))
+
+
+def test_read_csv_loads_columnar_copy(task_dir):
+    os.remove(os.path.join(data_loader.INPUT_DIR, "train.csv"))
+    assert_frame_equal(
+        data_loader.read_csv(os.path.join(task_dir, "input", "train.csv")),
+        pd.read_csv(os.path.join("input", "sub", "test.csv")),
+    )
+
+
+@pytest.mark.parametrize(
+    "usecols", [["city", "score"], ("id",), {"comment", "age"}]
+)
+def test_read_csv_matches_pandas_with_usecols(task_dir, usecols):
+    df = data_loader.read_csv("input/train.csv", usecols=usecols)
+    assert_frame_equal(df, pd.read_csv("input/train.csv", usecols=usecols))
+
+
+def test_numeric_columns_can_be_modified_in_place(task_dir):
+    df = data_loader.read_csv("input/train.csv")
+    df["score"] *= 2
+    df.loc[0, "id"] = 10
+    expected = pd.read_csv("input/train.csv")
+    assert df["score"].tolist()[:2] == [1.0, 2.5]
+    assert_frame_equal(data_loader.read_csv("input/train.csv"), expected)
+
+
+@pytest.mark.parametrize(
+    "filepath, usecols, kwargs",
+    [
+        # Options other than `usecols`.
+        ("input/train.csv", None, {"nrows": 2}),
+        ("input/train.csv", None, {"dtype": {"id": "float64"}}),
+        # Columns by position or by callable.
+        ("input/train.csv", [0, 2], {}),
+        ("input/train.csv", lambda name: name != "city", {}),
+        # A missing column, for which pandas raises the error.
+        ("input/train.csv", ["id", "missing"], {}),
+        # A file outside `./input`, and a file without columnar copy.
+        ("other.csv", None, {}),
+        ("input/new.csv", None, {}),
+    ],
+)
+def test_read_csv_falls_back_to_pandas(task_dir, filepath, usecols, kwargs):
+    for path in ["other.csv", "input/new.csv"]:
+        with open(path, "w") as f:
+            f.write(CSV_TEXT)
+    try:
+        expected = pd.read_csv(filepath, usecols=usecols, **kwargs)
+    except ValueError as e:
+        with pytest.raises(ValueError, match=re.escape(str(e))):
+            data_loader.read_csv(filepath, usecols=usecols, **kwargs)
+        return
+    assert_frame_equal(
+        data_loader.read_csv(filepath, usecols=usecols, **kwargs), expected
+    )
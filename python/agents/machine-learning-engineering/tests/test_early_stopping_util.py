@@ -0,0 +1,135 @@
+"""Test cases for the early stopping of the code runs."""
+
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from machine_learning_engineering.shared_libraries import code_util
+from machine_learning_engineering.shared_libraries import early_stopping_util
+
+
+def make_pruner(lower=True, eta=3, grace=1, margin=0.0):
+    return early_stopping_util.SuccessiveHalvingPruner(
+        lower=lower, eta=eta, grace=grace, margin=margin
+    )
+
+
+def test_extract_intermediate_performance():
+    extract = early_stopping_util.extract_intermediate_performance
+    assert extract("Intermediate Validation Performance [2/10]: 0.25") == (2, 10, 0.25)
+    assert extract("Intermediate Validation Performance [ 3 / 5 ]:1e-3") == (3, 5, 0.001)
+    assert extract("Intermediate Validation Performance: 0.25") is None
+    assert extract("Intermediate Validation Performance [2/10]: nan%") is None
+    assert extract("Final Validation Performance: 0.25") is None
+
+
+def test_pruner_never_stops_runs_at_grace_rungs():
+    pruner = make_pruner(grace=2)
+    pruner.report("a", (10, 1), 0.1)
+    pruner.report("a", (10, 2), 0.1)
+    assert not pruner.report("b", (10, 1), 0.9)
+    assert not pruner.report("b", (10, 2), 0.9)
+    pruner.report("a", (10, 3), 0.1)
+    assert pruner.report("b", (10, 3), 0.9)
+
+
+def test_pruner_never_stops_only_result_at_rung():
+    pruner = make_pruner()
+    assert not pruner.report("a", (10, 2), 0.9)
+
+
+def test_pruner_keeps_best_1_over_eta_runs():
+    pruner = make_pruner(eta=2)
+    for trial, value in [("a", 0.1), ("b", 0.2), ("c", 0.3)]:
+        pruner.record(trial, (10, 2), value)
+    # With 4 results, the best 2 are kept.
+    assert not pruner.report("d", (10, 2), 0.2)
+    assert pruner.report("e", (10, 2), 0.25)
+
+
+def test_pruner_keeps_runs_within_margin():
+    pruner = make_pruner(margin=0.1)
+    pruner.record("a", (10, 2), 1.0)
+    assert not pruner.report("b", (10, 2), 1.05)
+    assert pruner.report("c", (10, 2), 1.2)
+
+
+def test_pruner_stops_runs_with_lower_score_when_higher_is_better():
+    pruner = make_pruner(lower=False)
+    pruner.record("a", (10, 2), 0.9)
+    assert not pruner.report("b", (10, 2), 0.95)
+    assert pruner.report("c", (10, 2), 0.5)
+
+
+def test_pruner_only_compares_runs_with_same_number_of_iterations():
+    pruner = make_pruner()
+    pruner.record("epochs", (10, 2), 0.1)
+    assert not pruner.report("folds", (5, 2), 0.9)
+    assert pruner.report("other_epochs", (10, 2), 0.9)
+
+
+def test_trial_reports_printed_iterations():
+    pruner = make_pruner()
+    early_stopping_util.Trial(pruner, "base").record_output(
+        "Intermediate Validation Performance [1/3]: 0.1\n"
+        "Intermediate Validation Performance [2/3]: 0.1\n"
+    )
+    trial = early_stopping_util.Trial(pruner, "new")
+    assert not trial.report_line("Intermediate Validation Performance [1/3]: 0.9")
+    assert not trial.report_line("Epoch 2 done")
+    assert trial.report_line("Intermediate Validation Performance [2/3]: 0.9")
+    assert trial.pruned
+    assert not trial.report_line("Intermediate Validation Performance [3/3]: 0.9")
+
+
+def test_get_pruner_scopes_pruners_to_pipeline_runs():
+    def get_pruner(run_id, group):
+        return early_stopping_util.get_pruner(
+            run_id=run_id, group=group, lower=True, eta=3, grace=1, margin=0.0
+        )
+
+    pruner = get_pruner("run", "model_eval_1")
+    assert get_pruner("run", "model_eval_1") is pruner
+    assert get_pruner("run", "model_eval_2") is not pruner
+    assert get_pruner("other_run", "model_eval_1") is not pruner
+    for i in range(early_stopping_util._MAX_RUNS):
+        get_pruner(f"run_{i}", "model_eval_1")
+    assert "run" not in early_stopping_util._pruners
+    assert len(early_stopping_util._pruners) == early_stopping_util._MAX_RUNS
+
+
+@pytest.mark.asyncio
+async def test_run_python_code_stops_script_not_flushing_output(
+    tmp_path, monkeypatch
+):
+    monkeypatch.delenv("PYTHONUNBUFFERED", raising=False)
+    pruner = make_pruner(eta=2)
+    early_stopping_util.Trial(pruner, "base").record_output(
+        "\n".join(
+            f"Intermediate Validation Performance [{i}/20]: 0.1"
+            for i in range(1, 21)
+        )
+    )
+    # The script prints to a pipe without flushing its output.
+    code_text = textwrap.dedent("""\
+        import time
+        for i in range(1, 21):
+            print(f"Intermediate Validation Performance [{i}/20]: 0.9")
+            time.sleep(0.5)
+        print("Final Validation Performance: 0.9")
+        """)
+    result = await code_util.run_python_code(
+        code_text=code_text,
+        run_cwd=str(tmp_path),
+        py_filepath="train.py",
+        exec_timeout=60,
+        trial=early_stopping_util.Trial(pruner, "new"),
+    )
+    assert result["returncode"] == 0
+    assert "Stopped early" in result["stdout"]
+    assert "Final Validation Performance" not in result["stdout"]
+    assert result["execution_time"] < 5
@@ -0,0 +1,136 @@
+"""Test cases for the cache of the code execution results."""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from machine_learning_engineering.shared_libraries import code_util
+from machine_learning_engineering.shared_libraries import exec_cache_util
+
+
+def get_cache_key(**kwargs):
+    run_spec = {
+        "code_text": "print(1)",
+        "data_digest": "digest",
+        "seed": 42,
+        "exec_timeout": 60,
+        "memory_limit": 0,
+        "cpu_limit": 0,
+    }
+    run_spec.update(kwargs)
+    return exec_cache_util.get_cache_key(**run_spec)
+
+
+def test_cache_key_depends_on_run_spec():
+    key = get_cache_key()
+    assert get_cache_key() == key
+    assert get_cache_key(code_text="print(2)") != key
+    assert get_cache_key(data_digest="other") != key
+    assert get_cache_key(seed=0) != key
+    assert get_cache_key(exec_timeout=30) != key
+    assert get_cache_key(memory_limit=1024) != key
+    assert get_cache_key(cpu_limit=10) != key
+
+
+def test_data_digest_depends_on_file_names_and_contents(tmp_path):
+    (tmp_path / "train.csv").write_text("a,b\n1,2\n")
+    (tmp_path / "test.csv").write_text("a\n1\n")
+    digest = exec_cache_util.get_data_digest(str(tmp_path))
+    assert exec_cache_util.get_data_digest(str(tmp_path)) == digest
+    (tmp_path / "train.csv").write_text("a,b\n1,3\n")
+    changed_digest = exec_cache_util.get_data_digest(str(tmp_path))
+    assert changed_digest != digest
+    (tmp_path / "test.csv").rename(tmp_path / "test2.csv")
+    assert exec_cache_util.get_data_digest(str(tmp_path)) != changed_digest
+
+
+def test_cache_gets_stored_results(tmp_path):
+    cache = exec_cache_util.ExecutionCache(str(tmp_path), max_size=1)
+    key = get_cache_key()
+    assert cache.get(key) is None
+    cache.put(key, {"returncode": 0, "stdout": "1\n"})
+    assert cache.get(key) == {"returncode": 0, "stdout": "1\n"}
+    assert cache.get(get_cache_key(seed=0)) is None
+    assert cache.get(get_cache_key(data_digest="other")) is None
+
+
+def test_cache_evicts_least_recently_used_results(tmp_path):
+    result_dict = {"stdout": "x" * 300 * 1024}
+    cache = exec_cache_util.ExecutionCache(str(tmp_path), max_size=1)
+    keys = [get_cache_key(seed=seed) for seed in range(4)]
+    for key in keys[:3]:
+        cache.put(key, result_dict)
+        time.sleep(0.01)
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[3], result_dict)
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(key) is not None for key in [keys[0], keys[2], keys[3]])
+    assert cache.size == sum(size for _, size, _ in cache.get_entries())
+
+
+def test_cache_only_walks_results_when_over_size_limit(tmp_path, monkeypatch):
+    cache = exec_cache_util.ExecutionCache(str(tmp_path), max_size=1)
+    cache.put(get_cache_key(seed=0), {"stdout": ""})
+    walks = []
+    os_walk = os.walk
+
+    def walk(top):
+        walks.append(top)
+        return os_walk(top)
+
+    monkeypatch.setattr(exec_cache_util.os, "walk", walk)
+    for seed in range(1, 10):
+        cache.put(get_cache_key(seed=seed), {"stdout": ""})
+    assert not walks
+    cache.put(get_cache_key(seed=10), {"stdout": "x" * 1024 * 1024})
+    assert walks
+
+
+def test_get_cache_shares_cache_of_directory(tmp_path):
+    cache = exec_cache_util.get_cache(str(tmp_path), max_size=1)
+    assert exec_cache_util.get_cache(str(tmp_path), max_size=1) is cache
+    assert exec_cache_util.get_cache(str(tmp_path / "other"), max_size=1) is not cache
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "code_text",
+    ["raise ValueError()", "import os, signal; os.kill(os.getpid(), signal.SIGKILL)"],
+)
+async def test_run_python_code_does_not_cache_failed_runs(tmp_path, code_text):
+    cache = exec_cache_util.ExecutionCache(str(tmp_path / "cache"), max_size=1)
+    result = await code_util.run_python_code(
+        code_text=code_text,
+        run_cwd=str(tmp_path),
+        py_filepath="train.py",
+        exec_timeout=60,
+        cache=cache,
+        cache_key="key",
+    )
+    assert result["returncode"] != 0
+    assert cache.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_run_python_code_returns_cached_result(tmp_path):
+    cache = exec_cache_util.ExecutionCache(str(tmp_path / "cache"), max_size=1)
+    run_spec = dict(
+        run_cwd=str(tmp_path),
+        py_filepath="train.py",
+        exec_timeout=60,
+        cache=cache,
+        cache_key="key",
+    )
+    result = await code_util.run_python_code(
+        code_text="import time; print(time.time())", **run_spec
+    )
+    assert result["returncode"] == 0
+    # The cached result is returned instead of running the code again.
+    assert (
+        await code_util.run_python_code(code_text="print('other')", **run_spec)
+        == result
+    )
@@ -0,0 +1,203 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the per-action latency of the WebShop text environment.
+
+Each action is stepped, then its observation and state are read, like the
+`search` and `click` tools do. The page parse modes compared are:
+- reparse: a new BeautifulSoup parse on every read of the page, as the
+  environment did before it kept the parsed page
+- soup: the page parsed once per render, with BeautifulSoup
+- stream: the page parsed once per render, with `StreamingPageParser`
+
+The catalog is synthetic, and searched with the in-process BM25 backend, so
+that neither the WebShop data nor pyserini's JVM are needed.
+
+Run from `python/agents/personalized-shopping`:
+
+    python -m benchmarks.page_parsing
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from unittest import mock
+
+SHARED_LIBRARIES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "personalized_shopping", "shared_libraries"
+)
+sys.path.insert(0, os.path.abspath(SHARED_LIBRARIES_DIR))
+
+from web_agent_site.engine import engine  # noqa: E402
+from web_agent_site.engine.search_backends import BM25SearchBackend  # noqa: E402
+from web_agent_site.envs import web_agent_text_env  # noqa: E402
+
+WORDS = (
+    "red blue green dress skirt shirt shoe boot bag hat denim cotton floral"
+    " summer winter leather wool silk jeans coat"
+).split()
+CATEGORIES = ["beauty", "fashion", "garden", "electronics", "grocery"]
+ACTIONS = [
+    "search[red dress]",
+    None,  # Clicks the first product of the results.
+    "click[description]",
+    "click[< prev]",
+    "click[red]",
+    "click[back to search]",
+]
+MODES = ["reparse", "soup", "stream"]
+
+
+def write_catalog(data_dir, num_products, seed=0):
+    """Writes random products and their goals in the format of the WebShop data"""
+    rng = random.Random(seed)
+    products, attributes, human_attributes = [], {}, {}
+    for i in range(num_products):
+        asin = f"B{i:09d}"
+        name = " ".join(rng.sample(WORDS, 4))
+        price = f"${rng.randint(1, 90)}.99"
+        if i % 3 == 0:
+            price += f" - ${rng.randint(91, 200)}.50"
+        products.append(
+            {
+                "asin": asin,
+                "category": rng.choice(CATEGORIES),
+                "query": f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+                "product_category": " › ".join(rng.sample(CATEGORIES, 3)),
+                "name": name,
+                "full_description": " ".join(rng.choices(WORDS, k=40)),
+                "small_description": [
+                    " ".join(rng.choices(WORDS, k=10)) for _ in range(3)
+                ],
+                "pricing": price,
+                "customization_options": {
+                    "Color": [
+                        {"value": c, "image": None} for c in rng.sample(WORDS[:3], 2)
+                    ],
+                    "Size": [
+                        {"value": s, "image": None} for s in ["small", "large"]
+                    ],
+                },
+                "images": [f"https://example.com/{asin}.jpg"],
+            }
+        )
+        attrs = rng.sample(WORDS, 3)
+        attributes[asin] = {
+            "attributes": attrs,
+            "instruction": f"i want a {name}",
+            "instruction_attributes": attrs[:2],
+        }
+        human_attributes[asin] = [
+            {
+                "instruction": f"i need a {name}",
+                "instruction_attributes": attrs[:2],
+                "instruction_options": ["red"],
+            }
+        ]
+    paths = {}
+    for name, data in [
+        ("items_shuffle", products),
+        ("items_ins_v2", attributes),
+        ("items_human_ins", human_attributes),
+    ]:
+        paths[name] = os.path.join(data_dir, f"{name}.json")
+        with open(paths[name], "w") as f:
+            json.dump(data, f)
+    docs = [(p["asin"], f"{p['name']} {p['query']}") for p in products]
+    return paths, docs
+
+
+@contextlib.contextmanager
+def parse_mode(mode):
+    if mode != "reparse":
+        yield
+        return
+
+    def parse_current_page(env):
+        return web_agent_text_env.ParsedPage(env.browser.page_source)
+
+    with mock.patch.object(
+        web_agent_text_env.WebAgentTextEnv, "_current_page", parse_current_page
+    ):
+        yield
+
+
+def run_actions(env, mode, rounds):
+    """Returns the latency of each action in seconds, and the observations"""
+    latencies, observations = [], []
+    with parse_mode(mode):
+        for _ in range(rounds):
+            for action in ACTIONS:
+                if action is None:
+                    clickables = env.get_available_actions()["clickables"]
+                    action = f"click[{clickables[2]}]"
+                start = time.perf_counter()
+                env.step(action)
+                observation = env.observation
+                env.state["html"]
+                latencies.append(time.perf_counter() - start)
+                observations.append(observation)
+    return latencies, observations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num-products", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        paths, docs = write_catalog(data_dir, args.num_products)
+        with mock.patch.object(
+            engine, "DEFAULT_ATTR_PATH", paths["items_ins_v2"]
+        ), mock.patch.object(
+            engine, "HUMAN_ATTR_PATH", paths["items_human_ins"]
+        ), mock.patch.object(
+            web_agent_text_env,
+            "init_search_engine",
+            lambda **kwargs: BM25SearchBackend.from_docs(docs),
+        ):
+            server = web_agent_text_env.SimServer(
+                "http://127.0.0.1:3000", paths["items_shuffle"]
+            )
+
+    print(f"{'mode':<8} {'mean':>8} {'p50':>8} {'p90':>8}")
+    observations = {}
+    for mode in MODES:
+        env = web_agent_text_env.WebAgentTextEnv(
+            observation_mode="text",
+            server=server,
+            session="benchmark",
+            parse_mode="stream" if mode == "stream" else "soup",
+        )
+        run_actions(env, mode, 1)  # Warms up the caches of the server.
+        latencies, observations[mode] = run_actions(env, mode, args.rounds)
+        latencies.sort()
+        print(
+            f"{mode:<8} {statistics.mean(latencies) * 1e3:>6.1f}ms"
+            f" {latencies[len(latencies) // 2] * 1e3:>6.1f}ms"
+            f" {latencies[int(len(latencies) * 0.9)] * 1e3:>6.1f}ms"
+        )
+    identical = all(obs == observations[MODES[0]] for obs in observations.values())
+    print(f"Identical observations: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import OrderedDict
+from concurrent import futures
+import threading
+import time
+import uuid
+
 import gym
 
 gym.envs.registration.register(
@@ -31,7 +37,104 @@ def init_env(num_products):
     return env
 
 
+# State key of the WebShop session ID, on ADK versions whose tool context
+# doesn't expose the session.
+WEBSHOP_SESSION_ID_KEY = "webshop_session_id"
+
+
+def get_session_id(tool_context):
+    """Returns the ID keying the WebShop environment of the tool's session."""
+    session = getattr(tool_context, "session", None)
+    if session is not None:
+        return session.id
+    session_id = tool_context.state.get(WEBSHOP_SESSION_ID_KEY)
+    if session_id is None:
+        session_id = uuid.uuid4().hex
+        tool_context.state[WEBSHOP_SESSION_ID_KEY] = session_id
+    return session_id
+
+
+class _PooledEnv:
+    def __init__(self, env):
+        self.env = env
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class WebShopEnvPool:
+    """WebShop environments keyed by session, sharing a single `SimServer`.
+
+    The products, goals and search engine are loaded once into the server. Each
+    session gets its own environment (browser, clickables and history), and the
+    least recently used sessions are evicted once there are more than
+    `max_sessions` of them or they have been idle for `idle_timeout` seconds.
+
+    The server is loaded in the background, so that creating the pool doesn't
+    block; the first `get` waits for it.
+    """
+
+    def __init__(self, num_products, max_sessions=256, idle_timeout=30 * 60):
+        self.num_products = num_products
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        loader = futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="webshop_init"
+        )
+        self._server = loader.submit(self._load_server)
+        # The loader thread exits once the server is loaded.
+        loader.shutdown(wait=False)
+        self._envs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load_server(self):
+        start = time.monotonic()
+        # Only the server of this environment is kept.
+        env = init_env(self.num_products)
+        env.server.end_session(env.session)
+        print(
+            f"Finished initializing WebshopEnv with {self.num_products} items"
+            f" in {time.monotonic() - start:.1f}s."
+        )
+        return env.server
+
+    @property
+    def server(self):
+        """The shared `SimServer`, waiting for it to be loaded if needed."""
+        return self._server.result()
+
+    def get(self, session_id):
+        """Returns the environment of `session_id` and the lock guarding it."""
+        with self._lock:
+            pooled = self._envs.pop(session_id, None)
+            if pooled is None:
+                env = gym.make(
+                    "WebAgentTextEnv-v0",
+                    observation_mode="text",
+                    num_products=self.num_products,
+                    server=self.server,
+                    session=session_id,
+                    parse_mode="stream",
+                )
+                env.reset(session=session_id)
+                pooled = _PooledEnv(env)
+            pooled.last_used = time.monotonic()
+            self._envs[session_id] = pooled
+            self._evict(pooled.last_used)
+            return pooled.env, pooled.lock
+
+    def _evict(self, now):
+        while self._envs:
+            session_id, pooled = next(iter(self._envs.items()))
+            idle = now - pooled.last_used > self.idle_timeout
+            if not idle and len(self._envs) <= self.max_sessions:
+                break
+            if pooled.lock.locked():
+                # The session is in the middle of a step, keep it for now.
+                self._envs.move_to_end(session_id)
+                break
+            del self._envs[session_id]
+            self.server.end_session(pooled.env.session)
+
+
 num_product_items = 50000
-webshop_env = init_env(num_product_items)
-webshop_env.reset()
-print(f"Finished initializing WebshopEnv with {num_product_items} items.")
+webshop_env_pool = WebShopEnvPool(num_product_items)
@@ -12,18 +12,33 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""Converts the products into the document format of the search engine.
+
+The documents are written once, as a single stream split into shards under
+`resources/`. The size tiers are prefixes of that stream: `resources_<tier>/`
+only holds hard links to the shards of its first documents, which
+`run_indexing.sh` indexes one tier after the other, each with all the threads.
+
+With `--incremental`, the documents that were added, changed or removed since
+the previous conversion are applied to the existing `indexes_<tier>/` instead,
+without a full rebuild.
+"""
+
+import argparse
+import hashlib
+import itertools
 import json
+import os
+import shutil
 import sys
 from tqdm import tqdm
 
-sys.path.insert(0, "../")
-
-from web_agent_site.engine.engine import load_products
+TIERS = {"100": 100, "1k": 1000, "10k": 10000, "50k": 50000}
+DOCS_DIR = "resources"
+SHARD_SIZE = 5000
 
-all_products, *_ = load_products(filepath="../data/items_shuffle.json")
 
-docs = []
-for p in tqdm(all_products, total=len(all_products)):
+def product_to_doc(p):
     option_texts = []
     options = p.get("options", {})
     for option_name, option_contents in options.items():
@@ -42,20 +57,176 @@ for p in tqdm(all_products, total=len(all_products)):
         ]
     ).lower()
     doc["product"] = p
-    docs.append(doc)
+    return doc
+
+
+def get_shard_bounds(num_docs, tiers=TIERS, shard_size=SHARD_SIZE):
+    """Shard boundaries, so that every tier is made of whole shards"""
+    bounds = set(range(0, num_docs, shard_size))
+    bounds.update(size for size in tiers.values() if size < num_docs)
+    bounds = sorted(bounds)
+    return list(zip(bounds, bounds[1:] + [num_docs]))
+
+
+def get_shard_path(start, docs_dir=DOCS_DIR):
+    return os.path.join(docs_dir, f"documents_{start:07d}.jsonl")
+
+
+def iter_doc_lines(docs_dir=DOCS_DIR):
+    """Position, ID and JSON line of the converted documents, in order"""
+    if not os.path.isdir(docs_dir):
+        return
+    position = 0
+    for name in sorted(os.listdir(docs_dir)):
+        with open(os.path.join(docs_dir, name)) as f:
+            for line in f:
+                yield position, json.loads(line)["id"], line
+                position += 1
+
+
+def read_doc_hashes(docs_dir=DOCS_DIR):
+    """Position and content hash of the converted documents, by ID"""
+    return {
+        doc_id: (position, hashlib.md5(line.encode()).digest())
+        for position, doc_id, line in iter_doc_lines(docs_dir)
+    }
+
+
+def write_docs(docs, num_docs, docs_dir=DOCS_DIR, tiers=TIERS, shard_size=SHARD_SIZE):
+    """Stream the documents into shards and link them into the tier directories"""
+    if os.path.isdir(docs_dir):
+        shutil.rmtree(docs_dir)
+    os.makedirs(docs_dir)
+    shard_starts = []
+    for start, end in get_shard_bounds(num_docs, tiers, shard_size):
+        shard_starts.append(start)
+        with open(get_shard_path(start, docs_dir), "w") as f:
+            for doc in itertools.islice(docs, end - start):
+                f.write(json.dumps(doc) + "\n")
+
+    for tier, size in tiers.items():
+        tier_dir = f"./resources_{tier}"
+        if os.path.isdir(tier_dir):
+            shutil.rmtree(tier_dir)
+        os.makedirs(tier_dir)
+        for start in shard_starts:
+            if start >= size:
+                break
+            shard_path = get_shard_path(start, docs_dir)
+            link_path = os.path.join(tier_dir, os.path.basename(shard_path))
+            try:
+                os.link(shard_path, link_path)
+            except OSError:
+                shutil.copyfile(shard_path, link_path)
+
+
+def update_index(index_dir, lines, removed_ids):
+    """Remove and add documents to an existing index, in place"""
+    # Imported here, as starting the JVM is only needed for incremental updates.
+    from pyserini.index.lucene import LuceneIndexer
+    from pyserini.pyclass import autoclass
+
+    # The JVM resolves relative paths against its own working directory.
+    index_dir = os.path.abspath(index_dir)
+    if removed_ids:
+        JFile = autoclass("java.io.File")
+        JFSDirectory = autoclass("org.apache.lucene.store.FSDirectory")
+        JIndexWriter = autoclass("org.apache.lucene.index.IndexWriter")
+        JIndexWriterConfig = autoclass("org.apache.lucene.index.IndexWriterConfig")
+        JTerm = autoclass("org.apache.lucene.index.Term")
+        JTermQuery = autoclass("org.apache.lucene.search.TermQuery")
+
+        directory = JFSDirectory.open(JFile(index_dir).toPath())
+        writer = JIndexWriter(directory, JIndexWriterConfig())
+        # pyjnius only tries the first overload of deleteDocuments, which
+        # takes queries.
+        writer.deleteDocuments(
+            *[JTermQuery(JTerm("id", doc_id)) for doc_id in removed_ids]
+        )
+        writer.commit()
+        writer.close()
+
+    if lines:
+        indexer = LuceneIndexer(
+            args=[
+                "-index",
+                index_dir,
+                "-threads",
+                "1",
+                "-storePositions",
+                "-storeDocvectors",
+                "-storeRaw",
+            ],
+            append=True,
+        )
+        for line in lines:
+            indexer.add_doc_raw(line.rstrip("\n"))
+        indexer.close()
+
+
+def update_indexes(previous_hashes, docs_dir=DOCS_DIR, tiers=TIERS):
+    """Apply the documents changed since the previous conversion to every tier"""
+    tiers = {
+        tier: size for tier, size in tiers.items() if os.path.isdir(f"./indexes_{tier}")
+    }
+    added = {tier: [] for tier in tiers}
+    removed_ids = {tier: [] for tier in tiers}
+    positions = dict()
+    for position, doc_id, line in iter_doc_lines(docs_dir):
+        positions[doc_id] = position
+        previous = previous_hashes.get(doc_id)
+        changed = (
+            previous is not None and previous[1] != hashlib.md5(line.encode()).digest()
+        )
+        for tier, size in tiers.items():
+            if position >= size:
+                continue
+            if previous is None or previous[0] >= size or changed:
+                added[tier].append(line)
+            if changed and previous[0] < size:
+                # Changed documents are replaced, so they are removed first.
+                removed_ids[tier].append(doc_id)
+    # Documents removed from the catalog, or pushed out of a tier
+    for doc_id, (previous_position, _) in previous_hashes.items():
+        position = positions.get(doc_id)
+        for tier, size in tiers.items():
+            if previous_position < size and (position is None or position >= size):
+                removed_ids[tier].append(doc_id)
+    for tier in tiers:
+        index_dir = f"./indexes_{tier}"
+        print(
+            f"{index_dir}: adding {len(added[tier])} and removing "
+            f"{len(removed_ids[tier])} documents."
+        )
+        update_index(index_dir, added[tier], removed_ids[tier])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filepath", default="../data/items_shuffle.json")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update the existing indexes with the changed documents only",
+    )
+    parser.add_argument("--shard_size", type=int, default=SHARD_SIZE)
+    args = parser.parse_args()
+
+    # `web_agent_site` is next to the directory of the script.
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from web_agent_site.engine.engine import load_products
+
+    previous_hashes = read_doc_hashes() if args.incremental else None
 
-with open("./resources_100/documents.jsonl", "w+") as f:
-    for doc in docs[:100]:
-        f.write(json.dumps(doc) + "\n")
+    all_products, *_ = load_products(filepath=args.filepath, use_snapshot=False)
+    num_docs = min(len(all_products), max(TIERS.values()))
+    docs = (product_to_doc(p) for p in tqdm(all_products[:num_docs], total=num_docs))
+    write_docs(docs, num_docs, shard_size=args.shard_size)
+    del all_products
 
-with open("./resources_1k/documents.jsonl", "w+") as f:
-    for doc in docs[:1000]:
-        f.write(json.dumps(doc) + "\n")
+    if args.incremental:
+        update_indexes(previous_hashes)
 
-with open("./resources_10k/documents.jsonl", "w+") as f:
-    for doc in docs[:10000]:
-        f.write(json.dumps(doc) + "\n")
 
-with open("./resources_50k/documents.jsonl", "w+") as f:
-    for doc in docs[:50000]:
-        f.write(json.dumps(doc) + "\n")
+if __name__ == "__main__":
+    main()
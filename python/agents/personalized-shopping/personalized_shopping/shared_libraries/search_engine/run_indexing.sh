@@ -14,34 +14,19 @@
 # limitations under the License.
 
 
-python -m pyserini.index.lucene \
-  --collection JsonCollection \
-  --input resources_100 \
-  --index indexes_100 \
-  --generator DefaultLuceneDocumentGenerator \
-  --threads 1 \
-  --storePositions --storeDocvectors --storeRaw
+# The tiers share their documents (see convert_product_file_format.py). Each
+# index is built from several shards, which the indexer processes in parallel
+# with all the threads, so the tiers are indexed one after the other rather than
+# each competing for the CPUs in its own JVM.
+THREADS=${THREADS:-$(nproc)}
 
-python -m pyserini.index.lucene \
-  --collection JsonCollection \
-  --input resources_1k \
-  --index indexes_1k \
-  --generator DefaultLuceneDocumentGenerator \
-  --threads 1 \
-  --storePositions --storeDocvectors --storeRaw
-
-python -m pyserini.index.lucene \
-  --collection JsonCollection \
-  --input resources_10k \
-  --index indexes_10k \
-  --generator DefaultLuceneDocumentGenerator \
-  --threads 1 \
-  --storePositions --storeDocvectors --storeRaw
-
-python -m pyserini.index.lucene \
-  --collection JsonCollection \
-  --input resources_50k \
-  --index indexes_50k \
-  --generator DefaultLuceneDocumentGenerator \
-  --threads 1 \
-  --storePositions --storeDocvectors --storeRaw
+set -e
+for tier in 100 1k 10k 50k; do
+  python -m pyserini.index.lucene \
+    --collection JsonCollection \
+    --input resources_${tier} \
+    --index indexes_${tier} \
+    --generator DefaultLuceneDocumentGenerator \
+    --threads "${THREADS}" \
+    --storePositions --storeDocvectors --storeRaw
+done
@@ -16,14 +16,15 @@
 
 from ast import literal_eval
 from collections import defaultdict
-from decimal import Decimal
+import gc
 import json
 import os
+import pickle
 import random
 import re
+import sys
 
-from flask import render_template_string
-from pyserini.search.lucene import LuceneSearcher
+import jinja2
 from rich import print
 from tqdm import tqdm
 
@@ -32,6 +33,7 @@ from ..utils import (
     DEFAULT_ATTR_PATH,
     HUMAN_ATTR_PATH,
 )
+from .search_backends import BM25SearchBackend, LuceneSearchBackend
 
 TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
 
@@ -52,19 +54,38 @@ ACTION_TO_TEMPLATE = {
 }
 
 
+# Templates are compiled once. Like Flask's `render_template_string`, values are
+# HTML-escaped.
+TEMPLATE_ENV = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(TEMPLATE_DIR), autoescape=True
+)
+
+
+def init_template_env(url_map):
+    """Let templates build URLs with `url_for` from `url_map`, without Flask contexts"""
+    url_adapter = url_map.bind("localhost")
+
+    def url_for(endpoint, **values):
+        return url_adapter.build(endpoint, values)
+
+    TEMPLATE_ENV.globals["url_for"] = url_for
+
+
+def render_template(name, **context):
+    return TEMPLATE_ENV.get_template(name).render(**context)
+
+
 def map_action_to_html(action, **kwargs):
     action_name, action_arg = parse_action(action)
     if action_name == "start":
-        path = os.path.join(TEMPLATE_DIR, "search_page.html")
-        html = render_template_string(
-            read_html_template(path=path),
+        html = render_template(
+            "search_page.html",
             session_id=kwargs["session_id"],
             instruction_text=kwargs["instruction_text"],
         )
     elif action_name == "search":
-        path = os.path.join(TEMPLATE_DIR, "results_page.html")
-        html = render_template_string(
-            read_html_template(path=path),
+        html = render_template(
+            "results_page.html",
             session_id=kwargs["session_id"],
             products=kwargs["products"],
             keywords=kwargs["keywords"],
@@ -73,9 +94,8 @@ def map_action_to_html(action, **kwargs):
             instruction_text=kwargs["instruction_text"],
         )
     elif action_name == "click" and action_arg == END_BUTTON:
-        path = os.path.join(TEMPLATE_DIR, "done_page.html")
-        html = render_template_string(
-            read_html_template(path),
+        html = render_template(
+            "done_page.html",
             session_id=kwargs["session_id"],
             reward=kwargs["reward"],
             asin=kwargs["asin"],
@@ -90,9 +110,8 @@ def map_action_to_html(action, **kwargs):
             product_category=kwargs.get("product_category"),
         )
     elif action_name == "click" and action_arg in ACTION_TO_TEMPLATE:
-        path = os.path.join(TEMPLATE_DIR, ACTION_TO_TEMPLATE[action_arg])
-        html = render_template_string(
-            read_html_template(path),
+        html = render_template(
+            ACTION_TO_TEMPLATE[action_arg],
             session_id=kwargs["session_id"],
             product_info=kwargs["product_info"],
             keywords=kwargs["keywords"],
@@ -102,9 +121,8 @@ def map_action_to_html(action, **kwargs):
             instruction_text=kwargs.get("instruction_text"),
         )
     elif action_name == "click":
-        path = os.path.join(TEMPLATE_DIR, "item_page.html")
-        html = render_template_string(
-            read_html_template(path),
+        html = render_template(
+            "item_page.html",
             session_id=kwargs["session_id"],
             product_info=kwargs["product_info"],
             keywords=kwargs["keywords"],
@@ -119,16 +137,12 @@ def map_action_to_html(action, **kwargs):
     return html
 
 
-def read_html_template(path):
-    with open(path) as f:
-        template = f.read()
-    return template
+_ACTION_PATTERN = re.compile(r"(.+)\[(.+)\]")
 
 
 def parse_action(action):
     """Parse action string to action name and its arguments."""
-    pattern = re.compile(r"(.+)\[(.+)\]")
-    m = re.match(pattern, action)
+    m = _ACTION_PATTERN.match(action)
     if m is None:
         action_name = action
         action_arg = None
@@ -154,13 +168,41 @@ def convert_web_app_string_to_var(name, string):
     return var
 
 
+class ProductIndex:
+    """Products grouped by category, query and attribute, in catalog order"""
+
+    def __init__(self, all_products):
+        self.products = tuple(all_products)
+        self.by_category = defaultdict(list)
+        self.by_query = defaultdict(list)
+        self.by_attribute = defaultdict(list)
+        for p in self.products:
+            self.by_category[p["category"]].append(p)
+            self.by_query[p["query"]].append(p)
+            # An attribute may be listed more than once for a product.
+            for a in dict.fromkeys(p["Attributes"]):
+                self.by_attribute[a].append(p)
+
+
 def get_top_n_product_from_keywords(
     keywords,
     search_engine,
     all_products,
     product_item_dict,
     attribute_to_asins=None,
+    product_index=None,
 ):
+    if product_index is not None and keywords[0] in ("<r>", "<a>", "<c>", "<q>"):
+        if keywords[0] == "<r>":
+            return random.sample(product_index.products, k=SEARCH_RETURN_N)
+        if keywords[0] == "<a>":
+            products = product_index.by_attribute.get(" ".join(keywords[1:]).strip())
+        elif keywords[0] == "<c>":
+            products = product_index.by_category.get(keywords[1].strip())
+        else:
+            products = product_index.by_query.get(" ".join(keywords[1:]).strip())
+        return list(products or ())
+
     if keywords[0] == "<r>":
         top_n_products = random.sample(all_products, k=SEARCH_RETURN_N)
     elif keywords[0] == "<a>":
@@ -175,9 +217,7 @@ def get_top_n_product_from_keywords(
         top_n_products = [p for p in all_products if p["query"] == query]
     else:
         keywords = " ".join(keywords)
-        hits = search_engine.search(keywords, k=SEARCH_RETURN_N)
-        docs = [search_engine.doc(hit.docid) for hit in hits]
-        top_n_asins = [json.loads(doc.raw())["id"] for doc in docs]
+        top_n_asins = search_engine.search(keywords, k=SEARCH_RETURN_N)
         top_n_products = [
             product_item_dict[asin] for asin in top_n_asins if asin in product_item_dict
         ]
@@ -203,25 +243,34 @@ def generate_product_prices(all_products):
     return product_prices
 
 
-def init_search_engine(num_products=None):
+def init_search_engine(num_products=None, backend="lucene"):
+    """Search backend over the products of the given tier
+
+    "lucene" searches the pyserini index, "bm25" searches the converted
+    documents in-process, without a JVM.
+    """
     if num_products == 100:
-        indexes = "indexes_100"
+        tier = "100"
     elif num_products == 1000:
-        indexes = "indexes_1k"
+        tier = "1k"
     elif num_products == 10000:
-        indexes = "indexes_10k"
+        tier = "10k"
     elif num_products == 50000:
-        indexes = "indexes_50k"
+        tier = "50k"
     elif num_products is None:
-        indexes = "indexes_1k"
+        tier = "1k"
     else:
         raise NotImplementedError(
             f"num_products being {num_products} is not supported yet."
         )
-    search_engine = LuceneSearcher(
-        os.path.join(BASE_DIR, f"../search_engine/{indexes}")
-    )
-    return search_engine
+    search_engine_dir = os.path.join(BASE_DIR, "../search_engine")
+    if backend == "lucene":
+        return LuceneSearchBackend(os.path.join(search_engine_dir, f"indexes_{tier}"))
+    elif backend == "bm25":
+        return BM25SearchBackend.from_documents(
+            os.path.join(search_engine_dir, f"resources_{tier}")
+        )
+    raise ValueError(f"Unknown search backend {backend}.")
 
 
 def clean_product_keys(products):
@@ -244,8 +293,90 @@ def clean_product_keys(products):
     return products
 
 
-def load_products(filepath, num_products=None, human_goals=True):
-    # TODO: move to preprocessing step -> enforce single source of truth
+SNAPSHOT_VERSION = 1
+
+
+def get_snapshot_path(filepath, num_products=None, human_goals=True):
+    """Path of the preprocessed products snapshot for the given arguments"""
+    goals = "human" if human_goals else "synthetic"
+    return f"{filepath}.{num_products or 'all'}.{goals}.v{SNAPSHOT_VERSION}.pkl"
+
+
+def _intern_strings(obj):
+    """Intern the strings of `obj` so that repeated values are pickled once"""
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    if isinstance(obj, list):
+        return [_intern_strings(o) for o in obj]
+    if isinstance(obj, dict):
+        return {sys.intern(k): _intern_strings(v) for k, v in obj.items()}
+    return obj
+
+
+def read_products_snapshot(snapshot_path, source_paths):
+    """Returns the snapshot if it exists and is newer than its sources"""
+    try:
+        snapshot_mtime = os.path.getmtime(snapshot_path)
+        if any(os.path.getmtime(p) > snapshot_mtime for p in source_paths):
+            return None
+        # The snapshot holds millions of containers, and the cyclic garbage
+        # collector would run many times while they are created.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(snapshot_path, "rb") as f:
+                return pickle.load(f)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def write_products_snapshot(snapshot_path, products_data):
+    """Writes the snapshot atomically; failing to do so is not an error"""
+    all_products, _, product_prices, attribute_to_asins = products_data
+    all_products = [_intern_strings(p) for p in all_products]
+    # Re-derive the dict from the interned products so they stay shared.
+    product_item_dict = {p["asin"]: p for p in all_products}
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                (all_products, product_item_dict, product_prices, attribute_to_asins),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, snapshot_path)
+    except OSError as e:
+        print(f"Could not write products snapshot {snapshot_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_products(filepath, num_products=None, human_goals=True, use_snapshot=True):
+    """Loads and preprocesses the products.
+
+    The result is cached in a pickled snapshot next to `filepath`, which is
+    loaded instead on the next calls as long as it is newer than the raw data.
+    """
+    source_paths = [filepath, DEFAULT_ATTR_PATH, HUMAN_ATTR_PATH]
+    snapshot_path = get_snapshot_path(filepath, num_products, human_goals)
+    if use_snapshot:
+        products_data = read_products_snapshot(snapshot_path, source_paths)
+        if products_data is not None:
+            print(f"Products loaded from snapshot {snapshot_path}.")
+            return products_data
+    products_data = _load_products(filepath, num_products, human_goals)
+    if use_snapshot:
+        write_products_snapshot(snapshot_path, products_data)
+    return products_data
+
+
+_PRICE_CHARS = re.compile(r"[^\d.]")
+
+
+def _load_products(filepath, num_products=None, human_goals=True):
     with open(filepath) as f:
         products = json.load(f)
     print("Products loaded.")
@@ -264,8 +395,6 @@ def load_products(filepath, num_products=None, human_goals=True):
             human_attributes = json.load(f)
     with open(DEFAULT_ATTR_PATH) as f:
         attributes = json.load(f)
-    with open(HUMAN_ATTR_PATH) as f:
-        human_attributes = json.load(f)
     print("Attributes loaded.")
 
     asins = set()
@@ -311,8 +440,7 @@ def load_products(filepath, num_products=None, human_goals=True):
             price_tag = "$100.0"
         else:
             pricing = [
-                float(Decimal(re.sub(r"[^\d.]", "", price)))
-                for price in pricing.split("$")[1:]
+                float(_PRICE_CHARS.sub("", price)) for price in pricing.split("$")[1:]
             ]
             if len(pricing) == 1:
                 price_tag = f"${pricing[0]}"
@@ -14,18 +14,38 @@
 
 """Functions for specifying goals and reward calculations."""
 
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 import itertools
 import random
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 from rich import print
 import spacy
-from thefuzz import fuzz
 from .normalize import normalize_color
 
 nlp = spacy.load("en_core_web_sm")
 
 PRICE_RANGE = [10.0 * i for i in range(1, 100)]
 
+TYPE_POS = ("PNOUN", "NOUN", "PROPN")
+
+# Scores are rounded to integers and must be above 85 to match, i.e. 85.5 and up
+# as Python rounds half to even.
+FUZZY_MATCH_THRESHOLD = 85.5
+
+# Sizes of the LRU caches below
+TYPE_PARSE_CACHE_SIZE = 2**17
+PRODUCT_TEXT_CACHE_SIZE = 2**12
+
+# Lowercased nouns of product names, by name
+_type_parses = OrderedDict()
+# Lowercased text fields of purchased products, by ASIN
+_product_texts = OrderedDict()
+# Like `thefuzz`, drop latin-1 characters before the default processing
+_NON_ASCII = {i: None for i in range(128, 256)}
+
 
 def get_goals(all_products, product_prices, human_goals=True):
     if human_goals:
@@ -144,6 +164,87 @@ def get_synthetic_goals(all_products, product_prices):
     return goals
 
 
+def _nouns(doc):
+    return tuple(t.text.lower() for t in doc if t.pos_ in TYPE_POS)
+
+
+def _get_cached(cache, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _set_cached(cache, key, value, max_size):
+    cache[key] = value
+    if len(cache) > max_size:
+        cache.popitem(last=False)
+    return value
+
+
+def get_type_parse(name):
+    """Lowercased nouns of a product name, parsed once while it is cached"""
+    parse = _get_cached(_type_parses, name)
+    if parse is None:
+        parse = _set_cached(
+            _type_parses, name, _nouns(nlp(name)), TYPE_PARSE_CACHE_SIZE
+        )
+    return parse
+
+
+def cache_type_parses(names, batch_size=256):
+    """Parse the given product names in batches ahead of reward calculations
+
+    Only the first `TYPE_PARSE_CACHE_SIZE` names are parsed, as the cache would
+    not keep more.
+    """
+    names = list(
+        itertools.islice(
+            (name for name in dict.fromkeys(names) if name not in _type_parses),
+            TYPE_PARSE_CACHE_SIZE,
+        )
+    )
+    for name, doc in zip(names, nlp.pipe(names, batch_size=batch_size)):
+        _set_cached(_type_parses, name, _nouns(doc), TYPE_PARSE_CACHE_SIZE)
+
+
+def fuzzy_process(s):
+    """Preprocessing of `thefuzz.fuzz.token_set_ratio`"""
+    return default_process(str(s).translate(_NON_ASCII))
+
+
+def get_product_texts(product):
+    """Lowercased text fields and processed attributes of a product, cached"""
+    texts = _get_cached(_product_texts, product["asin"])
+    if texts is None:
+        texts = _set_cached(
+            _product_texts,
+            product["asin"],
+            dict(
+                title=product["Title"].lower(),
+                bullet_points=" ".join(product["BulletPoints"]).lower(),
+                description=product["Description"].lower(),
+                attributes=[fuzzy_process(a) for a in product["Attributes"]],
+            ),
+            PRODUCT_TEXT_CACHE_SIZE,
+        )
+    return texts
+
+
+def fuzzy_matches(choices, queries):
+    """Whether each query matches any of the choices, as `thefuzz` scores above 85"""
+    if not choices or not queries:
+        return np.zeros(len(queries), dtype=bool)
+    scores = process.cdist(
+        choices,
+        queries,
+        scorer=fuzz.token_set_ratio,
+        processor=None,
+        dtype=np.float64,
+    )
+    return (scores >= FUZZY_MATCH_THRESHOLD).any(axis=0)
+
+
 def get_type_reward(purchased_product, goal):
     """Determines the type reward - captures whether chosen product is in the same category"""
     query_match = purchased_product["query"] == goal["query"]
@@ -161,19 +262,8 @@ def get_type_reward(purchased_product, goal):
     purchased_type = purchased_product["name"]
     desired_type = goal["name"]
 
-    purchased_type_parse = nlp(purchased_type)
-    desired_type_parse = nlp(desired_type)
-
-    purchased_type_parse = [
-        t.text.lower()
-        for t in purchased_type_parse
-        if t.pos_ in ("PNOUN", "NOUN", "PROPN")
-    ]
-    desired_type_parse = [
-        t.text.lower()
-        for t in desired_type_parse
-        if t.pos_ in ("PNOUN", "NOUN", "PROPN")
-    ]
+    purchased_type_parse = get_type_parse(purchased_type)
+    desired_type_parse = get_type_parse(desired_type)
 
     n_intersect_type = len(set(purchased_type_parse) & set(desired_type_parse))
     if len(desired_type_parse) == 0:
@@ -204,27 +294,22 @@ def get_type_reward(purchased_product, goal):
 
 def get_attribute_reward(purchased_product, goal):
     """Determines whether purchased products shares same attributes as goal"""
-    purchased_attrs = purchased_product["Attributes"]
+    texts = get_product_texts(purchased_product)
     goal_attrs = goal["attributes"]
 
+    # Check whether goal attributes are found in purchased product attribute list
+    attr_matches = fuzzy_matches(
+        texts["attributes"], [fuzzy_process(a) for a in goal_attrs]
+    )
     num_attr_matches = 0
-    for g_attr in goal_attrs:
-        matched = False
-        # Check whether goal attribute found in purchased product attribute list
-        for p_attr in purchased_attrs:
-            score = fuzz.token_set_ratio(p_attr, g_attr)
-            if score > 85:
-                num_attr_matches += 1
-                matched = True
-                break
+    for g_attr, matched in zip(goal_attrs, attr_matches):
         # If not in purchased attrs, check Title, Bullet Points (Features), Desc
-        if not matched and (
-            g_attr in purchased_product["Title"].lower()
-            or g_attr in " ".join(purchased_product["BulletPoints"]).lower()
-            or g_attr in purchased_product["Description"].lower()
+        if matched or (
+            g_attr in texts["title"]
+            or g_attr in texts["bullet_points"]
+            or g_attr in texts["description"]
         ):
             num_attr_matches += 1
-            matched = True
 
     r_attr = num_attr_matches / len(goal_attrs)
     return r_attr, num_attr_matches
@@ -236,13 +321,12 @@ def get_option_reward(purchased_options, goal_options):
     goal_options = [normalize_color(o) for o in goal_options]
 
     # Perform fuzzy matching of each purchased option against each goal option
-    num_option_matches = 0
-    for g_option in goal_options:
-        for p_option in purchased_options:
-            score = fuzz.token_set_ratio(p_option, g_option)
-            if score > 85:
-                num_option_matches += 1
-                break
+    num_option_matches = int(
+        fuzzy_matches(
+            [fuzzy_process(o) for o in purchased_options],
+            [fuzzy_process(o) for o in goal_options],
+        ).sum()
+    )
 
     # Calculate option reward as fraction of goal options hit
     r_option = num_option_matches / len(goal_options) if len(goal_options) > 0 else None
@@ -295,3 +379,19 @@ def get_reward(purchased_product, goal, price, options, **kwargs):
             )
         return total_reward, info
     return total_reward
+
+
+def get_rewards_batch(purchased_products, goals, prices, options, **kwargs):
+    """Get reward scores for many purchased product and goal pairs"""
+    cache_type_parses(
+        itertools.chain(
+            (product["name"] for product in purchased_products),
+            (goal["name"] for goal in goals),
+        )
+    )
+    return [
+        get_reward(product, goal, price=price, options=product_options, **kwargs)
+        for product, goal, price, product_options in zip(
+            purchased_products, goals, prices, options, strict=True
+        )
+    ]
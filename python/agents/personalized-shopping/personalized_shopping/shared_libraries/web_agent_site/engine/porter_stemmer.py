@@ -0,0 +1,238 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Porter stemmer, as used by Lucene's PorterStemFilter.
+
+Port of Martin Porter's reference implementation, including its departures
+from the published algorithm ("bli" -> "ble" and "logi" -> "log"). Words of
+up to two letters are not stemmed.
+"""
+
+
+class PorterStemmer:
+    """Stems one word at a time. Not thread-safe, use `stem` instead."""
+
+    def __init__(self):
+        self.b = []
+        self.k = 0
+        self.j = 0
+
+    def cons(self, i):
+        """True if b[i] is a consonant"""
+        ch = self.b[i]
+        if ch in "aeiou":
+            return False
+        if ch == "y":
+            return i == 0 or not self.cons(i - 1)
+        return True
+
+    def m(self):
+        """Number of consonant sequences between 0 and j"""
+        n = 0
+        i = 0
+        j = self.j
+        while True:
+            if i > j:
+                return n
+            if not self.cons(i):
+                break
+            i += 1
+        i += 1
+        while True:
+            while True:
+                if i > j:
+                    return n
+                if self.cons(i):
+                    break
+                i += 1
+            i += 1
+            n += 1
+            while True:
+                if i > j:
+                    return n
+                if not self.cons(i):
+                    break
+                i += 1
+            i += 1
+
+    def vowelinstem(self):
+        return any(not self.cons(i) for i in range(self.j + 1))
+
+    def doublec(self, j):
+        if j < 1 or self.b[j] != self.b[j - 1]:
+            return False
+        return self.cons(j)
+
+    def cvc(self, i):
+        if i < 2 or not self.cons(i) or self.cons(i - 1) or not self.cons(i - 2):
+            return False
+        return self.b[i] not in "wxy"
+
+    def ends(self, s):
+        length = len(s)
+        o = self.k - length + 1
+        if o < 0 or "".join(self.b[o : self.k + 1]) != s:
+            return False
+        self.j = self.k - length
+        return True
+
+    def setto(self, s):
+        j = self.j
+        self.b[j + 1 :] = s
+        self.k = j + len(s)
+
+    def r(self, s):
+        if self.m() > 0:
+            self.setto(s)
+
+    def step1(self):
+        """Plurals and -ed or -ing"""
+        b = self.b
+        if b[self.k] == "s":
+            if self.ends("sses"):
+                self.k -= 2
+            elif self.ends("ies"):
+                self.setto("i")
+            elif b[self.k - 1] != "s":
+                self.k -= 1
+            del b[self.k + 1 :]
+        if self.ends("eed"):
+            if self.m() > 0:
+                self.k -= 1
+        elif (self.ends("ed") or self.ends("ing")) and self.vowelinstem():
+            self.k = self.j
+            del b[self.k + 1 :]
+            if self.ends("at"):
+                self.setto("ate")
+            elif self.ends("bl"):
+                self.setto("ble")
+            elif self.ends("iz"):
+                self.setto("ize")
+            elif self.doublec(self.k):
+                if b[self.k - 1] not in "lsz":
+                    self.k -= 1
+            elif self.m() == 1 and self.cvc(self.k):
+                self.setto("e")
+        del b[self.k + 1 :]
+
+    def step2(self):
+        """Terminal y to i when there is another vowel in the stem"""
+        if self.ends("y") and self.vowelinstem():
+            self.b[self.k] = "i"
+
+    def replace_suffix(self, rules):
+        for suffix, replacement in rules:
+            if self.ends(suffix):
+                self.r(replacement)
+                break
+        del self.b[self.k + 1 :]
+
+    STEP3_RULES = {
+        "a": (("ational", "ate"), ("tional", "tion")),
+        "c": (("enci", "ence"), ("anci", "ance")),
+        "e": (("izer", "ize"),),
+        "l": (
+            ("bli", "ble"),
+            ("alli", "al"),
+            ("entli", "ent"),
+            ("eli", "e"),
+            ("ousli", "ous"),
+        ),
+        "o": (("ization", "ize"), ("ation", "ate"), ("ator", "ate")),
+        "s": (
+            ("alism", "al"),
+            ("iveness", "ive"),
+            ("fulness", "ful"),
+            ("ousness", "ous"),
+        ),
+        "t": (("aliti", "al"), ("iviti", "ive"), ("biliti", "ble")),
+        "g": (("logi", "log"),),
+    }
+
+    STEP4_RULES = {
+        "e": (("icate", "ic"), ("ative", ""), ("alize", "al")),
+        "i": (("iciti", "ic"),),
+        "l": (("ical", "ic"), ("ful", "")),
+        "s": (("ness", ""),),
+    }
+
+    def step3(self):
+        """Double suffixes to single ones"""
+        if self.k == 0:
+            return
+        self.replace_suffix(self.STEP3_RULES.get(self.b[self.k - 1], ()))
+
+    def step4(self):
+        """-ic-, -full, -ness etc."""
+        self.replace_suffix(self.STEP4_RULES.get(self.b[self.k], ()))
+
+    STEP5_SUFFIXES = {
+        "a": ("al",),
+        "c": ("ance", "ence"),
+        "e": ("er",),
+        "i": ("ic",),
+        "l": ("able", "ible"),
+        "n": ("ant", "ement", "ment", "ent"),
+        "s": ("ism",),
+        "t": ("ate", "iti"),
+        "u": ("ous",),
+        "v": ("ive",),
+        "z": ("ize",),
+    }
+
+    def step5(self):
+        """-ant, -ence etc., in context <c>vcvc<v>"""
+        if self.k == 0:
+            return
+        ch = self.b[self.k - 1]
+        if ch == "o":
+            if not (
+                self.ends("ion") and self.j >= 0 and self.b[self.j] in "st"
+            ) and not self.ends("ou"):
+                return
+        elif not any(self.ends(s) for s in self.STEP5_SUFFIXES.get(ch, ())):
+            return
+        if self.m() > 1:
+            self.k = self.j
+            del self.b[self.k + 1 :]
+
+    def step6(self):
+        """Removes a final -e and changes -ll to -l if m() > 1"""
+        self.j = self.k
+        if self.b[self.k] == "e":
+            a = self.m()
+            if a > 1 or (a == 1 and not self.cvc(self.k - 1)):
+                self.k -= 1
+        if self.b[self.k] == "l" and self.doublec(self.k) and self.m() > 1:
+            self.k -= 1
+        del self.b[self.k + 1 :]
+
+    def stem(self, word):
+        if len(word) <= 2:
+            return word
+        self.b = list(word)
+        self.k = len(word) - 1
+        self.j = 0
+        self.step1()
+        if self.k > 0:
+            self.step2()
+            self.step3()
+            self.step4()
+            self.step5()
+            self.step6()
+        return "".join(self.b[: self.k + 1])
+
+
+def stem(word):
+    return PorterStemmer().stem(word)
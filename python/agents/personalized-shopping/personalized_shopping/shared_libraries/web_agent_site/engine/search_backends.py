@@ -0,0 +1,328 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Keyword search backends over the product documents."""
+
+import abc
+from collections import Counter
+import functools
+import json
+import os
+import re
+
+import numpy as np
+
+from .porter_stemmer import stem
+
+SEARCH_CACHE_SIZE = 1024
+
+
+class SearchBackend(abc.ABC):
+    """Keyword search returning the ASINs of the best matching products
+
+    Results of recent queries are kept in an LRU cache.
+    """
+
+    def __init__(self, cache_size=SEARCH_CACHE_SIZE):
+        self._cached_search = functools.lru_cache(maxsize=cache_size)(self._search)
+
+    def search(self, keywords, k):
+        """ASINs of the top `k` products for `keywords`, as a tuple"""
+        return self._cached_search(keywords, k)
+
+    @abc.abstractmethod
+    def _search(self, keywords, k):
+        """ASINs of the top `k` products for `keywords`, without caching"""
+
+
+class LuceneSearchBackend(SearchBackend):
+    """Search with pyserini over the index built by `run_indexing.sh`"""
+
+    def __init__(self, index_dir, cache_size=SEARCH_CACHE_SIZE):
+        # Imported here, as it starts a JVM.
+        from pyserini.search.lucene import LuceneSearcher
+
+        super().__init__(cache_size)
+        self.searcher = LuceneSearcher(index_dir)
+
+    def _search(self, keywords, k):
+        # Document IDs are the ASINs, no need to fetch the stored documents.
+        return tuple(hit.docid for hit in self.searcher.search(keywords, k=k))
+
+
+# Tokens of Lucene's StandardTokenizer, approximately: letters, digits and
+# underscores, joined by periods or apostrophes within words and by periods,
+# commas or semicolons within numbers.
+TOKEN_PATTERN = re.compile(
+    r"\w+(?:(?:(?<=[^\W\d_])[.'’](?=[^\W\d_])|(?<=\d)[.,;'’](?=\d))\w+)*"
+)
+# Lucene's English stop words
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for if in into is it no not of on or such that "
+    "the their then there these they this to was will with".split()
+)
+POSSESSIVE_SUFFIXES = ("'s", "’s", "＇s")
+
+
+class Analyzer:
+    """Terms of a text, like Anserini's default English analyzer
+
+    Tokens are lowercased, possessives and stop words removed, and the rest is
+    Porter-stemmed. The terms of each distinct token are cached.
+    """
+
+    def __init__(self):
+        self.token_to_term = dict()
+
+    def get_term(self, token):
+        term = self.token_to_term.get(token, False)
+        if term is False:
+            word = token
+            if word.endswith(POSSESSIVE_SUFFIXES):
+                word = word[:-2]
+            term = None if word in STOP_WORDS else stem(word)
+            self.token_to_term[token] = term
+        return term
+
+    def __call__(self, text):
+        get_term = self.get_term
+        terms = [get_term(token) for token in TOKEN_PATTERN.findall(text.lower())]
+        return [term for term in terms if term is not None]
+
+
+def _int_to_int4(i):
+    num_bits = int(i).bit_length()
+    if num_bits < 4:
+        return i
+    shift = num_bits - 4
+    return ((i >> shift) & 0x07) | ((shift + 1) << 3)
+
+
+def _int4_to_int(i):
+    bits = i & 0x07
+    shift = (i >> 3) - 1
+    return bits if shift == -1 else (bits | 0x08) << shift
+
+
+_NUM_FREE_VALUES = 255 - _int_to_int4(2**31 - 1)
+
+
+def encode_lengths(lengths):
+    """Document lengths as Lucene stores them in norms, with 1 byte precision"""
+    lengths = np.asarray(lengths, dtype=np.int64)
+    encoded = lengths.copy()
+    large = lengths >= _NUM_FREE_VALUES
+    encoded[large] = [
+        _NUM_FREE_VALUES + _int_to_int4(i - _NUM_FREE_VALUES) for i in lengths[large]
+    ]
+    return encoded.astype(np.uint8)
+
+
+# Decoded length of every norm byte
+LENGTH_TABLE = np.array(
+    [
+        (
+            i
+            if i < _NUM_FREE_VALUES
+            else _NUM_FREE_VALUES + _int4_to_int(i - _NUM_FREE_VALUES)
+        )
+        for i in range(256)
+    ],
+    dtype=np.float32,
+)
+
+
+# Arrays of `BM25SearchBackend` saved in its snapshots
+SNAPSHOT_ARRAYS = (
+    "doc_ids",
+    "terms",
+    "indptr",
+    "doc_indices",
+    "term_freqs",
+    "doc_lengths",
+)
+
+
+class BM25SearchBackend(SearchBackend):
+    """In-process BM25 search over the documents of `convert_product_file_format.py`
+
+    Postings are stored per term, as compressed sparse rows of document indices
+    and term frequencies. Scores follow Lucene's BM25 with pyserini's defaults,
+    including document lengths with 1 byte precision, so that rankings are
+    close to `LuceneSearchBackend`.
+    """
+
+    def __init__(
+        self,
+        doc_ids,
+        terms,
+        indptr,
+        doc_indices,
+        term_freqs,
+        doc_lengths,
+        k1=0.9,
+        b=0.4,
+        cache_size=SEARCH_CACHE_SIZE,
+    ):
+        super().__init__(cache_size)
+        self.doc_ids = doc_ids
+        self.terms = terms
+        self.indptr = indptr
+        self.doc_indices = doc_indices
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.analyzer = Analyzer()
+        self.term_to_index = {term: i for i, term in enumerate(terms.tolist())}
+
+        num_docs = len(doc_ids)
+        doc_freqs = np.diff(indptr)
+        self.idf = np.log1p((num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(
+            np.float32
+        )
+        avg_length = np.float32(term_freqs.sum() / max(num_docs, 1))
+        norm_inverse = np.float32(1) / (
+            np.float32(k1)
+            * (
+                (np.float32(1) - np.float32(b))
+                + np.float32(b) * LENGTH_TABLE / avg_length
+            )
+        )
+        self.doc_norm_inverse = norm_inverse[encode_lengths(doc_lengths)]
+
+    @classmethod
+    def from_docs(cls, docs, **kwargs):
+        """Index (id, contents) pairs"""
+        analyzer = Analyzer()
+        term_to_index = dict()
+        doc_ids = []
+        doc_lengths = []
+        term_indices = []
+        doc_indices = []
+        term_freqs = []
+        for i, (doc_id, contents) in enumerate(docs):
+            doc_ids.append(doc_id)
+            terms = analyzer(contents)
+            doc_lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                term_indices.append(term_to_index.setdefault(term, len(term_to_index)))
+                doc_indices.append(i)
+                term_freqs.append(count)
+
+        # Postings sorted by term, then by document
+        term_indices = np.array(term_indices, dtype=np.int32)
+        order = np.argsort(term_indices, kind="stable")
+        indptr = np.zeros(len(term_to_index) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(term_indices, minlength=len(term_to_index)), out=indptr[1:]
+        )
+        return cls(
+            np.array(doc_ids, dtype=str),
+            np.array(list(term_to_index), dtype=str),
+            indptr,
+            np.array(doc_indices, dtype=np.int32)[order],
+            np.array(term_freqs, dtype=np.int32)[order],
+            np.array(doc_lengths, dtype=np.int32),
+            **kwargs,
+        )
+
+    @classmethod
+    def from_documents(cls, docs_dir, use_snapshot=True, **kwargs):
+        """Index the JSON lines documents in `docs_dir`
+
+        The index is saved next to `docs_dir`, and loaded instead on the next
+        calls as long as the same document files are there, with the same
+        sizes, and none of them is newer than the index.
+        """
+        paths = [
+            os.path.join(docs_dir, name)
+            for name in sorted(os.listdir(docs_dir))
+            if name.endswith((".json", ".jsonl"))
+        ]
+        shard_names = np.array([os.path.basename(path) for path in paths], dtype=str)
+        shard_sizes = np.array(
+            [os.path.getsize(path) for path in paths], dtype=np.int64
+        )
+        snapshot_path = f"{os.path.normpath(docs_dir)}.bm25.npz"
+        if use_snapshot and os.path.exists(snapshot_path):
+            snapshot_mtime = os.path.getmtime(snapshot_path)
+            with np.load(snapshot_path) as snapshot:
+                if (
+                    "shard_names" in snapshot.files
+                    and np.array_equal(snapshot["shard_names"], shard_names)
+                    and np.array_equal(snapshot["shard_sizes"], shard_sizes)
+                    and all(os.path.getmtime(path) <= snapshot_mtime for path in paths)
+                ):
+                    return cls(
+                        **{name: snapshot[name] for name in SNAPSHOT_ARRAYS}, **kwargs
+                    )
+
+        def iter_docs():
+            for path in paths:
+                with open(path) as f:
+                    for line in f:
+                        doc = json.loads(line)
+                        yield doc["id"], doc["contents"]
+
+        backend = cls.from_docs(iter_docs(), **kwargs)
+        if use_snapshot:
+            tmp_path = f"{snapshot_path}.{os.getpid()}.tmp.npz"
+            np.savez(
+                tmp_path,
+                shard_names=shard_names,
+                shard_sizes=shard_sizes,
+                **{name: getattr(backend, name) for name in SNAPSHOT_ARRAYS},
+            )
+            os.replace(tmp_path, snapshot_path)
+        return backend
+
+    def _search(self, keywords, k):
+        query_terms = Counter(
+            term for term in self.analyzer(keywords) if term in self.term_to_index
+        )
+        if not query_terms:
+            return ()
+        matched_docs = []
+        matched_scores = []
+        for term, boost in query_terms.items():
+            t = self.term_to_index[term]
+            start, end = self.indptr[t], self.indptr[t + 1]
+            docs = self.doc_indices[start:end]
+            weight = np.float32(boost) * self.idf[t]
+            matched_docs.append(docs)
+            matched_scores.append(
+                weight
+                - weight
+                / (
+                    np.float32(1)
+                    + self.term_freqs[start:end] * self.doc_norm_inverse[docs]
+                )
+            )
+        if len(matched_docs) == 1:
+            docs, scores = matched_docs[0], matched_scores[0]
+        else:
+            scores = np.bincount(
+                np.concatenate(matched_docs),
+                weights=np.concatenate(matched_scores),
+                minlength=len(self.doc_ids),
+            )
+            # Matched documents have positive scores.
+            docs = np.flatnonzero(scores)
+            scores = scores[docs].astype(np.float32)
+
+        # Best scores first, ties broken by document order like Lucene
+        if len(docs) > k:
+            keep = scores >= np.partition(scores, len(scores) - k)[len(scores) - k]
+            docs, scores = docs[keep], scores[keep]
+        order = np.lexsort((docs, -scores))[:k]
+        return tuple(self.doc_ids[docs[order]].tolist())
@@ -13,6 +13,9 @@
 # limitations under the License.
 
 from collections import defaultdict
+from functools import cached_property
+from html.parser import HTMLParser
+import itertools
 import json
 import random
 import string
@@ -30,14 +33,16 @@ from ..engine.engine import (
     END_BUTTON,
     NEXT_PAGE,
     PREV_PAGE,
+    ProductIndex,
     get_product_per_page,
     get_top_n_product_from_keywords,
     init_search_engine,
+    init_template_env,
     load_products,
     map_action_to_html,
     parse_action,
 )
-from ..engine.goal import get_goals, get_reward
+from ..engine.goal import cache_type_parses, get_goals, get_reward
 from ..utils import (
     DEFAULT_FILE_PATH,
     FEAT_CONV,
@@ -72,6 +77,11 @@ class WebAgentTextEnv(gym.Env):
         session
         session_prefix
         show_attrs
+        cache_rewards
+        search_backend
+        parse_mode (`str`) -- ['soup' | 'stream'] (default 'soup'), 'stream'
+          extracts the text observation and clickables in a single pass,
+          without building a BeautifulSoup tree
         """
         super(WebAgentTextEnv, self).__init__()
         self.observation_mode = observation_mode
@@ -89,6 +99,8 @@ class WebAgentTextEnv(gym.Env):
                 self.kwargs.get("num_products"),
                 self.kwargs.get("human_goals"),
                 self.kwargs.get("show_attrs", False),
+                self.kwargs.get("cache_rewards", False),
+                self.kwargs.get("search_backend", "lucene"),
             )
             if server is None
             else server
@@ -103,9 +115,12 @@ class WebAgentTextEnv(gym.Env):
             self.ids = {url: idx for idx, url in enumerate(self.ids)}
         self.prev_obs = []
         self.prev_actions = []
+        self.parse_mode = self.kwargs.get("parse_mode", "soup")
+        self._page = None
+        self._state = None
         self.num_prev_obs = self.kwargs.get("num_prev_obs", 0)
         self.num_prev_actions = self.kwargs.get("num_prev_actions", 0)
-        self.reset()
+        self.reset(session=self.session)
 
     def step(self, action):
         """Takes an action, updates WebShop environment, and returns (observation, reward, done, info)
@@ -150,29 +165,16 @@ class WebAgentTextEnv(gym.Env):
 
     def get_available_actions(self):
         """Returns list of available actions at the current step"""
-        html_obj = self._parse_html()
-
-        # Collect search bar, buttons, links, and options as clickables
-        search_bar = html_obj.find(id="search_input")
-        has_search_bar = True if search_bar is not None else False
-        buttons = html_obj.find_all(class_="btn")
-        product_links = html_obj.find_all(class_="product-link")
-        buying_options = html_obj.select('input[type="radio"]')
-
-        self.text_to_clickable = {
-            f"{b.get_text()}".lower(): b for b in buttons + product_links
-        }
-        for opt in buying_options:
-            opt_value = opt.get("value")
-            self.text_to_clickable[f"{opt_value}"] = opt
+        page = self._current_page()
+        self.text_to_clickable = page.text_to_clickable
         return dict(
-            has_search_bar=has_search_bar,
+            has_search_bar=page.has_search_bar,
             clickables=list(self.text_to_clickable.keys()),
         )
 
     def get_image(self):
         """Scrape image from page HTML and return as a list of pixel values"""
-        html_obj = self._parse_html(self.browser.page_source)
+        html_obj = self._parse_html()
         image_url = html_obj.find(id="product-image")
         if image_url is not None:
             image_url = image_url["src"]
@@ -184,9 +186,14 @@ class WebAgentTextEnv(gym.Env):
 
     def get_instruction_text(self):
         """Get corresponding instruction text for current environment session"""
-        html_obj = self._parse_html(self.browser.page_source)
-        instruction_text = html_obj.find(id="instruction-text").h4.text
-        return instruction_text
+        return self._current_page().instruction_text
+
+    def _current_page(self):
+        """Returns the parsed current page, parsing it only once"""
+        html = self.browser.page_source
+        if self._page is None or self._page.html is not html:
+            self._page = ParsedPage(html, stream=self.parse_mode == "stream")
+        return self._page
 
     def _parse_html(self, html=None):
         """Returns web request result wrapped in BeautifulSoup object
@@ -196,23 +203,23 @@ class WebAgentTextEnv(gym.Env):
         url (`str`): If no url or html is provided, use the current
             observation (HTML) for parsing.
         """
-        if html is None:
-            html = self.state["html"]
+        if html is None or html is self.browser.page_source:
+            return self._current_page().soup
         html_obj = BeautifulSoup(html, "html.parser")
         return html_obj
 
     @property
     def observation(self):
         """Compiles state into either the `html` or `text` observation mode"""
-        html = self.state["html"]
+        html = self.browser.page_source
         if self.observation_mode == "html":
             return html
         elif self.observation_mode == "text":
-            return self.convert_html_to_text(html, simple=True)
+            return self._current_page().simple_text
         elif self.observation_mode == "text_rich":
             return self.convert_html_to_text(html, simple=False)
         elif self.observation_mode == "url":
-            return self.state["url"]
+            return self.browser.current_url
         else:
             raise ValueError(f"Observation mode {self.observation_mode} not supported.")
 
@@ -221,23 +228,33 @@ class WebAgentTextEnv(gym.Env):
         """State that includes all information.
 
         The actual observation are likely to be a subset or reduced form of the
-        state.
+        state. The same dict is returned until the page changes.
         """
-        return dict(
-            url=self.browser.current_url,
-            html=self.browser.page_source,
-            instruction_text=self.instruction_text,
-        )
+        state = self._state
+        if (
+            state is None
+            or state["url"] is not self.browser.current_url
+            or state["html"] is not self.browser.page_source
+            or state["instruction_text"] is not self.instruction_text
+        ):
+            state = self._state = dict(
+                url=self.browser.current_url,
+                html=self.browser.page_source,
+                instruction_text=self.instruction_text,
+            )
+        return state
 
     def convert_html_to_text(self, html, simple=False):
         """Strip HTML of tags and add separators to convert observation into simple mode"""
-        texts = self._parse_html(html).findAll(text=True)
-        visible_texts = filter(tag_visible, texts)
         if simple:
             # For `simple` mode, return just [SEP] separators
-            return " [SEP] ".join(t.strip() for t in visible_texts if t != "\n")
+            if html is self.browser.page_source:
+                return self._current_page().simple_text
+            return ParsedPage(html).simple_text
         else:
             # Otherwise, return an observation with tags mapped to specific, unique separators
+            texts = self._parse_html(html).findAll(text=True)
+            visible_texts = filter(tag_visible, texts)
             observation = ""
             for t in visible_texts:
                 if t == "\n":
@@ -298,6 +315,205 @@ def tag_visible(element):
     return element.parent.name not in ignore and not isinstance(element, Comment)
 
 
+class ParsedPage:
+    """The HTML of a page, parsed once, and what the environment derives from it
+
+    With `stream`, the text observation, clickables and instruction text are
+    extracted in a single pass by `StreamingPageParser`, and the BeautifulSoup
+    tree is only built if `soup` is used. Clickables are then attribute dicts
+    instead of tags.
+    """
+
+    def __init__(self, html, stream=False):
+        self.html = html
+        if stream:
+            parser = StreamingPageParser()
+            parser.feed(html)
+            parser.close()
+            self.__dict__.update(
+                simple_text=parser.simple_text,
+                has_search_bar=parser.has_search_bar,
+                text_to_clickable=parser.text_to_clickable,
+            )
+            if parser.instruction_text is not None:
+                self.instruction_text = parser.instruction_text
+
+    @cached_property
+    def soup(self):
+        return BeautifulSoup(self.html, "html.parser")
+
+    @cached_property
+    def simple_text(self):
+        """Visible text of the page, separated by [SEP]"""
+        visible_texts = filter(tag_visible, self.soup.findAll(text=True))
+        return " [SEP] ".join(t.strip() for t in visible_texts if t != "\n")
+
+    @cached_property
+    def has_search_bar(self):
+        return self.soup.find(id="search_input") is not None
+
+    @cached_property
+    def text_to_clickable(self):
+        """Search bar, buttons, links, and options of the page, by text"""
+        buttons = self.soup.find_all(class_="btn")
+        product_links = self.soup.find_all(class_="product-link")
+        buying_options = self.soup.select('input[type="radio"]')
+
+        text_to_clickable = {
+            f"{b.get_text()}".lower(): b for b in buttons + product_links
+        }
+        for opt in buying_options:
+            opt_value = opt.get("value")
+            text_to_clickable[f"{opt_value}"] = opt
+        return text_to_clickable
+
+    @cached_property
+    def instruction_text(self):
+        return self.soup.find(id="instruction-text").h4.text
+
+
+class StreamingPageParser(HTMLParser):
+    """Single pass equivalent of the BeautifulSoup queries of `ParsedPage`
+
+    Text nodes, whitespace handling and unbalanced tags follow BeautifulSoup's
+    "html.parser" tree builder, so that the observations are the same.
+    """
+
+    VOID_ELEMENTS = {
+        "area", "base", "basefont", "bgsound", "br", "col", "command", "embed",
+        "frame", "hr", "image", "img", "input", "isindex", "keygen", "link",
+        "menuitem", "meta", "nextid", "param", "source", "spacer", "track", "wbr",
+    }
+    INVISIBLE_PARENTS = {"style", "script", "head", "title", "meta"}
+    PRESERVE_WHITESPACE = {"pre", "textarea"}
+    ASCII_SPACES = str.maketrans("", "", "\x20\x0a\x09\x0c\x0d")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.has_search_bar = False
+        self.instruction_text = None
+        self._data = []
+        self._texts = []
+        # Open elements as (name, text collectors ended with the element).
+        self._stack = []
+        self._buttons = []
+        self._product_links = []
+        self._buying_options = []
+        # Depth of the first #instruction-text element while it is open, and
+        # the text collector of its first h4.
+        self._instruction_depth = None
+        self._instruction_seen = False
+        self._instruction = None
+
+    def handle_starttag(self, tag, attrs):
+        self._end_data()
+        attr_dict = {}
+        for key, value in attrs:
+            attr_dict[key] = "" if value is None else value
+        if "class" in attr_dict:
+            attr_dict["class"] = attr_dict["class"].split()
+        classes = attr_dict.get("class", ())
+
+        collectors = []
+        if "btn" in classes:
+            collectors.append(self._collect(self._buttons, attr_dict))
+        if "product-link" in classes:
+            collectors.append(self._collect(self._product_links, attr_dict))
+        if tag == "input" and attr_dict.get("type") == "radio":
+            self._buying_options.append(attr_dict)
+        if attr_dict.get("id") == "search_input":
+            self.has_search_bar = True
+        if tag == "h4" and self._instruction_depth is not None:
+            if self._instruction is None:
+                self._instruction = [None, None, []]
+                collectors.append(self._instruction)
+        if attr_dict.get("id") == "instruction-text" and not self._instruction_seen:
+            self._instruction_seen = True
+            self._instruction_depth = len(self._stack)
+
+        if tag not in self.VOID_ELEMENTS:
+            self._stack.append((tag, collectors))
+        else:
+            self._end_collectors(collectors)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._end_data()
+        if all(name != tag for name, _ in self._stack):
+            return
+        while True:
+            name, collectors = self._stack.pop()
+            self._end_collectors(collectors)
+            if len(self._stack) == self._instruction_depth:
+                self._instruction_depth = None
+            if name == tag:
+                return
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    def handle_decl(self, decl):
+        self._end_data()
+
+    def handle_pi(self, data):
+        self._end_data()
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def close(self):
+        super().close()
+        self._end_data()
+        while self._stack:
+            self._end_collectors(self._stack.pop()[1])
+
+    def _collect(self, clickables, attrs):
+        collector = [clickables, attrs, []]
+        clickables.append(collector)
+        return collector
+
+    def _end_collectors(self, collectors):
+        for collector in collectors:
+            collector[2] = "".join(collector[2])
+            if collector is self._instruction:
+                self.instruction_text = collector[2]
+
+    def _end_data(self):
+        if not self._data:
+            return
+        text = "".join(self._data)
+        self._data = []
+        if not text.translate(self.ASCII_SPACES) and not any(
+            name in self.PRESERVE_WHITESPACE for name, _ in self._stack
+        ):
+            text = "\n" if "\n" in text else " "
+        if self._stack and self._stack[-1][0] not in self.INVISIBLE_PARENTS:
+            self._texts.append(text)
+        for _, collectors in self._stack:
+            for collector in collectors:
+                if not isinstance(collector[2], str):
+                    collector[2].append(text)
+
+    @property
+    def simple_text(self):
+        return " [SEP] ".join(t.strip() for t in self._texts if t != "\n")
+
+    @property
+    def text_to_clickable(self):
+        text_to_clickable = {
+            f"{text}".lower(): attrs
+            for _, attrs, text in self._buttons + self._product_links
+        }
+        for opt in self._buying_options:
+            opt_value = opt.get("value")
+            text_to_clickable[f"{opt_value}"] = opt
+        return text_to_clickable
+
+
 class SimServer:
     """Lightweight simulator of WebShop Flask application for generating HTML observations"""
 
@@ -310,6 +526,8 @@ class SimServer:
         num_products=None,
         human_goals=0,
         show_attrs=False,
+        cache_rewards=False,
+        search_backend="lucene",
     ):
         """Constructor for simulated server serving WebShop application
 
@@ -321,6 +539,10 @@ class SimServer:
         num_products (`int`) -- Number of products to search across
         human_goals (`bool`) -- If true, load human goals; otherwise, load synthetic
           goals
+        cache_rewards (`bool`) -- If true, parse the goal and product names for
+          the type reward up front, for evaluations that score many purchases
+        search_backend (`str`) -- ['lucene' | 'bm25'] (default 'lucene'), 'bm25'
+          searches in-process without pyserini's JVM
         """
         # Load all products, goals, and search engine
         self.base_url = base_url
@@ -331,7 +553,10 @@ class SimServer:
                 human_goals=human_goals,
             )
         )
-        self.search_engine = init_search_engine(num_products=num_products)
+        self.product_index = ProductIndex(self.all_products)
+        self.search_engine = init_search_engine(
+            num_products=num_products, backend=search_backend
+        )
         self.goals = get_goals(self.all_products, self.product_prices, human_goals)
         self.show_attrs = show_attrs
 
@@ -356,6 +581,14 @@ class SimServer:
                     idxs.append(idx)
             self.goals = [self.goals[i] for i in idxs]
         print(f"Loaded {len(self.goals)} goals.")
+        if cache_rewards:
+            # Goal names first, as every reward needs them.
+            cache_type_parses(
+                itertools.chain(
+                    (goal["name"] for goal in self.goals),
+                    (product["name"] for product in self.all_products),
+                )
+            )
 
         # Set extraneous housekeeping variables
         self.weights = [goal["weight"] for goal in self.goals]
@@ -364,7 +597,17 @@ class SimServer:
         self.search_time = 0
         self.render_time = 0
         self.sample_time = 0
-        self.assigned_instruction_text = None  # TODO: very hacky, should remove
+        # Instruction text shown instead of the goal's, by session ID.
+        self.assigned_instruction_texts = dict()
+
+    def set_instruction_text(self, session_id, instruction_text):
+        """Show `instruction_text` instead of the goal's in the given session"""
+        self.assigned_instruction_texts[session_id] = instruction_text
+
+    def end_session(self, session_id):
+        """Forget all the state of the given session"""
+        self.user_sessions.pop(session_id, None)
+        self.assigned_instruction_texts.pop(session_id, None)
 
     @app.route("/", methods=["GET", "POST"])
     def index(self, session_id, **kwargs):
@@ -399,6 +642,7 @@ class SimServer:
             self.search_engine,
             self.all_products,
             self.product_item_dict,
+            product_index=self.product_index,
         )
         self.search_time += time.time() - old_time
 
@@ -423,7 +667,7 @@ class SimServer:
             # This is used for reward computation
             # instruction_text=session['goal']['instruction_text'],
             # This is used for rendering the page
-            instruction_text=self.assigned_instruction_text,
+            instruction_text=self.assigned_instruction_texts.get(session_id),
         )
         self.render_time += time.time() - old_time
         return html, url
@@ -471,7 +715,7 @@ class SimServer:
             # This is used for reward computation
             # instruction_text=session['goal']['instruction_text'],
             # This is used for rendering the page
-            instruction_text=self.assigned_instruction_text,
+            instruction_text=self.assigned_instruction_texts.get(session_id),
             show_attrs=self.show_attrs,
         )
         return html, url
@@ -509,7 +753,7 @@ class SimServer:
             # This is used for reward computation
             # instruction_text=session['goal']['instruction_text'],
             # This is used for rendering the page
-            instruction_text=self.assigned_instruction_text,
+            instruction_text=self.assigned_instruction_texts.get(session_id),
         )
         return html, url
 
@@ -548,7 +792,7 @@ class SimServer:
             # This is used for reward computation
             # instruction_text=session['goal']['instruction_text'],
             # This is used for rendering the page
-            instruction_text=self.assigned_instruction_text,
+            instruction_text=self.assigned_instruction_texts.get(session_id),
         )
         return html, url, reward
 
@@ -556,103 +800,97 @@ class SimServer:
         """Map action to the corresponding page"""
         status = dict(reward=0.0, done=False)
 
-        with app.app_context(), app.test_request_context():
-            # Create/determine goal, instruction_text from current session
-            if session_id not in self.user_sessions:
-                idx = (
-                    session_int
-                    if (session_int is not None and isinstance(session_int, int))
-                    else random_idx(self.cum_weights)
+        # Create/determine goal, instruction_text from current session
+        if session_id not in self.user_sessions:
+            idx = (
+                session_int
+                if (session_int is not None and isinstance(session_int, int))
+                else random_idx(self.cum_weights)
+            )
+            # Copy the goal, its instruction text is updated per session
+            goal = dict(self.goals[idx])
+            instruction_text = goal["instruction_text"]
+            self.user_sessions[session_id] = {"goal": goal, "done": False}
+        else:
+            instruction_text = self.user_sessions[session_id]["goal"]["instruction_text"]
+        if self.assigned_instruction_texts.get(session_id) is not None:
+            instruction_text = self.assigned_instruction_texts[session_id]
+            self.user_sessions[session_id]["goal"]["instruction_text"] = instruction_text
+        session = self.user_sessions[session_id]
+
+        if not kwargs:
+            # If no action, reset the session variables
+            kwargs["instruction_text"] = instruction_text
+            html, url = self.index(session_id, **kwargs)
+            self.user_sessions[session_id].update(
+                {
+                    "keywords": None,
+                    "page": None,
+                    "asin": None,
+                    "asins": set(),
+                    "options": dict(),
+                    "actions": defaultdict(int),
+                }
+            )
+        elif "keywords" in kwargs:
+            # If search keywords are available, run a search
+            html, url = self.search_results(session_id, **kwargs)
+        elif "clickable_name" in kwargs:
+            clickable_name = kwargs["clickable_name"].lower()
+            if clickable_name == END_BUTTON.lower():
+                # If "buy now" clicked, calculate reward and flag session as terminated
+                html, url, reward = self.done(session_id, **kwargs)
+                status["reward"] = reward
+                status["done"] = True
+            elif clickable_name == BACK_TO_SEARCH.lower():
+                # If "back to search" clicked, recursively reset the session back to search page
+                html, url, status = self.receive(session_id, current_url)
+            elif (
+                clickable_name == NEXT_PAGE.lower()
+                and self.get_page_name(current_url) == "search_results"
+            ):
+                # If "next page" clicked from search results, re-render with `page` enumerated
+                html, url, status = self.receive(
+                    session_id,
+                    current_url,
+                    keywords=session["keywords"],
+                    page=session["page"] + 1,
                 )
-                goal = self.goals[idx]
-                instruction_text = goal["instruction_text"]
-                self.user_sessions[session_id] = {"goal": goal, "done": False}
-            else:
-                instruction_text = self.user_sessions[session_id]["goal"][
-                    "instruction_text"
-                ]
-            if self.assigned_instruction_text is not None:
-                instruction_text = (
-                    self.assigned_instruction_text
-                )  # TODO: very hacky, should remove
-                self.user_sessions[session_id]["goal"][
-                    "instruction_text"
-                ] = instruction_text
-            session = self.user_sessions[session_id]
-
-            if not kwargs:
-                # If no action, reset the session variables
-                kwargs["instruction_text"] = instruction_text
-                html, url = self.index(session_id, **kwargs)
-                self.user_sessions[session_id].update(
-                    {
-                        "keywords": None,
-                        "page": None,
-                        "asin": None,
-                        "asins": set(),
-                        "options": dict(),
-                        "actions": defaultdict(int),
-                    }
+            elif (
+                clickable_name == PREV_PAGE.lower()
+                and self.get_page_name(current_url) == "search_results"
+            ):
+                # If "prev page" clicked from search results, re-render with `page` denumerated
+                html, url, status = self.receive(
+                    session_id,
+                    current_url,
+                    keywords=session["keywords"],
+                    page=session["page"] - 1,
+                )
+            elif (
+                clickable_name == PREV_PAGE.lower()
+                and self.get_page_name(current_url) == "item_sub_page"
+            ):
+                # If "prev page" clicked from sub page, return to corresponding item page
+                html, url = self.item_page(session_id, **kwargs)
+            elif (
+                clickable_name == PREV_PAGE.lower()
+                and self.get_page_name(current_url) == "item_page"
+            ):
+                # If "prev page" clicked from item page, return to search results page
+                html, url = self.search_results(
+                    session_id,
+                    keywords=session["keywords"],
+                    page=session["page"],
+                    **kwargs,
                 )
-            elif "keywords" in kwargs:
-                # If search keywords are available, run a search
-                html, url = self.search_results(session_id, **kwargs)
-            elif "clickable_name" in kwargs:
-                clickable_name = kwargs["clickable_name"].lower()
-                if clickable_name == END_BUTTON.lower():
-                    # If "buy now" clicked, calculate reward and flag session as terminated
-                    html, url, reward = self.done(session_id, **kwargs)
-                    status["reward"] = reward
-                    status["done"] = True
-                elif clickable_name == BACK_TO_SEARCH.lower():
-                    # If "back to search" clicked, recursively reset the session back to search page
-                    html, url, status = self.receive(session_id, current_url)
-                elif (
-                    clickable_name == NEXT_PAGE.lower()
-                    and self.get_page_name(current_url) == "search_results"
-                ):
-                    # If "next page" clicked from search results, re-render with `page` enumerated
-                    html, url, status = self.receive(
-                        session_id,
-                        current_url,
-                        keywords=session["keywords"],
-                        page=session["page"] + 1,
-                    )
-                elif (
-                    clickable_name == PREV_PAGE.lower()
-                    and self.get_page_name(current_url) == "search_results"
-                ):
-                    # If "prev page" clicked from search results, re-render with `page` denumerated
-                    html, url, status = self.receive(
-                        session_id,
-                        current_url,
-                        keywords=session["keywords"],
-                        page=session["page"] - 1,
-                    )
-                elif (
-                    clickable_name == PREV_PAGE.lower()
-                    and self.get_page_name(current_url) == "item_sub_page"
-                ):
-                    # If "prev page" clicked from sub page, return to corresponding item page
-                    html, url = self.item_page(session_id, **kwargs)
-                elif (
-                    clickable_name == PREV_PAGE.lower()
-                    and self.get_page_name(current_url) == "item_page"
-                ):
-                    # If "prev page" clicked from item page, return to search results page
-                    html, url = self.search_results(
-                        session_id,
-                        keywords=session["keywords"],
-                        page=session["page"],
-                        **kwargs,
-                    )
-                elif clickable_name in [k.lower() for k in ACTION_TO_TEMPLATE]:
-                    # Render item_sub_page if clickable is description, features, or reviews
-                    html, url = self.item_sub_page(session_id, **kwargs)
-                else:
-                    # Otherwise, render current item page
-                    html, url = self.item_page(session_id, **kwargs)
-            return html, url, status
+            elif clickable_name in [k.lower() for k in ACTION_TO_TEMPLATE]:
+                # Render item_sub_page if clickable is description, features, or reviews
+                html, url = self.item_sub_page(session_id, **kwargs)
+            else:
+                # Otherwise, render current item page
+                html, url = self.item_page(session_id, **kwargs)
+        return html, url, status
 
     def get_page_name(self, url):
         """Determine which page (i.e.
@@ -668,6 +906,10 @@ class SimServer:
         return ""  # index page
 
 
+# The routes above are only used to build the URLs in the rendered pages.
+init_template_env(app.url_map)
+
+
 class SimBrowser:
     """Simulated browser for rendering the HTML source of WebShop environment pages."""
 
@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+
 from google.adk.tools import ToolContext
 from google.genai import types
 
-from ..shared_libraries.init_env import webshop_env
+from ..shared_libraries.init_env import get_session_id, webshop_env_pool
 
 
 async def search(keywords: str, tool_context: ToolContext) -> str:
@@ -28,13 +30,21 @@ async def search(keywords: str, tool_context: ToolContext) -> str:
     Returns:
       str: The search result displayed in a webpage.
     """
+    webshop_env, env_lock = webshop_env_pool.get(get_session_id(tool_context))
     status = {"reward": None, "done": False}
     action_string = f"search[{keywords}]"
-    webshop_env.server.assigned_instruction_text = f"Find me {keywords}."
-    print(f"env instruction_text: {webshop_env.instruction_text}")
-    _, status["reward"], status["done"], _ = webshop_env.step(action_string)
 
-    ob = webshop_env.observation
+    def step():
+        with env_lock:
+            webshop_env.server.set_instruction_text(
+                webshop_env.session, f"Find me {keywords}."
+            )
+            print(f"env instruction_text: {webshop_env.instruction_text}")
+            _, status["reward"], status["done"], _ = webshop_env.step(action_string)
+            return webshop_env.observation, webshop_env.state["html"]
+
+    # Steps are blocking, run them off the event loop so sessions don't queue.
+    ob, html = await asyncio.to_thread(step)
     index = ob.find("Back to Search")
     if index >= 0:
         ob = ob[index:]
@@ -49,9 +59,7 @@ async def search(keywords: str, tool_context: ToolContext) -> str:
     try:
         await tool_context.save_artifact(
             "html",
-            types.Part.from_uri(
-                file_uri=webshop_env.state["html"], mime_type="text/html"
-            ),
+            types.Part.from_uri(file_uri=html, mime_type="text/html"),
         )
     except ValueError as e:
         print(f"Error saving artifact: {e}")
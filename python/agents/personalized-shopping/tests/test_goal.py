@@ -0,0 +1,144 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the reward calculations and their caches."""
+
+import os
+import random
+import sys
+
+import pytest
+
+SHARED_LIBRARIES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "personalized_shopping", "shared_libraries"
+)
+sys.path.insert(0, os.path.abspath(SHARED_LIBRARIES_DIR))
+
+from web_agent_site.engine import goal as goal_lib  # noqa: E402
+
+NAMES = [
+    "Men's Long Sleeve Cotton Shirt",
+    "Women's Running Shoes with Memory Foam",
+    "Stainless Steel Water Bottle, 32 oz",
+    "Organic Green Tea Bags - 100 Count",
+    "Wireless Bluetooth Headphones",
+    "Slim Fit Denim Jeans for Men",
+]
+CATEGORIES = [
+    "Clothing › Men › Shirts",
+    "Clothing › Women › Shoes › Athletic",
+    "Home & Kitchen › Kitchen & Dining › Water Bottles",
+    "Grocery › Beverages › Tea",
+]
+ATTRIBUTES = [
+    "long sleeve",
+    "machine wash",
+    "memory foam",
+    "bpa free",
+    "gluten free",
+    "slim fit",
+    "noise cancelling",
+]
+OPTIONS = ["navy blue", "white", "x-large", "32 oz", "100 count", "black"]
+
+
+def make_pairs(num_pairs, seed=0):
+    """Random purchased products, goals, prices and purchased options"""
+    rng = random.Random(seed)
+    products, goals, prices, options = [], [], [], []
+    for i in range(num_pairs):
+        products.append(
+            {
+                "asin": f"B{rng.randrange(20):05d}",
+                "name": rng.choice(NAMES),
+                "query": rng.choice(["shirt", "shoes", "bottle"]),
+                "product_category": rng.choice(CATEGORIES),
+                "Title": rng.choice(NAMES),
+                "BulletPoints": rng.sample(ATTRIBUTES, 2),
+                "Description": " ".join(rng.sample(ATTRIBUTES, 2)),
+                "Attributes": rng.sample(ATTRIBUTES, rng.randrange(4)),
+            }
+        )
+        goals.append(
+            {
+                "name": rng.choice(NAMES),
+                "query": rng.choice(["shirt", "shoes", "bottle"]),
+                "product_category": rng.choice(CATEGORIES),
+                "attributes": rng.sample(ATTRIBUTES, rng.randrange(1, 4)),
+                "goal_options": dict(
+                    zip(["color", "size"], rng.sample(OPTIONS, rng.randrange(3)))
+                ),
+                "price_upper": rng.choice([20.0, 50.0, 1000000]),
+            }
+        )
+        prices.append(rng.choice([9.99, 35.0, 120.0]))
+        options.append(dict(zip(["color", "size"], rng.sample(OPTIONS, 2))))
+    return products, goals, prices, options
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    goal_lib._type_parses.clear()
+    goal_lib._product_texts.clear()
+    yield
+    goal_lib._type_parses.clear()
+    goal_lib._product_texts.clear()
+
+
+@pytest.mark.parametrize("verbose", [False, True])
+def test_rewards_batch_matches_single_rewards(verbose):
+    products, goals, prices, options = make_pairs(200)
+    expected = [
+        goal_lib.get_reward(p, g, price=price, options=o, verbose=verbose)
+        for p, g, price, o in zip(products, goals, prices, options)
+    ]
+    # Parsed again, in batches
+    goal_lib._type_parses.clear()
+    goal_lib._product_texts.clear()
+    rewards = goal_lib.get_rewards_batch(
+        products, goals, prices, options, verbose=verbose
+    )
+    assert rewards == expected
+
+
+def test_rewards_batch_checks_lengths():
+    products, goals, prices, options = make_pairs(3)
+    with pytest.raises(ValueError):
+        goal_lib.get_rewards_batch(products, goals[:2], prices, options)
+
+
+def test_caches_are_bounded(monkeypatch):
+    monkeypatch.setattr(goal_lib, "TYPE_PARSE_CACHE_SIZE", 3)
+    monkeypatch.setattr(goal_lib, "PRODUCT_TEXT_CACHE_SIZE", 2)
+    for name in NAMES[:4]:
+        goal_lib.get_type_parse(name)
+    assert list(goal_lib._type_parses) == NAMES[1:4]
+    # Reading a parse keeps it, and evicts the least recently used one.
+    goal_lib.get_type_parse(NAMES[1])
+    goal_lib.get_type_parse(NAMES[4])
+    assert list(goal_lib._type_parses) == [NAMES[3], NAMES[1], NAMES[4]]
+
+    products, _, _, _ = make_pairs(10)
+    for product in products:
+        goal_lib.get_product_texts(product)
+    assert len(goal_lib._product_texts) == 2
+    assert list(goal_lib._product_texts)[-1] == products[-1]["asin"]
+
+
+def test_cache_type_parses_only_fills_the_cache(monkeypatch):
+    monkeypatch.setattr(goal_lib, "TYPE_PARSE_CACHE_SIZE", 3)
+    goal_lib.cache_type_parses(NAMES + NAMES)
+    assert list(goal_lib._type_parses) == NAMES[:3]
+    for name in NAMES[:3]:
+        assert goal_lib._type_parses[name] == goal_lib._nouns(goal_lib.nlp(name))
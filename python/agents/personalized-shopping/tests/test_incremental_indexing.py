@@ -0,0 +1,103 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Smoke test of the incremental indexing on a tiny catalog."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# The indexes are built and read with pyserini.
+pyserini_lucene = pytest.importorskip("pyserini.search.lucene")
+
+SHARED_LIBRARIES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "personalized_shopping", "shared_libraries"
+)
+sys.path.insert(0, os.path.abspath(SHARED_LIBRARIES_DIR))
+
+from search_engine import convert_product_file_format as converter  # noqa: E402
+
+TIERS = {"2": 2, "4": 4}
+
+
+def make_product(asin, title):
+    return {
+        "asin": asin,
+        "Title": title,
+        "Description": f"description of {asin}",
+        "BulletPoints": [f"bullet point of {asin}"],
+        "options": {"color": ["red", "blue"]},
+    }
+
+
+def write_catalog(products):
+    docs = (converter.product_to_doc(p) for p in products)
+    converter.write_docs(docs, len(products), tiers=TIERS, shard_size=2)
+
+
+def get_indexed_contents(tier, doc_ids):
+    """Number of documents of the index, and contents of the given documents"""
+    searcher = pyserini_lucene.LuceneSearcher(os.path.abspath(f"indexes_{tier}"))
+    contents = {}
+    for doc_id in doc_ids:
+        doc = searcher.doc(doc_id)
+        if doc is not None:
+            contents[doc_id] = json.loads(doc.raw())["contents"]
+    return searcher.num_docs, contents
+
+
+def test_incremental_update_matches_full_rebuild(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    products = [make_product(f"P{i}", f"product {i}") for i in range(5)]
+    write_catalog(products)
+    for tier in TIERS:
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "pyserini.index.lucene",
+                "--collection",
+                "JsonCollection",
+                "--input",
+                f"resources_{tier}",
+                "--index",
+                f"indexes_{tier}",
+                "--generator",
+                "DefaultLuceneDocumentGenerator",
+                "--threads",
+                "1",
+                "--storePositions",
+                "--storeDocvectors",
+                "--storeRaw",
+            ],
+            check=True,
+        )
+    previous_hashes = converter.read_doc_hashes()
+
+    # P0 is removed, which pushes P2 out of the first tier and P4 into the
+    # second one, P3 is changed, and P9 is added.
+    products = products[1:] + [make_product("P9", "product 9")]
+    products[2] = make_product("P3", "renamed product")
+    write_catalog(products)
+    converter.update_indexes(previous_hashes, tiers=TIERS)
+
+    all_ids = [f"P{i}" for i in range(10)]
+    for tier, size in TIERS.items():
+        expected = {
+            p["asin"]: converter.product_to_doc(p)["contents"] for p in products[:size]
+        }
+        assert get_indexed_contents(tier, all_ids) == (size, expected)
@@ -0,0 +1,170 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Parity of the streaming page parser with BeautifulSoup on rendered pages."""
+
+import os
+import sys
+
+import pytest
+
+SHARED_LIBRARIES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "personalized_shopping", "shared_libraries"
+)
+sys.path.insert(0, os.path.abspath(SHARED_LIBRARIES_DIR))
+
+# Importing the env module sets up `url_for` for the templates.
+from web_agent_site.envs.web_agent_text_env import ParsedPage  # noqa: E402
+from web_agent_site.engine.engine import map_action_to_html  # noqa: E402
+
+INSTRUCTION_TEXT = (
+    "i need a  long-sleeve <b>shirt</b> & pants, and price lower than 40.00 dollars"
+)
+
+PRODUCTS = [
+    {
+        "asin": "B0001",
+        "Title": 'Men\'s Shirt & Tie <Set>, "Classic" Fit',
+        "Price": "$12.99",
+        "Rating": "4.5",
+        "MainImage": "https://example.com/b0001.jpg",
+        "Description": "  A shirt.\n\n  With a tie.  ",
+        "BulletPoints": ["Cotton", "  Machine wash  ", "100% <b>cotton</b>"],
+        "Reviews": [
+            {"title": "Great", "score": "5", "body": "Fits well."},
+            {"title": "Bad &amp; small", "score": 2, "body": ""},
+        ],
+        "Attributes": ["long sleeve", "machine wash"],
+        "category": "fashion",
+        "query": "men shirts",
+        "product_category": "Clothing › Men › Shirts",
+        "options": {
+            "color": ["Navy Blue", "white & red", "Ünicode"],
+            "size": ["x-small", "XX-Large", "32W x 30L"],
+        },
+        "option_to_image": {"Navy Blue": "https://example.com/navy.jpg"},
+    },
+    {
+        "asin": "B0002",
+        "Title": "   ",
+        "Price": "$1.00 to $3.50",
+        "Rating": "N.A.",
+        "MainImage": "",
+        "Description": "",
+        "BulletPoints": [],
+        "Reviews": [],
+        "Attributes": [],
+        "category": "",
+        "query": "",
+        "product_category": "",
+        "options": {},
+        "option_to_image": {},
+    },
+]
+
+
+def render_pages():
+    """The rendered search, results, item and sub-pages, by name"""
+    common = dict(session_id="fixed_1", instruction_text=INSTRUCTION_TEXT)
+    item = dict(
+        common,
+        keywords=["shirt", "&", "tie"],
+        page=2,
+        asin="B0001",
+        product_info=PRODUCTS[0],
+    )
+    pages = {
+        "search": map_action_to_html("start", **common),
+        "search without instruction": map_action_to_html(
+            "start", session_id="fixed_1", instruction_text=None
+        ),
+        "empty results": map_action_to_html(
+            "search", products=[], keywords=["nothing"], page=1, total=0, **common
+        ),
+    }
+    for page in (1, 2, 3):
+        pages[f"results {page}"] = map_action_to_html(
+            "search",
+            products=PRODUCTS * 5,
+            keywords=["shirt", "&", "tie"],
+            page=page,
+            total=25,
+            **common,
+        )
+    for options in ({}, {"color": "white & red", "size": "32W x 30L"}):
+        for show_attrs in (False, True):
+            pages[f"item {options} {show_attrs}"] = map_action_to_html(
+                "click[B0001]", options=options, show_attrs=show_attrs, **item
+            )
+    pages["item without options"] = map_action_to_html(
+        "click[B0002]",
+        **dict(item, asin="B0002", product_info=PRODUCTS[1]),
+        options={},
+        show_attrs=True,
+    )
+    for sub_page in ("Description", "Features", "Reviews", "Attributes"):
+        pages[sub_page] = map_action_to_html(
+            f"click[{sub_page}]", options={"color": "Navy Blue"}, **item
+        )
+    pages["done"] = map_action_to_html(
+        "click[Buy Now]",
+        session_id="fixed_1",
+        reward=0.75,
+        asin="B0001",
+        options={"color": "Navy Blue"},
+        reward_info={"r_type": 1.0},
+        goal_attrs=["long sleeve"],
+        purchased_attrs=["long sleeve", "machine wash"],
+        goal={"asin": "B0001", "instruction_text": INSTRUCTION_TEXT},
+        mturk_code="fixed_1",
+        query="men shirts",
+        category="fashion",
+        product_category="Clothing › Men › Shirts",
+    )
+    return pages
+
+
+PAGES = render_pages()
+
+
+@pytest.mark.parametrize("name", PAGES)
+def test_stream_parse_matches_soup(name):
+    html = PAGES[name]
+    soup_page = ParsedPage(html)
+    stream_page = ParsedPage(html, stream=True)
+
+    assert stream_page.simple_text == soup_page.simple_text
+    assert stream_page.has_search_bar == soup_page.has_search_bar
+    # Clickables are tags with soup, and their attribute dicts when streamed.
+    assert list(stream_page.text_to_clickable) == list(soup_page.text_to_clickable)
+    assert stream_page.text_to_clickable == {
+        text: tag.attrs for text, tag in soup_page.text_to_clickable.items()
+    }
+    if soup_page.soup.find(id="instruction-text") is not None:
+        assert stream_page.instruction_text == soup_page.instruction_text
+    # Nothing above needed the soup of the streamed page.
+    assert "soup" not in vars(stream_page)
+
+
+def test_pages_have_clickables_and_text():
+    """The rendered pages exercise the clickables compared above"""
+    results = ParsedPage(PAGES["results 2"], stream=True)
+    assert {"b0001", "b0002", "< prev", "next >", "back to search"} <= set(
+        results.text_to_clickable
+    )
+    item = ParsedPage(PAGES["item {} True"], stream=True)
+    assert {"white & red", "32W x 30L", "attributes", "buy now"} <= set(
+        item.text_to_clickable
+    )
+    assert item.instruction_text == "Instruction:" + INSTRUCTION_TEXT
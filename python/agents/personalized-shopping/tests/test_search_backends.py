@@ -0,0 +1,289 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the Porter stemmer and the in-process BM25 search backend."""
+
+from collections import Counter
+import json
+import math
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+SHARED_LIBRARIES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "personalized_shopping", "shared_libraries"
+)
+sys.path.insert(0, os.path.abspath(SHARED_LIBRARIES_DIR))
+
+from web_agent_site.engine import search_backends  # noqa: E402
+from web_agent_site.engine.porter_stemmer import stem  # noqa: E402
+
+# Outputs of Martin Porter's reference implementation
+STEMS = [
+    ("caresses", "caress"),
+    ("ponies", "poni"),
+    ("ties", "ti"),
+    ("caress", "caress"),
+    ("cats", "cat"),
+    ("feed", "feed"),
+    ("agreed", "agre"),
+    ("plastered", "plaster"),
+    ("bled", "bled"),
+    ("motoring", "motor"),
+    ("sing", "sing"),
+    ("conflated", "conflat"),
+    ("troubled", "troubl"),
+    ("sized", "size"),
+    ("hopping", "hop"),
+    ("tanned", "tan"),
+    ("falling", "fall"),
+    ("hissing", "hiss"),
+    ("fizzed", "fizz"),
+    ("failing", "fail"),
+    ("filing", "file"),
+    ("happy", "happi"),
+    ("sky", "sky"),
+    ("relational", "relat"),
+    ("conditional", "condit"),
+    ("rational", "ration"),
+    ("valenci", "valenc"),
+    ("hesitanci", "hesit"),
+    ("digitizer", "digit"),
+    ("conformabli", "conform"),
+    ("radicalli", "radic"),
+    ("differentli", "differ"),
+    ("vileli", "vile"),
+    ("analogousli", "analog"),
+    ("vietnamization", "vietnam"),
+    ("predication", "predic"),
+    ("operator", "oper"),
+    ("feudalism", "feudal"),
+    ("decisiveness", "decis"),
+    ("hopefulness", "hope"),
+    ("callousness", "callous"),
+    ("formaliti", "formal"),
+    ("sensitiviti", "sensit"),
+    ("sensibiliti", "sensibl"),
+    ("triplicate", "triplic"),
+    ("formative", "form"),
+    ("formalize", "formal"),
+    ("electriciti", "electr"),
+    ("electrical", "electr"),
+    ("hopeful", "hope"),
+    ("goodness", "good"),
+    ("revival", "reviv"),
+    ("allowance", "allow"),
+    ("inference", "infer"),
+    ("airliner", "airlin"),
+    ("gyroscopic", "gyroscop"),
+    ("adjustable", "adjust"),
+    ("defensible", "defens"),
+    ("irritant", "irrit"),
+    ("replacement", "replac"),
+    ("adjustment", "adjust"),
+    ("dependent", "depend"),
+    ("adoption", "adopt"),
+    ("homologou", "homolog"),
+    ("communism", "commun"),
+    ("activate", "activ"),
+    ("angulariti", "angular"),
+    ("effective", "effect"),
+    ("bowdlerize", "bowdler"),
+    ("probate", "probat"),
+    ("rate", "rate"),
+    ("cease", "ceas"),
+    ("controll", "control"),
+    ("roll", "roll"),
+    ("generalizations", "gener"),
+    ("oscillators", "oscil"),
+    ("news", "new"),
+    ("dying", "dy"),
+    # Departures of the reference implementation from the published algorithm
+    ("archaeology", "archaeolog"),
+    ("biology", "biologi"),
+    # Words of up to two letters are not stemmed.
+    ("is", "is"),
+    ("as", "as"),
+    ("by", "by"),
+]
+
+VOCABULARY = (
+    "red blue green cotton shirt shirts dress dresses women's men running "
+    "shoes long sleeve sleeves slim fit the and of for with 2 pack 3.5 oz"
+).split()
+
+
+def make_docs(num_docs, seed=0):
+    """Random documents of very different lengths, and some duplicates"""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(num_docs):
+        if i % 10 == 9:
+            contents = docs[i - 5][1]
+        else:
+            length = rng.choice([1, 3, 8, 20, 30, 60, 150])
+            contents = " ".join(rng.choices(VOCABULARY, k=length))
+        docs.append((f"B{i:05d}", contents))
+    return docs
+
+
+def reference_scores(docs, query, k1=0.9, b=0.4):
+    """BM25 score of every document, computed one document at a time"""
+    analyzer = search_backends.Analyzer()
+    doc_terms = [Counter(analyzer(contents)) for _, contents in docs]
+    lengths = [sum(terms.values()) for terms in doc_terms]
+    avg_length = sum(lengths) / len(docs)
+    # Lengths with the 1 byte precision of Lucene's norms
+    norm_lengths = search_backends.LENGTH_TABLE[search_backends.encode_lengths(lengths)]
+    scores = []
+    for terms, norm_length in zip(doc_terms, norm_lengths):
+        score = 0.0
+        for term, boost in Counter(analyzer(query)).items():
+            freq = terms.get(term, 0)
+            if freq == 0:
+                continue
+            doc_freq = sum(term in other for other in doc_terms)
+            idf = math.log(1 + (len(docs) - doc_freq + 0.5) / (doc_freq + 0.5))
+            norm = k1 * (1 - b + b * float(norm_length) / avg_length)
+            score += boost * idf * freq / (freq + norm)
+        scores.append(score)
+    return scores
+
+
+def assert_ranking(result, docs, scores, k, tolerance=1e-4):
+    """`result` is a top `k` of `scores`, up to float precision"""
+    index = {doc_id: i for i, (doc_id, _) in enumerate(docs)}
+    matched = [i for i, score in enumerate(scores) if score > 0]
+    assert len(result) == min(k, len(matched))
+    result_scores = [scores[index[doc_id]] for doc_id in result]
+    assert all(score > 0 for score in result_scores)
+    for higher, lower in zip(result_scores, result_scores[1:]):
+        assert higher >= lower - tolerance
+    if result:
+        # Every document scoring clearly above the last one is in the top k.
+        assert {i for i in matched if scores[i] > result_scores[-1] + tolerance} <= {
+            index[doc_id] for doc_id in result
+        }
+    # Identical documents are ranked in document order.
+    for doc_id, later_id in zip(result, result[1:]):
+        if docs[index[doc_id]][1] == docs[index[later_id]][1]:
+            assert index[doc_id] < index[later_id]
+
+
+@pytest.mark.parametrize("word, expected", STEMS)
+def test_stem(word, expected):
+    assert stem(word) == expected
+
+
+def test_analyzer():
+    analyzer = search_backends.Analyzer()
+    assert analyzer("The Women's RUNNING shoes, 3.5 oz and 2-pack") == [
+        "women",
+        "run",
+        "shoe",
+        "3.5",
+        "oz",
+        "2",
+        "pack",
+    ]
+
+
+def test_encode_lengths():
+    lengths = np.arange(2000)
+    decoded = search_backends.LENGTH_TABLE[search_backends.encode_lengths(lengths)]
+    # Small lengths are exact, larger ones rounded down, preserving their order.
+    assert np.array_equal(decoded[:24], lengths[:24])
+    assert np.all(decoded <= lengths)
+    assert np.all(np.diff(decoded) >= 0)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "red",
+        "red shirt",
+        "red red shirt",
+        "women's long sleeve cotton dresses",
+        "slim fit men running shoes 2 pack",
+        "3.5 oz green",
+        "the and of",
+        "unknown words",
+        "",
+    ],
+)
+@pytest.mark.parametrize("k", [1, 5, 50, 1000])
+def test_bm25_ranking_matches_brute_force(query, k):
+    docs = make_docs(300)
+    backend = search_backends.BM25SearchBackend.from_docs(docs)
+    assert_ranking(backend.search(query, k), docs, reference_scores(docs, query), k)
+
+
+def test_bm25_search_is_cached():
+    backend = search_backends.BM25SearchBackend.from_docs(make_docs(50))
+    first = backend.search("red shirt", 10)
+    assert backend.search("red shirt", 10) is first
+    assert backend._cached_search.cache_info().hits == 1
+
+
+def write_docs(docs_dir, docs, num_shards=3):
+    os.makedirs(docs_dir, exist_ok=True)
+    for shard in range(num_shards):
+        with open(os.path.join(docs_dir, f"docs_{shard}.jsonl"), "w") as f:
+            for doc_id, contents in docs[shard::num_shards]:
+                f.write(json.dumps({"id": doc_id, "contents": contents}) + "\n")
+
+
+def test_snapshot_round_trip(tmp_path, monkeypatch):
+    docs_dir = tmp_path / "resources"
+    docs = make_docs(100)
+    write_docs(docs_dir, docs)
+    built = search_backends.BM25SearchBackend.from_documents(str(docs_dir))
+    snapshot_path = tmp_path / "resources.bm25.npz"
+    assert snapshot_path.exists()
+
+    # The second backend is loaded from the snapshot, without indexing.
+    def fail(*args, **kwargs):
+        raise AssertionError("The documents were indexed again.")
+
+    with monkeypatch.context() as m:
+        m.setattr(search_backends.BM25SearchBackend, "from_docs", fail)
+        loaded = search_backends.BM25SearchBackend.from_documents(str(docs_dir))
+    for name in search_backends.SNAPSHOT_ARRAYS:
+        assert np.array_equal(getattr(loaded, name), getattr(built, name))
+        assert getattr(loaded, name).dtype == getattr(built, name).dtype
+    for query in ("red shirt", "women's long sleeve cotton dresses", "3.5 oz"):
+        assert loaded.search(query, 20) == built.search(query, 20)
+
+
+def test_snapshot_is_rebuilt_when_documents_change(tmp_path):
+    docs_dir = tmp_path / "resources"
+    write_docs(docs_dir, make_docs(30))
+    search_backends.BM25SearchBackend.from_documents(str(docs_dir))
+
+    with open(docs_dir / "docs_0.jsonl", "a") as f:
+        f.write(json.dumps({"id": "NEW", "contents": "unique zebra"}) + "\n")
+    backend = search_backends.BM25SearchBackend.from_documents(str(docs_dir))
+    assert backend.search("zebra", 10) == ("NEW",)
+    reloaded = search_backends.BM25SearchBackend.from_documents(str(docs_dir))
+    assert reloaded.search("zebra", 10) == ("NEW",)
+
+
+def test_no_snapshot(tmp_path):
+    docs_dir = tmp_path / "resources"
+    write_docs(docs_dir, make_docs(30))
+    search_backends.BM25SearchBackend.from_documents(str(docs_dir), use_snapshot=False)
+    assert not (tmp_path / "resources.bm25.npz").exists()